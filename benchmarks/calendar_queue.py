@@ -0,0 +1,111 @@
+"""
+Compares the number of events processed per second by the stock `simpy.Environment` and by
+`CalendarEnvironment` on a scaled-up version of `examples/fattree.py`: a fat-tree of k-port
+`FairPacketSwitch`es with DRR schedulers, carrying Poisson flows between random pairs of hosts
+along random shortest paths.
+
+Both environments process exactly the same events in the same order, which is checked by
+comparing the number of packets received at the sinks.
+
+Usage: python benchmarks/calendar_queue.py [k] [number of flows] [simulation time]
+"""
+import random
+import sys
+import time
+from functools import partial
+
+import networkx as nx
+import simpy
+
+from ns.flow.flow import Flow
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.switch.switch import FairPacketSwitch
+from ns.topos.fattree import build as build_fattree
+from ns.topos.utils import generate_fib
+from ns.utils.calendar_queue import CalendarEnvironment
+
+
+def source(env, out, flow_id, rate, mean_size=100.0):
+    """ Sends packets with exponential inter-arrival times and sizes. """
+    packet_id = 0
+    while True:
+        yield env.timeout(random.expovariate(rate))
+        packet_id += 1
+        out.put(Packet(env.now, random.expovariate(1.0 / mean_size), packet_id,
+                       flow_id=flow_id))
+
+
+def flow_to_classes(f_id, n_id=0, fib=None, n_classes=4):
+    """ Maps a flow to one of the classes of a port, as in examples/fattree.py. """
+    return (f_id + n_id + fib[f_id]) % n_classes
+
+
+def build(env, k, n_flows, pir=100000, buffer_size=1000):
+    """ Builds the fat-tree network on the given environment, and returns its sinks. """
+    ft = build_fattree(k)
+    hosts = sorted(n for n in ft.nodes() if ft.nodes[n]['type'] == 'host')
+
+    all_flows = {}
+    for flow_id in range(n_flows):
+        src, dst = random.sample(hosts, 2)
+        all_flows[flow_id] = Flow(flow_id, src, dst)
+        all_flows[flow_id].path = random.choice(list(nx.all_shortest_paths(ft, src, dst)))
+
+    ft = generate_fib(ft, all_flows)
+
+    weights = {c: 1 for c in range(4)}
+    for node_id in ft.nodes():
+        node = ft.nodes[node_id]
+        flow_classes = partial(flow_to_classes, n_id=node_id, fib=node['flow_to_port'])
+        node['device'] = FairPacketSwitch(env,
+                                          k,
+                                          pir,
+                                          buffer_size,
+                                          weights,
+                                          'DRR',
+                                          flow_classes,
+                                          element_id=f"{node_id}")
+        node['device'].demux.fib = node['flow_to_port']
+
+    for node_id in ft.nodes():
+        node = ft.nodes[node_id]
+        for port_number, next_hop in node['port_to_nexthop'].items():
+            node['device'].ports[port_number].out = ft.nodes[next_hop]['device']
+
+    sinks = []
+    for flow_id, flow in all_flows.items():
+        sink = PacketSink(env, rec_arrivals=False, rec_waits=False)
+        env.process(source(env, ft.nodes[flow.src]['device'], flow_id, 1 + random.random()))
+        ft.nodes[flow.dst]['device'].demux.ends[flow_id] = sink
+        sinks.append(sink)
+
+    return sinks
+
+
+def run(env, k, n_flows, until):
+    """ Returns the number of events processed per second, and the packets received. """
+    random.seed(1)
+    sinks = build(env, k, n_flows)
+
+    events = 0
+    start = time.perf_counter()
+    while env.peek() < until:
+        env.step()
+        events += 1
+    elapsed = time.perf_counter() - start
+
+    received = sum(sum(sink.packets_received.values()) for sink in sinks)
+    return events / elapsed, events, received
+
+
+if __name__ == '__main__':
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    until = float(sys.argv[3]) if len(sys.argv) > 3 else 20.0
+
+    for name, env in (('simpy.Environment', simpy.Environment()),
+                      ('CalendarEnvironment', CalendarEnvironment())):
+        rate, events, received = run(env, k, n, until)
+        print(f"{name:>20}: {rate:,.0f} events/second "
+              f"({events:,} events, {received:,} packets received)")
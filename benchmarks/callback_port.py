@@ -0,0 +1,82 @@
+"""
+Compares the per-packet cost of `Port` and `CallbackPort` on the workloads of
+`examples/mm1.py`, with a tandem of ports rather than a single one, and of
+`examples/overloaded_switch.py`, with many more packets. Both ports should deliver exactly
+the same packets at the same times.
+
+Usage: python benchmarks/callback_port.py [number of packets]
+"""
+import random
+import sys
+import time
+from functools import partial
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.port.callback_port import CallbackPort
+from ns.port.monitor import PortMonitor
+from ns.port.port import Port
+
+
+def source(env, out, n_packets, arrival_dist, size_dist):
+    """ Sends `n_packets` packets with the given inter-arrival times and sizes. """
+    for packet_id in range(n_packets):
+        yield env.timeout(arrival_dist())
+        out.put(Packet(env.now, size_dist(), packet_id, flow_id=0))
+
+
+def mm1(port_type, n_packets, n_hops=4):
+    """ The M/M/1 workload of examples/mm1.py, through a tandem of `n_hops` ports. """
+    random.seed(1)
+    env = simpy.Environment()
+    sink = PacketSink(env)
+
+    ports = [port_type(env, 1000.0, qlimit=10000) for __ in range(n_hops)]
+    for port, downstream in zip(ports, ports[1:] + [sink]):
+        port.out = downstream
+    PortMonitor(env, ports[0], partial(random.expovariate, 1.0))
+
+    env.process(
+        source(env, ports[0], n_packets, partial(random.expovariate, 0.5),
+               partial(random.expovariate, 0.01)))
+    return env, sink, n_packets * n_hops, n_packets / 0.5 + 1000
+
+
+def overloaded(port_type, n_packets):
+    """ The workload of examples/overloaded_switch.py. """
+    env = simpy.Environment()
+    sink = PacketSink(env)
+
+    port = port_type(env, rate=200.0, qlimit=300)
+    port.out = sink
+
+    env.process(source(env, port, n_packets, lambda: 1.5, lambda: 100.0))
+    return env, sink, n_packets, n_packets * 1.5 + 100
+
+
+def run(workload, port_type, n_packets):
+    """ Returns the time per packet per port, in microseconds, and the sink. """
+    env, sink, hops, until = workload(port_type, n_packets)
+
+    start = time.perf_counter()
+    env.run(until=until)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / hops * 1e6, sink
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    for name, workload in (('mm1', mm1), ('overloaded_switch', overloaded)):
+        results = {}
+        for port_type in (Port, CallbackPort):
+            cost, sink = run(workload, port_type, n)
+            results[port_type] = sink.waits[0]
+            print(f"{name:>17}, {port_type.__name__:>12}: "
+                  f"{cost:.2f} microseconds/packet/hop, "
+                  f"{sink.packets_received[0]} packets received")
+
+        assert results[Port] == results[CallbackPort], "the ports delivered different packets"
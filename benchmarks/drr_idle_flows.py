@@ -0,0 +1,54 @@
+"""
+Measures the throughput of a `DRRServer` that is configured with many flows, most of which are
+idle, as is typical of a switch port shared by thousands of flows.
+
+Packets of random sizes are offered round-robin over a small number of active flows at twice
+the rate of the server, so that the active flows stay backlogged. The remaining flows are
+configured with weights but never send any packets.
+
+Usage: python benchmarks/drr_idle_flows.py [number of packets]
+"""
+import random
+import sys
+import time
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.scheduler.drr import DRRServer
+
+
+def source(env, out, n_packets, active_flows, interval):
+    """ Sends `n_packets` packets of random sizes, round-robin over `active_flows` flows. """
+    for packet_id in range(n_packets):
+        yield env.timeout(interval)
+        size = random.randint(64, 1500)
+        out.put(Packet(env.now, size, packet_id, flow_id=packet_id % active_flows))
+
+
+def run(n_packets, n_flows, active_flows=8, rate=8000.0):
+    """ Returns the number of packets sent by the server per second of wall-clock time. """
+    random.seed(42)
+    env = simpy.Environment()
+    weights = {flow_id: 1 + flow_id % 3 for flow_id in range(n_flows)}
+    server = DRRServer(env, rate=rate, weights=weights)
+    sink = PacketSink(env)
+    server.out = sink
+
+    # the average packet size is 782 bytes
+    interval = 782 * 8.0 / rate / 2
+    env.process(source(env, server, n_packets, active_flows, interval))
+
+    start = time.perf_counter()
+    env.run()
+    elapsed = time.perf_counter() - start
+
+    return sum(sink.packets_received.values()) / elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    for flows in (16, 256, 4096):
+        print(f"{flows:>5} flows (8 active): {run(n, flows):,.0f} packets/second")
@@ -0,0 +1,121 @@
+"""
+Measures the time taken by `ns.topos.utils.generate_fib` to build the forwarding tables of a
+fat tree from the paths of many flows, and the per-packet cost of forwarding by `FIBDemux`
+with tables stored as dicts and as dense lists.
+
+The tables are checked against those built by walking every path in Python, as
+`generate_fib` used to.
+
+Usage: python benchmarks/fib_forwarding.py [k] [number of flows]
+"""
+import random
+import sys
+import time
+
+import networkx as nx
+
+from ns.demux.fib_demux import FIBDemux
+from ns.packet.packet import Packet
+from ns.topos.fattree import build as build_fattree
+from ns.topos.paths import FatTreeRouting
+from ns.topos.utils import fib_table, generate_fib, generate_flows
+
+
+class Counter:
+    """ A downstream element that only counts the packets it receives. """
+    def __init__(self):
+        self.packets_received = 0
+
+    def put(self, packet):
+        self.packets_received += 1
+
+
+class LegacyFIBDemux:
+    """ Forwards packets as `FIBDemux` used to, with a miss path driven by exceptions. """
+    def __init__(self, fib, outs):
+        self.fib = fib
+        self.outs = outs
+        self.ends = dict()
+        self.default = None
+        self.packets_received = 0
+
+    def put(self, packet):
+        self.packets_received += 1
+        flow_id = packet.flow_id
+
+        if flow_id in self.ends:
+            self.ends[flow_id].put(packet)
+        else:
+            try:
+                self.outs[self.fib[packet.flow_id]].put(packet)
+            except (KeyError, IndexError, ValueError) as exc:
+                print("FIB Demux Error: " + str(exc))
+                if self.default:
+                    self.default.put(packet)
+
+
+def generate_fib_dicts(G, all_flows):
+    """ Builds the forwarding tables by walking every path, as `generate_fib` used to. """
+    for n in G.nodes():
+        node = G.nodes[n]
+        node['nexthop_to_port'] = {nh: port for port, nh in enumerate(nx.neighbors(G, n))}
+        node['flow_to_port'] = dict()
+
+    for flow in all_flows.values():
+        for a, z in zip(flow.path, flow.path[1:]):
+            G.nodes[a]['flow_to_port'][flow.fid] = G.nodes[a]['nexthop_to_port'][z]
+    return {n: G.nodes[n]['flow_to_port'] for n in G.nodes()}
+
+
+def forward(demux, packets):
+    """ Returns the time taken by `demux` to forward the packets, in seconds. """
+    start = time.perf_counter()
+    for packet in packets:
+        demux.put(packet)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+
+    ft = build_fattree(k)
+    hosts = [v for v in ft.nodes() if ft.nodes[v]['type'] == 'host']
+    flows = generate_flows(ft, hosts, n, paths=FatTreeRouting(k), rng=random.Random(1))
+    hops = sum(len(flow.path) - 1 for flow in flows.values())
+    print(f"k = {k}: {n:,} flows, {hops:,} hops")
+
+    start = time.perf_counter()
+    expected = generate_fib_dicts(ft, flows)
+    print(f"walking the paths:        {time.perf_counter() - start:.2f} seconds")
+
+    for dicts in [True, False]:
+        start = time.perf_counter()
+        generate_fib(ft, flows, dicts=dicts)
+        print(f"generate_fib(dicts={dicts!s:5}): {time.perf_counter() - start:.2f} seconds")
+
+    for v in ft.nodes():
+        node = ft.nodes[v]
+        assert node['flow_to_port'] == expected[v]
+        assert dict(zip(node['fib_flows'].tolist(), node['fib_ports'].tolist())) == expected[v]
+
+    # forwarding at the busiest switch, of packets of flows it routes and of flows it does not
+    busiest = max(ft.nodes(), key=lambda v: len(ft.nodes[v]['fib_flows']))
+    node = ft.nodes[busiest]
+    rng = random.Random(2)
+    routed = node['fib_flows'].tolist()
+    unrouted = sorted(set(range(n)) - set(routed))
+    outs = [Counter() for __ in node['port_to_nexthop']]
+
+    for workload, flow_ids in [('routed', routed), ('unrouted', unrouted)]:
+        packets = [Packet(0, 1000, i, flow_id=rng.choice(flow_ids)) for i in range(500000)]
+        demuxes = [('dict', FIBDemux(fib=(node['fib_flows'], node['fib_ports']), outs=outs)),
+                   ('dense list', FIBDemux(fib=fib_table(node, n), outs=outs))]
+        if workload == 'routed':
+            # the previous FIBDemux prints a message for every unrouted packet
+            demuxes.insert(0, ('dict, before', LegacyFIBDemux(node['flow_to_port'], outs)))
+
+        for name, demux in demuxes:
+            elapsed = forward(demux, packets)
+            print(f"{workload:8} packets, {name:12}: "
+                  f"{elapsed / len(packets) * 1e9:.0f} ns per packet")
@@ -0,0 +1,67 @@
+"""
+Measures the time taken by `ns.topos.utils.generate_flows` to set up the paths of flows in a
+fat tree, with each of the path services in `ns.topos.paths`, and checks that every path is a
+shortest path in the topology.
+
+Enumerating all the simple paths between the hosts of each flow, as `generate_flows` used to,
+is only feasible in the smallest fat trees, so it is measured on a handful of flows with k = 4.
+
+Usage: python benchmarks/flow_setup.py [number of flows]
+"""
+import random
+import sys
+import time
+
+import networkx as nx
+
+from ns.topos.fattree import build as build_fattree
+from ns.topos.paths import ECMPTable, FatTreeRouting, KShortestPaths
+from ns.topos.utils import generate_flows
+
+
+def enumerate_simple_paths(G, hosts, n_flows, rng):
+    """ Sets up flows the way `generate_flows` used to, by enumerating all simple paths. """
+    for __ in range(n_flows):
+        src, dst = rng.sample(hosts, 2)
+        rng.choice(list(nx.all_simple_paths(G, src, dst, cutoff=nx.diameter(G))))
+
+
+def check(G, flows, hops):
+    """ Checks that the flows follow valid paths with the given number of hops. """
+    for flow in flows.values():
+        assert flow.path[0] == flow.src and flow.path[-1] == flow.dst
+        assert all(G.has_edge(a, z) for a, z in zip(flow.path, flow.path[1:]))
+        assert len(flow.path) - 1 == hops[(flow.src, flow.dst)]
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    ft = build_fattree(4)
+    hosts = sorted(v for v in ft.nodes() if ft.nodes[v]['type'] == 'host')
+    start = time.perf_counter()
+    enumerate_simple_paths(ft, hosts, 10, random.Random(1))
+    elapsed = time.perf_counter() - start
+    print(f"k = 4, all simple paths: {elapsed / 10 * 1e3:.1f} ms per flow")
+
+    for k in [8, 16]:
+        ft = build_fattree(k)
+        hosts = sorted(v for v in ft.nodes() if ft.nodes[v]['type'] == 'host')
+        services = {
+            'ECMP table': ECMPTable(ft),
+            'fat-tree routing': FatTreeRouting(k),
+            '4-shortest paths': KShortestPaths(ft, k=4)
+        }
+
+        for name, service in services.items():
+            flows_n = n if name != '4-shortest paths' else n // 100
+            start = time.perf_counter()
+            flows = generate_flows(ft, hosts, flows_n, paths=service, rng=random.Random(1))
+            elapsed = time.perf_counter() - start
+            print(f"k = {k}, {name}: {flows_n:,} flows in {elapsed:.2f} seconds "
+                  f"({elapsed / flows_n * 1e6:.1f} us per flow)")
+
+            if name != '4-shortest paths':
+                table = services['ECMP table']
+                check(ft, flows, {(f.src, f.dst): table.distances_to(f.dst)[f.src]
+                                  for f in flows.values()})
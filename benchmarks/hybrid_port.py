@@ -0,0 +1,75 @@
+"""
+Validates `HybridPort` against the analytical results of an M/M/1 queue, as in
+`examples/mm1.py`, and compares its running time with that of `Port` as the utilization grows.
+
+The packet service rate is μ = 1.25 packets per second, as in `examples/mm1.py`. For an arrival
+rate λ, the mean time a packet spends in the system is 1 / (μ - λ), and the mean number of
+packets in the system is ρ / (1 - ρ), where ρ = λ / μ.
+
+Usage: python benchmarks/hybrid_port.py [number of packets]
+"""
+import random
+import sys
+import time
+from functools import partial
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.port.hybrid_port import HybridPort
+from ns.port.monitor import PortMonitor
+from ns.port.port import Port
+
+SERVICE_RATE = 1.25
+PORT_RATE = 1000.0
+
+
+def source(env, out, n_packets, arrival_rate):
+    """ Sends `n_packets` packets with exponential inter-arrival times and sizes. """
+    for packet_id in range(n_packets):
+        yield env.timeout(random.expovariate(arrival_rate))
+        out.put(Packet(env.now, random.expovariate(0.01), packet_id, flow_id=0))
+
+
+def run(port_type, n_packets, arrival_rate):
+    """ Returns the wall-clock time of the run, the mean time in the system, and the mean
+        number of packets in the system. """
+    random.seed(1)
+    env = simpy.Environment()
+
+    sink = PacketSink(env, rec_arrivals=False)
+    if port_type is HybridPort:
+        port = HybridPort(env, PORT_RATE, batch=True)
+    else:
+        port = Port(env, PORT_RATE)
+    port.out = sink
+    monitor = PortMonitor(env, port, partial(random.expovariate, 1.0),
+                          pkt_in_service_included=True)
+    env.process(source(env, port, n_packets, arrival_rate))
+
+    start = time.perf_counter()
+    env.run(until=n_packets / arrival_rate)
+    if port_type is HybridPort:
+        port.flush()
+    elapsed = time.perf_counter() - start
+
+    waits = sink.waits[0]
+    return elapsed, sum(waits) / len(waits), sum(monitor.sizes) / len(monitor.sizes)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    for rho in (0.4, 0.8, 0.95):
+        arrival_rate = rho * SERVICE_RATE
+        print(f"rho = {rho}: theoretical mean wait {1 / (SERVICE_RATE - arrival_rate):.3f}, "
+              f"mean occupancy {rho / (1 - rho):.3f}")
+
+        elapsed = {}
+        for port_type in (Port, HybridPort):
+            elapsed[port_type], wait, occupancy = run(port_type, n, arrival_rate)
+            print(f"{port_type.__name__:>12}: {elapsed[port_type]:.2f} seconds, "
+                  f"mean wait {wait:.3f}, mean occupancy {occupancy:.3f}")
+
+        print(f"{'speedup':>12}: {elapsed[Port] / elapsed[HybridPort]:.2f}x")
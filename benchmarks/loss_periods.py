@@ -0,0 +1,89 @@
+"""
+Measures the per-packet cost of deciding whether a packet falls in a good or a bad period of a
+Gilbert-Elliott channel with `LossPeriodGenerator`, compared with a copy of its previous
+implementation, which advanced the periods one exponential draw at a time, and checks that both
+make the same decisions.
+
+It also validates a `MarkovLossModel` with three states against the fraction of time that its
+Markov chain spends in each state.
+
+Usage: python benchmarks/loss_periods.py [number of packets]
+"""
+import sys
+import time
+
+import numpy as np
+
+from ns.port.wire import LossPeriodGenerator, MarkovLossModel
+
+
+class LegacyLossPeriodGenerator:
+    """ The previous implementation of `LossPeriodGenerator`. """
+    def __init__(self, seed_b, seed_g, mean_b, mean_g):
+        self.rng_b = np.random.RandomState(seed_b)
+        self.rng_g = np.random.RandomState(seed_g)
+        self.mean_b = mean_b
+        self.mean_g = mean_g
+        self.good_low = 0
+        self.good_high = self.good_low + self.rng_g.exponential(self.mean_g)
+
+    def is_good_period(self, timestamp, begin_transmission):
+        while timestamp >= self.good_high:
+            self.good_low = self.good_high + self.rng_b.exponential(self.mean_b)
+            self.good_high = self.good_low + self.rng_g.exponential(self.mean_g)
+        return (self.good_low <= timestamp < self.good_high
+                and self.good_low <= begin_transmission < self.good_high)
+
+
+def decide(generator, times):
+    """ Returns the decisions for packets transmitted over 1.5 time units ending at `times`,
+        and the time taken per packet in seconds. """
+    start = time.perf_counter()
+    decisions = [generator.is_good_period(t, t - 1.5) for t in times]
+    return decisions, (time.perf_counter() - start) / len(times)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    # packets at a rate of 10 per time unit, so that each period holds a few hundred packets,
+    # and at a rate of 1 per 100 time units, so that tens of periods go by between packets
+    for rate, mean_b, mean_g in [(10, 10, 50), (0.01, 1, 5)]:
+        times = (1.5 + np.cumsum(np.random.default_rng(1).exponential(1 / rate, n))).tolist()
+
+        expected, legacy_cost = decide(LegacyLossPeriodGenerator(1234, 4321, mean_b, mean_g),
+                                       times)
+        decisions, cost = decide(LossPeriodGenerator(1234, 4321, mean_b, mean_g), times)
+        assert decisions == expected
+        print(f"{n:,} packets at a rate of {rate}, mean good period {mean_g}, mean bad "
+              f"period {mean_b}: {1 - sum(decisions) / n:.2%} lost")
+        print(f"    previous LossPeriodGenerator: {legacy_cost * 1e9:.0f} ns per packet")
+        print(f"    LossPeriodGenerator:          {cost * 1e9:.0f} ns per packet "
+              f"({legacy_cost / cost:.1f}x)")
+
+    # good, degraded and bad states: the chain moves from good to degraded, from degraded to
+    # good or bad with equal probabilities, and from bad to good
+    means = [50.0, 10.0, 5.0]
+    transitions = [[0, 1, 0], [0.5, 0, 0.5], [1, 0, 0]]
+    model = MarkovLossModel(means, [0.0, 0.1, 1.0], transitions, seed=1)
+    times = (1.5 + np.cumsum(np.random.default_rng(1).exponential(0.1, n))).tolist()
+    start = time.perf_counter()
+    lost = sum(model.is_lost(t) for t in times)
+    cost = (time.perf_counter() - start) / n
+
+    # the stationary distribution of the embedded chain, weighted by the mean durations
+    embedded = np.array([2, 2, 1]) / 5
+    fractions = embedded * means / np.dot(embedded, means)
+    loss = np.dot(fractions, model.loss_probs)
+    print(f"3-state MarkovLossModel: {cost * 1e9:.0f} ns per packet, {lost / n:.2%} lost "
+          f"(expected {loss:.2%} over a long run)")
+
+    horizon = times[-1]
+    model = MarkovLossModel(means, [0.0, 0.1, 1.0], transitions, seed=1)
+    model.period(horizon)
+    ends = np.array(model.ends)
+    durations = np.diff(ends, prepend=0.0)[ends <= horizon]
+    states = np.array(model.states)[ends <= horizon]
+    observed = [durations[states == s].sum() / durations.sum() for s in range(3)]
+    print("time in each state: " + ", ".join(
+        f"{o:.3f} (expected {e:.3f})" for o, e in zip(observed, fractions)))
@@ -0,0 +1,107 @@
+"""
+Generates the throughput-versus-offered-load curves of a `Medium` shared by many stations, with
+the slotted ALOHA, CSMA, and binary exponential backoff policies, and checks that an idle
+medium does not schedule any event.
+
+Packets arrive at the stations as a Poisson process, and both the offered load G (transmission
+attempts, including retransmissions) and the throughput S are measured in packets per
+transmission time. For slotted ALOHA, S is compared with its theoretical value G e^-G.
+
+Usage: python benchmarks/medium_throughput.py [number of stations] [duration in transmission
+times]
+"""
+import math
+import random
+import sys
+import time
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.port.medium import CSMA, BinaryExponentialBackoff, Medium, SlottedAloha
+
+SIZE = 1000
+RATE = 8000.0
+# the transmission time of a packet
+T = SIZE * 8 / RATE
+PROPAGATION_DELAY = 0.01 * T
+
+
+class CountingEnvironment(simpy.Environment):
+    """ An environment that counts the events it processes. """
+    def __init__(self):
+        super().__init__()
+        self.events = 0
+
+    def step(self):
+        self.events += 1
+        super().step()
+
+
+class Counter:
+    """ A downstream element that only counts the packets it receives. """
+    def __init__(self):
+        self.packets_received = 0
+
+    def put(self, packet):
+        self.packets_received += 1
+
+
+def arrivals(env, medium, arrival_rate, seed):
+    """ Packets arrive at stations chosen uniformly, as a Poisson process. """
+    rng = random.Random(seed)
+    packet_id = 0
+    while True:
+        yield env.timeout(rng.expovariate(arrival_rate))
+        packet_id += 1
+        station = rng.randrange(len(medium.stations))
+        medium.stations[station].put(Packet(env.now, SIZE, packet_id, flow_id=station))
+
+
+POLICIES = {
+    'slotted ALOHA': lambda n: SlottedAloha(T, probability=min(1.0, 2.0 / n)),
+    'CSMA': lambda n: CSMA(T, backoff_window=2 * n),
+    'BEB': lambda n: BinaryExponentialBackoff(2 * PROPAGATION_DELAY),
+}
+
+
+def run(policy, n_stations, load, duration):
+    """ Returns the medium after the run, the number of events, and the wall-clock time. """
+    env = CountingEnvironment()
+    medium = Medium(env,
+                    n_stations,
+                    RATE,
+                    policy,
+                    propagation_delay=PROPAGATION_DELAY,
+                    seed=1)
+    medium.out = Counter()
+    env.process(arrivals(env, medium, load / T, seed=2))
+
+    start = time.perf_counter()
+    env.run(until=duration * T)
+    return medium, env.events, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    duration = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+
+    env = CountingEnvironment()
+    idle = Medium(env, n, RATE, BinaryExponentialBackoff(2 * PROPAGATION_DELAY))
+    assert env.peek() == math.inf
+    env.run(until=duration * T)
+    # the only event processed is the one that stops the simulation
+    print(f"idle medium with {n} stations: {env.events - 1} events in {duration} "
+          f"transmission times")
+
+    for name, make_policy in POLICIES.items():
+        print(f"\n{name}, {n} stations:")
+        print("  new load     G       S   G e^-G  collided  dropped  events/packet  us/event")
+        for load in [0.1, 0.2, 0.4, 0.6, 0.8, 1.0, 1.5, 2.0]:
+            medium, events, elapsed = run(make_policy(n), n, load, duration)
+            G = medium.attempts / duration
+            S = medium.throughput()
+            theory = f"{G * math.exp(-G):8.3f}" if name == 'slotted ALOHA' else " " * 8
+            print(f"  {load:8.1f} {G:7.3f} {S:7.3f} {theory} {medium.packets_collided:9,} "
+                  f"{medium.packets_dropped:8,} {events / max(1, medium.packets_received):14.2f} "
+                  f"{elapsed / events * 1e6:9.2f}")
@@ -0,0 +1,97 @@
+"""
+Compares two ways of replaying a trace with a million flows across the hosts of a network: a
+single `MultiTracePacketGenerator` that reads the whole trace in one pass and dispatches each
+packet to the ingress element of its flow, and one `TracePacketGenerator` per host, each
+replaying its own part of the trace. Reports the simulation events and the packets processed
+per second of wall-clock time.
+
+The hosts are elements that only count the packets they receive.
+
+Usage: python benchmarks/multi_trace.py [number of packets] [number of flows] [number of hosts]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import simpy
+
+from ns.packet.trace_generator import MultiTracePacketGenerator, TracePacketGenerator
+from ns.utils.traces import MAGIC, RECORD_DTYPE
+
+
+class Counter:
+    """ Counts the packets it receives. """
+    def __init__(self):
+        self.packets_received = 0
+
+    def put(self, packet):
+        self.packets_received += 1
+
+
+def write_trace(filename, records):
+    """ Writes records into a binary trace. """
+    with open(filename, 'wb') as file:
+        file.write(MAGIC)
+        records.tofile(file)
+
+
+def make_records(n_packets, n_flows, rng):
+    """ Returns the records of a trace with Poisson arrivals and uniformly chosen flows. """
+    records = np.empty(n_packets, dtype=RECORD_DTYPE)
+    records['flow_id'] = rng.integers(0, n_flows, n_packets)
+    records['packet_id'] = np.arange(n_packets)
+    records['time'] = np.cumsum(rng.exponential(1e-5, n_packets))
+    records['size'] = rng.integers(64, 1500, n_packets)
+    return records
+
+
+def run(env, hosts):
+    """ Returns the number of events and packets processed per second. """
+    events = 0
+    start = time.perf_counter()
+    while True:
+        try:
+            env.step()
+        except simpy.core.EmptySchedule:
+            break
+        events += 1
+    elapsed = time.perf_counter() - start
+
+    packets = sum(host.packets_received for host in hosts)
+    return events / elapsed, packets / elapsed, elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000000
+    n_flows = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    n_hosts = int(sys.argv[3]) if len(sys.argv) > 3 else 128
+
+    rng = np.random.default_rng(1)
+    records = make_records(n, n_flows, rng)
+    flow_hosts = rng.integers(0, n_hosts, n_flows)
+
+    with tempfile.TemporaryDirectory() as directory:
+        trace = os.path.join(directory, 'trace.bin')
+        write_trace(trace, records)
+
+        env = simpy.Environment()
+        hosts = [Counter() for __ in range(n_hosts)]
+        outs = {flow_id: hosts[host] for flow_id, host in enumerate(flow_hosts.tolist())}
+        MultiTracePacketGenerator(env, "mtg", trace, outs)
+        events, packets, elapsed = run(env, hosts)
+        print(f"One multi-flow generator:  {events:,.0f} events/second, "
+              f"{packets:,.0f} packets/second ({elapsed:.1f} seconds)")
+
+        env = simpy.Environment()
+        hosts = [Counter() for __ in range(n_hosts)]
+        record_hosts = flow_hosts[records['flow_id']]
+        for host in range(n_hosts):
+            host_trace = os.path.join(directory, f"host_{host}.bin")
+            write_trace(host_trace, records[record_hosts == host])
+            generator = TracePacketGenerator(env, f"tg_{host}", host_trace)
+            generator.out = hosts[host]
+        events, packets, elapsed = run(env, hosts)
+        print(f"One generator per host:    {events:,.0f} events/second, "
+              f"{packets:,.0f} packets/second ({elapsed:.1f} seconds)")
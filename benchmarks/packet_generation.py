@@ -0,0 +1,53 @@
+"""
+Measures the rate at which a `DistPacketGenerator` generates packets, in packets per second of
+wall-clock time, when its inter-arrival times and sizes are drawn by Python functions once per
+packet, and when they are drawn in NumPy blocks from named distributions.
+
+The packets are sent to an element that only counts them.
+
+Usage: python benchmarks/packet_generation.py [number of packets]
+"""
+import random
+import sys
+import time
+from functools import partial
+
+import simpy
+
+from ns.packet.dist_generator import DistPacketGenerator
+
+
+class Counter:
+    """ Counts the packets it receives. """
+    def __init__(self):
+        self.packets_received = 0
+
+    def put(self, packet):
+        self.packets_received += 1
+
+
+def run(n_packets, arrival_dist, size_dist, **kwargs):
+    """ Returns the number of packets generated per second. """
+    env = simpy.Environment()
+    generator = DistPacketGenerator(env, "pg", arrival_dist, size_dist, **kwargs)
+    generator.out = Counter()
+
+    start = time.perf_counter()
+    env.run(until=n_packets)
+    elapsed = time.perf_counter() - start
+
+    return generator.packets_sent / elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    random.seed(1)
+    rate = run(n, partial(random.expovariate, 1.0), partial(random.expovariate, 0.01))
+    print(f"Python functions:   {rate:,.0f} packets/second")
+
+    rate = run(n, ('exponential', {'scale': 1.0}), ('exponential', {'scale': 100.0}), seed=1)
+    print(f"Named distributions: {rate:,.0f} packets/second")
+
+    rate = run(n, ('pareto', {'a': 2.0}), ('lognormal', {'mean': 4.0, 'sigma': 1.0}), seed=1)
+    print(f"Pareto / lognormal: {rate:,.0f} packets/second")
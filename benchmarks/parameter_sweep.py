@@ -0,0 +1,76 @@
+"""
+Measures the wall-clock time of a parameter sweep of an M/M/1/K queue (buffer size x load)
+run by `ns.experiment.runner.Sweep`, in the current process and across a pool with one worker
+process per processor, and checks that both produce the same estimates, up to the order in which
+the summaries are aggregated.
+
+Usage: python benchmarks/parameter_sweep.py [number of replications]
+"""
+import math
+import os
+import random
+import sys
+import time
+
+import simpy
+
+from ns.experiment.runner import Sweep
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.port.port import Port
+
+
+def source(env, out, arrival_rate):
+    """ Sends packets with exponential inter-arrival times and sizes. """
+    packet_id = 0
+    while True:
+        yield env.timeout(random.expovariate(arrival_rate))
+        packet_id += 1
+        out.put(Packet(env.now, random.expovariate(0.01), packet_id, flow_id=0))
+
+
+def scenario(seed, buffer_size, load, duration=20000):
+    """ Runs an M/M/1/K queue, and returns its loss rate and mean delay. """
+    env = simpy.Environment()
+    sink = PacketSink(env, rec_arrivals=False)
+    port = Port(env, 1000.0, qlimit=buffer_size)
+    port.out = sink
+    env.process(source(env, port, load * 1.25))
+    env.run(until=duration)
+
+    waits = sink.waits[0]
+    return {
+        'loss_rate': port.packets_dropped / port.packets_received,
+        'mean_delay': sum(waits) / len(waits)
+    }
+
+
+def run(replications, max_workers):
+    """ Returns the estimates of the sweep, and its wall-clock time in seconds. """
+    sweep = Sweep(scenario, {
+        'buffer_size': [5, 20, 100],
+        'load': [0.5, 0.8, 0.95]
+    },
+                  replications=replications,
+                  seed=1,
+                  max_workers=max_workers)
+
+    start = time.perf_counter()
+    estimates = sweep.run()
+    return estimates, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+
+    serial, serial_time = run(n, max_workers=1)
+    print(f"1 process:    {serial_time:.1f} seconds")
+
+    parallel, parallel_time = run(n, max_workers=None)
+    print(f"{os.cpu_count()} processes: {parallel_time:.1f} seconds "
+          f"({serial_time / parallel_time:.2f}x)")
+
+    for (params, metrics), (__, parallel_metrics) in zip(serial, parallel):
+        assert all(math.isclose(metrics[m].mean, parallel_metrics[m].mean) for m in metrics)
+        print(", ".join(f"{name} = {value}" for name, value in params.items()) + ": " +
+              ", ".join(f"{metric} {estimate}" for metric, estimate in metrics.items()))
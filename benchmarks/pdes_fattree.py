@@ -0,0 +1,123 @@
+"""
+Measures the wall-clock time of a fat-tree simulation run in a single partition, and split by
+pods into several partitions with `ns.parallel.pdes.ParallelSimulation`, each partition in its
+own process.
+
+Every link carries a propagation delay, which is the lookahead of the parallel simulation.
+Flows follow random shortest paths between random pairs of hosts, and the traffic of each flow
+is drawn from its own random number generator, so that every partitioning delivers exactly the
+same packets, which is checked at the end.
+
+Usage: python benchmarks/pdes_fattree.py [k] [number of flows] [simulation time] [partitions]
+"""
+import random
+import sys
+import time
+
+import networkx as nx
+
+from ns.flow.flow import Flow
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.parallel.pdes import ParallelSimulation
+from ns.switch.switch import SimplePacketSwitch
+from ns.topos.fattree import build as build_fattree
+from ns.topos.fattree import partition as partition_fattree
+from ns.topos.utils import generate_fib
+
+LINK_DELAY = 0.001
+
+
+def source(env, out, flow_id, rng, rate, mean_size=1000.0):
+    """ Sends packets of a flow with exponential inter-arrival times and sizes. """
+    packet_id = 0
+    while True:
+        yield env.timeout(rng.expovariate(rate))
+        packet_id += 1
+        out.put(Packet(env.now, rng.expovariate(1.0 / mean_size), packet_id, flow_id=flow_id))
+
+
+def builder(partition, k, n_flows, port_rate=1e8, buffer_size=1000, seed=1):
+    """ Builds the switches, sources and sinks of the fat tree in a partition. """
+    env = partition.env
+    ft = build_fattree(k)
+    owner = partition_fattree(ft, partition.n_partitions)
+
+    # every partition draws the same flows
+    rng = random.Random(seed)
+    hosts = sorted(n for n in ft.nodes() if ft.nodes[n]['type'] == 'host')
+    flows = {}
+    for flow_id in range(n_flows):
+        src, dst = rng.sample(hosts, 2)
+        flows[flow_id] = Flow(flow_id, src, dst)
+        flows[flow_id].path = rng.choice(list(nx.all_shortest_paths(ft, src, dst)))
+    ft = generate_fib(ft, flows)
+
+    local_nodes = [n for n in ft.nodes() if owner[n] == partition.partition_id]
+    for node_id in local_nodes:
+        node = ft.nodes[node_id]
+        node['device'] = SimplePacketSwitch(env,
+                                            len(node['port_to_nexthop']),
+                                            port_rate,
+                                            buffer_size,
+                                            element_id=f"{node_id}")
+        node['device'].demux.fib = node['flow_to_port']
+        partition.register(node_id, node['device'])
+
+    for node_id in local_nodes:
+        node = ft.nodes[node_id]
+        for port_number, next_hop in node['port_to_nexthop'].items():
+            node['device'].ports[port_number].out = partition.link(
+                owner[next_hop], next_hop, LINK_DELAY)
+
+    sinks = {}
+    for flow_id, flow in flows.items():
+        rate = 1000 + 1000 * rng.random()
+        if owner[flow.src] == partition.partition_id:
+            env.process(
+                source(env, ft.nodes[flow.src]['device'], flow_id,
+                       random.Random(seed * n_flows + flow_id), rate))
+        if owner[flow.dst] == partition.partition_id:
+            sinks[flow_id] = PacketSink(env, rec_arrivals=False, rec_waits=False)
+            ft.nodes[flow.dst]['device'].demux.ends[flow_id] = sinks[flow_id]
+
+    return lambda: {flow_id: sink.packets_received[flow_id] for flow_id, sink in sinks.items()}
+
+
+def run(k, n_flows, until, n_partitions):
+    """ Returns the packets received by each flow, and the wall-clock time of the run. """
+    simulation = ParallelSimulation(builder,
+                                    n_partitions,
+                                    LINK_DELAY,
+                                    params={
+                                        'k': k,
+                                        'n_flows': n_flows
+                                    },
+                                    processes=n_partitions > 1)
+    start = time.perf_counter()
+    summaries = simulation.run(until)
+    elapsed = time.perf_counter() - start
+
+    received = {}
+    for summary in summaries:
+        received.update(summary)
+    return received, elapsed, simulation
+
+
+if __name__ == '__main__':
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    until = float(sys.argv[3]) if len(sys.argv) > 3 else 0.5
+    partitions = int(sys.argv[4]) if len(sys.argv) > 4 else 4
+
+    baseline, elapsed, __ = run(k, n, until, 1)
+    print(f"1 partition:  {elapsed:.1f} seconds, "
+          f"{sum(baseline.values()):,} packets received")
+
+    received, elapsed_parallel, simulation = run(k, n, until, partitions)
+    print(f"{partitions} partitions: {elapsed_parallel:.1f} seconds, "
+          f"{sum(received.values()):,} packets received, {simulation.windows:,} windows, "
+          f"{simulation.messages:,} packets across partitions "
+          f"({elapsed / elapsed_parallel:.2f}x)")
+
+    assert received == baseline, "the partitions delivered different packets"
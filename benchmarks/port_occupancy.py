@@ -0,0 +1,59 @@
+"""
+Measures the per-packet cost of an overloaded egress port that runs with
+`zero_downstream_buffer`, as every egress port in a `FairPacketSwitch` does.
+
+Packets arrive at twice the rate of the downstream WFQ server, so that the buffer of the port
+stays full during the run. If the cost of enqueueing a packet does not depend on the occupancy
+of the buffer, the time per packet should stay constant as the buffer size grows.
+
+Usage: python benchmarks/port_occupancy.py [number of packets]
+"""
+import sys
+import time
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.port.port import Port
+from ns.scheduler.wfq import WFQServer
+
+
+def source(env, out, n_packets, interval, size=1000):
+    """ Sends `n_packets` packets of a fixed size at a fixed interval. """
+    for packet_id in range(n_packets):
+        yield env.timeout(interval)
+        out.put(Packet(env.now, size, packet_id, flow_id=packet_id % 2))
+
+
+def run(n_packets, buffer_size, rate=8000.0):
+    """ Returns the wall-clock time spent per offered packet, in microseconds. """
+    env = simpy.Environment()
+    port = Port(env,
+                rate=0,
+                qlimit=buffer_size,
+                limit_bytes=False,
+                zero_downstream_buffer=True)
+    server = WFQServer(env, rate=rate, weights=[1, 1], zero_buffer=True)
+    sink = PacketSink(env)
+
+    port.out = server
+    server.out = sink
+
+    # packets of 1000 bytes are offered at twice the rate of the server
+    interval = 1000 * 8.0 / rate / 2
+    env.process(source(env, port, n_packets, interval))
+
+    start = time.perf_counter()
+    env.run()
+    elapsed = time.perf_counter() - start
+
+    return elapsed / n_packets * 1e6
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    for buffer_size in (10, 100, 1000):
+        print(f"buffer_size={buffer_size:>5}: "
+              f"{run(n, buffer_size):.2f} microseconds/packet")
@@ -0,0 +1,62 @@
+"""
+Measures the memory retained per packet by a `PacketSink`, and the time spent per packet, when
+it records its measurements in Python lists (the default) and in columnar mode.
+
+Each packet is stamped by three hops before it arrives at the sink, as it would be after
+crossing three switch ports, and is discarded after it has been recorded.
+
+Usage: python benchmarks/sink_memory.py [number of packets]
+"""
+import sys
+import time
+import tracemalloc
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+
+
+def source(env, sink, n_packets, n_flows=4, interval=1.0):
+    """ Sends `n_packets` packets, each stamped by three hops, directly to the sink. """
+    for packet_id in range(n_packets):
+        packet = Packet(env.now, 1000, packet_id, flow_id=packet_id % n_flows)
+        for hop in range(3):
+            packet.perhop_time[f"switch_{hop}"] = env.now + 0.1 * hop
+        yield env.timeout(interval)
+        sink.put(packet)
+
+
+def run(n_packets, columnar):
+    """ Returns the sink after recording `n_packets` packets, and the time per packet in
+        microseconds. """
+    env = simpy.Environment()
+    sink = PacketSink(env, columnar=columnar)
+    env.process(source(env, sink, n_packets))
+
+    start = time.perf_counter()
+    env.run()
+    elapsed = time.perf_counter() - start
+
+    return sink, elapsed / n_packets * 1e6
+
+
+def memory_per_packet(n_packets, columnar):
+    """ Returns the memory retained by the sink per packet, in bytes. """
+    tracemalloc.start()
+    sink, __ = run(n_packets, columnar)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del sink
+    return retained / n_packets
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500000
+
+    for mode in (False, True):
+        memory = memory_per_packet(n, columnar=mode)
+        __, cost = run(n, columnar=mode)
+        print(f"columnar={mode!s:>5}: {memory:.1f} bytes/packet retained, "
+              f"{cost:.2f} microseconds/packet")
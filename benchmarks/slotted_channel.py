@@ -0,0 +1,129 @@
+"""
+Compares the wall-clock time of a slotted network with many stations built with one `Slot` per
+station feeding a shared `Wire`, in which every station wakes up at every slot, and with a
+single `SlottedChannel`, which only wakes up at the slots in which stations transmit, and checks
+that both see the same collisions.
+
+It also runs 1000 saturated stations with slotted ALOHA and with TDMA over many slots, and
+compares the throughput of slotted ALOHA with N p (1 - p)^(N - 1).
+
+Usage: python benchmarks/slotted_channel.py [number of stations] [number of slots]
+"""
+import random
+import sys
+import time
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.port.slot import Slot
+from ns.port.slotted_channel import SlottedChannel
+from ns.port.wire import Wire
+
+SLOT = 1.5
+
+
+class Counter:
+    """ A downstream element that only counts the packets it receives. """
+    def __init__(self):
+        self.packets_received = 0
+
+    def put(self, packet):
+        self.packets_received += 1
+
+
+class Refill:
+    """ A downstream element that sends a new packet to each station whose packet it receives,
+        so that the stations always have a packet to send. """
+    def __init__(self, channel):
+        self.channel = channel
+
+    def put(self, packet):
+        self.channel.stations[packet.flow_id].put(
+            Packet(self.channel.env.now, 100, packet.packet_id + 1, flow_id=packet.flow_id))
+
+
+def arrivals(env, stations, load, seed):
+    """ Sends packets to random stations as a Poisson process with `load` packets per slot. """
+    rng = random.Random(seed)
+    packet_id = 0
+    while True:
+        yield env.timeout(rng.expovariate(load / SLOT))
+        packet_id += 1
+        station = rng.randrange(len(stations))
+        stations[station].put(Packet(env.now, 100, packet_id, flow_id=station))
+
+
+def run_slots(n_stations, n_slots, load):
+    """ Runs one `Slot` per station, all feeding the same `Wire`. """
+    env = simpy.Environment()
+    wire = Wire(env, lambda: 0)
+    wire.out = Counter()
+    slots = [Slot(env, 1, 100, slot_duration=SLOT) for __ in range(n_stations)]
+    for slot in slots:
+        slot.out = wire
+    env.process(arrivals(env, slots, load, seed=1))
+
+    start = time.perf_counter()
+    env.run(until=(n_slots + 0.5) * SLOT)
+    return wire, time.perf_counter() - start
+
+
+def run_channel(n_stations, n_slots, load):
+    """ Runs a `SlottedChannel` shared by the stations. """
+    env = simpy.Environment()
+    channel = SlottedChannel(env, n_stations, slot_duration=SLOT)
+    channel.out = Counter()
+    env.process(arrivals(env, channel.stations, load, seed=1))
+
+    start = time.perf_counter()
+    env.run(until=(n_slots + 0.5) * SLOT)
+    return channel, time.perf_counter() - start
+
+
+def saturated(n_stations, n_slots, mode, probability=1.0):
+    """ Runs stations that always have a packet to send, and returns the fraction of slots
+        with a successful transmission and the wall-clock time of the run. """
+    env = simpy.Environment()
+    channel = SlottedChannel(env,
+                             n_stations,
+                             slot_duration=SLOT,
+                             mode=mode,
+                             probability=probability,
+                             retransmit=True,
+                             seed=1)
+    channel.out = Refill(channel)
+    for station in channel.stations:
+        station.put(Packet(0, 100, 0, flow_id=station.station_id))
+
+    start = time.perf_counter()
+    env.run(until=(n_slots + 0.5) * SLOT)
+    return channel.packets_sent / n_slots, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    slots = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    for load in [0.1, 1.0]:
+        wire, slots_elapsed = run_slots(n, slots, load)
+        channel, channel_elapsed = run_channel(n, slots, load)
+        print(f"{n} stations, {slots:,} slots, {load} packets per slot: "
+              f"{channel.packets_sent:,} sent, {channel.collisions:,} collisions")
+        print(f"    Slot per station and Wire: {slots_elapsed:.2f} seconds")
+        print(f"    SlottedChannel:            {channel_elapsed:.3f} seconds "
+              f"({slots_elapsed / channel_elapsed:.0f}x)")
+
+        assert wire.collision_sizes == channel.collision_sizes
+        assert wire.slots - wire.collisions == channel.packets_sent
+
+    n_slots = 100 * slots
+    p = 1 / n
+    throughput, elapsed = saturated(n, n_slots, 'aloha', p)
+    print(f"{n} saturated stations, {n_slots:,} slots, slotted ALOHA with p = 1/{n}: "
+          f"throughput {throughput:.4f} (expected {n * p * (1 - p)**(n - 1):.4f}), "
+          f"{elapsed:.2f} seconds")
+
+    throughput, elapsed = saturated(n, n_slots // 10, 'tdma')
+    print(f"{n} saturated stations, {n_slots // 10:,} slots, TDMA: "
+          f"throughput {throughput:.4f}, {elapsed:.2f} seconds")
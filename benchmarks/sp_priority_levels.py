@@ -0,0 +1,52 @@
+"""
+Measures the throughput of an `SPServer` with 8 and 64 priority levels.
+
+Packets are offered at twice the rate of the server, with most of the traffic in the lowest
+priority levels, so that the server spends the run backlogged and has to look past the empty
+high-priority levels to find the next packet.
+
+Usage: python benchmarks/sp_priority_levels.py [number of packets]
+"""
+import random
+import sys
+import time
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.scheduler.sp import SPServer
+
+
+def source(env, out, n_packets, n_levels, interval, size=1000):
+    """ Sends `n_packets` packets of a fixed size, mostly in the lowest priority levels. """
+    for packet_id in range(n_packets):
+        yield env.timeout(interval)
+        flow_id = min(int(random.expovariate(1.0)), n_levels - 1)
+        out.put(Packet(env.now, size, packet_id, flow_id=flow_id))
+
+
+def run(n_packets, n_levels, rate=8000.0):
+    """ Returns the number of packets sent by the server per second of wall-clock time. """
+    random.seed(42)
+    env = simpy.Environment()
+    # flow 0 has the lowest priority
+    server = SPServer(env, rate=rate, priorities=list(range(n_levels)))
+    sink = PacketSink(env)
+    server.out = sink
+
+    interval = 1000 * 8.0 / rate / 2
+    env.process(source(env, server, n_packets, n_levels, interval))
+
+    start = time.perf_counter()
+    env.run()
+    elapsed = time.perf_counter() - start
+
+    return sum(sink.packets_received.values()) / elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    for levels in (8, 64):
+        print(f"{levels:>3} priority levels: {run(n, levels):,.0f} packets/second")
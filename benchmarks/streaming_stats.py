@@ -0,0 +1,72 @@
+"""
+Compares the memory used to report tail latency and queue lengths in an M/M/1 queue, when the
+`PacketSink` and the `PortMonitor` record every sample, and when they feed streaming summaries
+from `ns.utils.stats` instead. Also reports the estimated and exact 99th percentiles.
+
+Usage: python benchmarks/streaming_stats.py [number of packets]
+"""
+import random
+import sys
+import tracemalloc
+from functools import partial
+
+import numpy as np
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.port.monitor import PortMonitor
+from ns.port.port import Port
+from ns.utils.stats import StreamingSummary
+
+
+def source(env, out, n_packets):
+    """ Sends `n_packets` packets with exponential inter-arrival times and sizes. """
+    for packet_id in range(n_packets):
+        yield env.timeout(random.expovariate(0.9))
+        out.put(Packet(env.now, random.expovariate(0.001), packet_id, flow_id=0))
+
+
+def run(n_packets, streaming):
+    """ Returns the sink, the monitor, and the memory they retain in bytes. """
+    random.seed(42)
+    env = simpy.Environment()
+
+    if streaming:
+        sink = PacketSink(env,
+                          rec_arrivals=False,
+                          rec_waits=False,
+                          wait_summary=StreamingSummary)
+    else:
+        sink = PacketSink(env)
+
+    port = Port(env, rate=8000.0)
+    port.out = sink
+    monitor = PortMonitor(env,
+                          port,
+                          partial(random.expovariate, 1.0),
+                          rec_sizes=not streaming,
+                          size_summary=StreamingSummary if streaming else None)
+    env.process(source(env, port, n_packets))
+
+    tracemalloc.start()
+    env.run(until=n_packets / 0.9)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return sink, monitor, retained
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    sink, monitor, memory = run(n, streaming=False)
+    exact_wait = np.percentile(sink.waits[0], 99)
+    exact_size = np.percentile(monitor.sizes, 99)
+    print(f"Recording all samples: {memory / 1e6:.1f} MB, "
+          f"p99 wait {exact_wait:.3f}, p99 queue length {exact_size:.1f}")
+
+    sink, monitor, memory = run(n, streaming=True)
+    print(f"Streaming summaries:   {memory / 1e6:.1f} MB, "
+          f"p99 wait {sink.wait_summaries[0].quantile(0.99):.3f}, "
+          f"p99 queue length {monitor.size_summary.quantile(0.99):.1f}")
@@ -0,0 +1,81 @@
+"""
+Measures the per-packet cost of `WFQServer` and `VirtualClockServer`, which keep their packets
+in a `TaggedStore`, in the scenario of `examples/wfq.py` and `examples/virtual_clock.py`: two
+flows of 1000-byte packets, with the second flow starting later, sharing a server whose rate is
+that of one flow. The scenario is run for much longer than in the examples.
+
+Each server is measured both on its own and with `zero_downstream_buffer` turned on, in which
+case a downstream element with a zero buffer removes each packet from the server's store after
+it has been sent.
+
+Usage: python benchmarks/tagged_store.py [number of packets per flow]
+"""
+import sys
+import time
+from functools import partial
+from random import expovariate
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.scheduler.monitor import ServerMonitor
+from ns.scheduler.virtual_clock import VirtualClockServer
+from ns.scheduler.wfq import WFQServer
+
+
+class ZeroBufferSink(PacketSink):
+    """ A packet sink with a zero buffer, which pulls each packet out of its upstream store. """
+
+    def put(self, packet, upstream_update=None, upstream_store=None):
+        """ Sends a packet to this element. """
+        if upstream_store is not None:
+            upstream_store.get()
+            upstream_update(packet)
+        super().put(packet)
+
+
+def source(env, out, n_packets, flow_id, initial_delay, interval=1.75, size=1000.0):
+    """ Sends `n_packets` packets of a fixed size at a fixed interval. """
+    yield env.timeout(initial_delay)
+    for packet_id in range(n_packets):
+        yield env.timeout(interval)
+        out.put(Packet(env.now, size, packet_id, flow_id=flow_id))
+
+
+def run(n_packets, server_type, zero_downstream_buffer):
+    """ Returns the wall-clock time spent per packet, in microseconds. """
+    env = simpy.Environment()
+    source_rate = 8.0 * 1000.0 / 1.75
+
+    if server_type == 'WFQ':
+        server = WFQServer(env,
+                           source_rate, [1, 2],
+                           zero_downstream_buffer=zero_downstream_buffer)
+    else:
+        server = VirtualClockServer(env,
+                                    source_rate, [2, 1],
+                                    zero_downstream_buffer=zero_downstream_buffer)
+
+    ServerMonitor(env, server, partial(expovariate, 0.1), pkt_in_service_included=True)
+    server.out = ZeroBufferSink(env) if zero_downstream_buffer else PacketSink(env)
+
+    env.process(source(env, server, n_packets, 0, 0.0))
+    env.process(source(env, server, n_packets, 1, 10.0))
+
+    # the server is twice as slow as the two flows combined, and drains its backlog by then
+    start = time.perf_counter()
+    env.run(until=2 * n_packets * 1.75 + 20.0)
+    elapsed = time.perf_counter() - start
+
+    return elapsed / (2 * n_packets) * 1e6
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    for server_type in ('WFQ', 'VirtualClock'):
+        for zero_downstream_buffer in (False, True):
+            cost = run(n, server_type, zero_downstream_buffer)
+            print(f"{server_type:>12}, zero_downstream_buffer={zero_downstream_buffer!s:>5}: "
+                  f"{cost:.2f} microseconds/packet")
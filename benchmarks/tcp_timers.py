@@ -0,0 +1,100 @@
+"""
+Measures the number of SimPy events per acknowledged segment of many TCP flows sharing an
+environment, with the retransmission timers of `TCPPacketGenerator` held by the shared timing
+wheel (with `timer_resolution` given), either one per segment or one per flow (the single-RTO
+mode), and with the default exact-time timers, which start a `Timer` with its own SimPy process
+for every segment sent.
+
+Each flow runs over a link with a fixed delay in each direction, so that all the timers are
+stopped before they expire, and each `Timer` process still wakes up at its original expiry.
+
+Usage: python benchmarks/tcp_timers.py [number of flows] [segments per flow]
+"""
+import random
+import sys
+import time
+
+import simpy
+
+from ns.flow.cc import TCPReno
+from ns.flow.flow import Flow
+from ns.packet.tcp_generator import TCPPacketGenerator
+from ns.packet.tcp_sink import TCPSink
+DELAY = 0.05
+MSS = 512
+RESOLUTION = 0.001
+
+
+class CountingEnvironment(simpy.Environment):
+    """ An environment that counts the events it processes. """
+    def __init__(self):
+        super().__init__()
+        self.events = 0
+
+    def step(self):
+        self.events += 1
+        super().step()
+
+
+class Link:
+    """ Delivers packets after a fixed delay. """
+    def __init__(self, env, delay):
+        self.env = env
+        self.delay = delay
+        self.out = None
+
+    def put(self, packet):
+        self.env.timeout(self.delay).callbacks.append(lambda event: self.out.put(packet))
+
+
+def run(mode, n_flows, n_segments):
+    """ Returns the number of acknowledged segments, the number of events, the number of
+        wakeups of the timing wheel, and the wall-clock time of the run. """
+    env = CountingEnvironment()
+    rng = random.Random(1)
+    senders = []
+
+    for fid in range(n_flows):
+        flow = Flow(fid=fid,
+                    src=fid,
+                    dst=fid,
+                    size=n_segments * MSS,
+                    start_time=rng.uniform(0, 1),
+                    finish_time=1e9)
+        if mode == 'Timer':
+            sender = TCPPacketGenerator(env, flow, TCPReno(), rtt_estimate=4 * DELAY)
+        else:
+            sender = TCPPacketGenerator(env,
+                                        flow,
+                                        TCPReno(),
+                                        rtt_estimate=4 * DELAY,
+                                        single_rto=mode == 'single RTO',
+                                        timer_resolution=RESOLUTION)
+        sink = TCPSink(env, rec_arrivals=False, rec_waits=False, rec_flow_ids=False)
+
+        sender.out = Link(env, DELAY)
+        sender.out.out = sink
+        sink.out = Link(env, DELAY)
+        sink.out.out = sender
+        senders.append(sender)
+
+    start = time.perf_counter()
+    env.run(until=600)
+    elapsed = time.perf_counter() - start
+
+    acked = sum(sender.last_ack for sender in senders) // MSS
+    wakeups = senders[0].wheel.wakeups if senders[0].wheel is not None else 0
+    return acked, env.events, wakeups, elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    segments = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    print(f"{n} flows of {segments} segments")
+    for timer_mode in ['Timer', 'timer wheel', 'single RTO']:
+        acked_segments, events, wakeups, seconds = run(timer_mode, n, segments)
+        print(f"  {timer_mode:12s} {acked_segments:8,} segments acknowledged, "
+              f"{events / acked_segments:6.2f} events per segment, "
+              f"{wakeups / acked_segments:6.3f} timer wakeups per segment, "
+              f"{seconds:6.2f} s")
@@ -0,0 +1,82 @@
+"""
+Measures the rate at which a `TracePacketGenerator` reads and replays a trace, in packets per
+second of wall-clock time, from a text trace, a gzip-compressed text trace, and the equivalent
+binary trace produced by `ns.utils.traces.convert()`.
+
+A synthetic trace with four flows is written to a temporary directory first. The packets are
+sent to an element that only counts them.
+
+Usage: python benchmarks/trace_replay.py [number of packets]
+"""
+import gzip
+import os
+import random
+import sys
+import tempfile
+import time
+
+import simpy
+
+from ns.packet.trace_generator import TracePacketGenerator
+from ns.utils.traces import convert
+
+
+class Counter:
+    """ Counts the packets it receives. """
+    def __init__(self):
+        self.packets_received = 0
+
+    def put(self, packet):
+        self.packets_received += 1
+
+
+def write_trace(filename, n_packets, opener=open):
+    """ Writes a text trace of `n_packets` packets with exponential inter-arrival times. """
+    random.seed(1)
+    now = 0.0
+    with opener(filename, 'wt') as file:
+        for packet_id in range(n_packets):
+            now += random.expovariate(1.0)
+            file.write(f"{packet_id % 4} {packet_id} {now:.6f} "
+                       f"{random.randint(64, 1500)}\n")
+
+
+def replay(filename):
+    """ Returns the number of packets read per second, without running the simulation, and
+        the number of packets replayed per second. """
+    env = simpy.Environment()
+    generator = TracePacketGenerator(env, "tg", filename)
+
+    start = time.perf_counter()
+    n_packets = sum(1 for __ in generator.records())
+    read_rate = n_packets / (time.perf_counter() - start)
+
+    generator.out = Counter()
+    start = time.perf_counter()
+    env.run()
+    elapsed = time.perf_counter() - start
+
+    return read_rate, generator.packets_sent / elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    with tempfile.TemporaryDirectory() as directory:
+        text = os.path.join(directory, 'trace.txt')
+        compressed = os.path.join(directory, 'trace.txt.gz')
+        binary = os.path.join(directory, 'trace.bin')
+
+        write_trace(text, n)
+        write_trace(compressed, n, opener=gzip.open)
+
+        start = time.perf_counter()
+        convert(text, binary)
+        print(f"Conversion: {n / (time.perf_counter() - start):,.0f} packets/second, "
+              f"{os.path.getsize(text) / n:.1f} -> {os.path.getsize(binary) / n:.1f} "
+              f"bytes/packet")
+
+        for name, filename in (('text', text), ('gzip text', compressed), ('binary', binary)):
+            read_rate, replay_rate = replay(filename)
+            print(f"{name:>10}: read {read_rate:,.0f} packets/second, "
+                  f"replayed {replay_rate:,.0f} packets/second")
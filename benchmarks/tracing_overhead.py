@@ -0,0 +1,58 @@
+"""
+Measures the simulation throughput of a simple chain of elements (a packet source, a Port, a
+Wire and a PacketSink), with tracing turned off and on. Anything written to stdout is
+discarded, so that the numbers reflect the cost of producing the output rather than the speed
+of the terminal.
+
+Usage: python benchmarks/tracing_overhead.py [number of packets]
+"""
+import contextlib
+import os
+import sys
+import time
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.port.port import Port
+from ns.port.wire import Wire
+
+
+def source(env, out, n_packets, interval=2.0, size=1000):
+    """ Sends `n_packets` packets of a fixed size at a fixed interval. """
+    for packet_id in range(n_packets):
+        yield env.timeout(interval)
+        out.put(Packet(env.now, size, packet_id, flow_id=0))
+
+
+def run(n_packets, debug):
+    """ Returns the number of simulation events processed per second. """
+    env = simpy.Environment()
+    port = Port(env, rate=10**6, debug=debug)
+    wire = Wire(env, lambda: 0.1, loss_dist=lambda packet_id: 0.0, debug=debug)
+    sink = PacketSink(env, debug=debug)
+
+    port.out = wire
+    wire.out = sink
+    env.process(source(env, port, n_packets))
+
+    events = 0
+    start = time.perf_counter()
+    while env.peek() < float('inf'):
+        env.step()
+        events += 1
+    elapsed = time.perf_counter() - start
+
+    return events / elapsed
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        quiet = run(n, debug=False)
+        verbose = run(n, debug=True)
+
+    print(f"Tracing disabled: {quiet:,.0f} events/second")
+    print(f"Tracing enabled:  {verbose:,.0f} events/second")
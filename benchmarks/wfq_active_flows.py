@@ -0,0 +1,51 @@
+"""
+Measures the per-packet cost of a `WFQServer` as the number of concurrently active flows grows.
+
+Packets are offered round-robin over all the flows at twice the rate of the server, so that
+every flow stays backlogged and remains in the active set during the run. The flows are mapped
+to classes through `flow_classes`, as in class-based WFQ.
+
+Usage: python benchmarks/wfq_active_flows.py [number of packets]
+"""
+import sys
+import time
+
+import simpy
+
+from ns.packet.packet import Packet
+from ns.packet.sink import PacketSink
+from ns.scheduler.wfq import WFQServer
+
+
+def source(env, out, n_packets, n_flows, interval, size=1000):
+    """ Sends `n_packets` packets of a fixed size, round-robin over `n_flows` flows. """
+    for packet_id in range(n_packets):
+        yield env.timeout(interval)
+        out.put(Packet(env.now, size, packet_id, flow_id=packet_id % n_flows))
+
+
+def run(n_packets, n_flows, rate=8000.0):
+    """ Returns the wall-clock time spent per offered packet, in microseconds. """
+    env = simpy.Environment()
+    weights = {queue_id: 1 + queue_id % 4 for queue_id in range(n_flows)}
+    server = WFQServer(env,
+                       rate=rate,
+                       weights=weights,
+                       flow_classes=lambda flow_id: flow_id % n_flows)
+    server.out = PacketSink(env)
+
+    interval = 1000 * 8.0 / rate / 2
+    env.process(source(env, server, n_packets, n_flows, interval))
+
+    start = time.perf_counter()
+    env.run()
+    elapsed = time.perf_counter() - start
+
+    return elapsed / n_packets * 1e6
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    for flows in (4, 16, 64, 256, 1024):
+        print(f"{flows:>5} active flows: {run(n, flows):.2f} microseconds/packet")
@@ -0,0 +1,171 @@
+"""
+Measures the per-packet cost of a `Wire` shared by many stations that transmit in the same
+slots, as in slotted ALOHA, and validates the collision statistics of the wire against the
+binomial distribution of the number of stations that transmit in a slot.
+
+The wire is compared with a copy of its previous implementation, which scanned every pending
+packet to find the colliding ones, and dropped two packets per collision whatever the number of
+packets that collided. Before the measurements, it is checked that packets sent at the same time
+through chains of events without any delay collide, whether the wire is idle or busy.
+
+Usage: python benchmarks/wire_collisions.py [number of stations] [number of slots]
+"""
+import math
+import sys
+import time
+
+import numpy as np
+import simpy
+
+from ns.packet.packet import Packet
+from ns.port.wire import LossPeriodGenerator, Wire
+
+SLOT = 1.5
+
+
+class LegacyWire:
+    """ The previous implementation of the collision detection in `Wire`. """
+    def __init__(self, env, delay_dist, loss_dist=None):
+        self.store = simpy.Store(env)
+        self.delay_dist = delay_dist
+        self.loss_dist = loss_dist
+        self.env = env
+        self.out = None
+        self.packets_rec = 0
+        self.packets_dropped = 0
+        self.action = env.process(self.run())
+        self.loss_period_generator = LossPeriodGenerator(1234, 4321, 10, 50)
+
+    def run(self):
+        yield self.env.timeout(0)
+
+        while True:
+            packet = yield self.store.get()
+            colliding_packets = []
+
+            if len(self.store.items) >= 1:
+                colliding_packets = [
+                    p for p in self.store.items if p.current_time == packet.current_time
+                ]
+                if len(colliding_packets) != 0:
+                    self.packets_dropped += 2
+                    self.store.get()
+
+            if len(colliding_packets) == 0:
+                yield self.env.timeout(SLOT)
+                if self.loss_dist is None or not self.loss_period_generator.is_good_period(
+                        packet.current_time, packet.begin_transmission):
+                    self.packets_dropped += 1
+                else:
+                    queued_time = self.env.now - packet.current_time
+                    delay = self.delay_dist()
+                    if queued_time < delay:
+                        yield self.env.timeout(delay - queued_time)
+                    self.out.put(packet)
+
+    def put(self, packet):
+        self.packets_rec += 1
+        packet.current_time = self.env.now
+        return self.store.put(packet)
+
+
+class Counter:
+    """ A downstream element that only counts the packets it receives. """
+    def __init__(self):
+        self.packets_received = 0
+
+    def put(self, packet):
+        self.packets_received += 1
+
+
+def stations(env, out, n_stations, probability, seed):
+    """ Each of the stations transmits a packet at the beginning of each slot with the given
+        probability. """
+    rng = np.random.default_rng(seed)
+    packet_ids = [0] * n_stations
+    while True:
+        yield env.timeout(SLOT)
+        for flow_id in rng.choice(n_stations,
+                                  rng.binomial(n_stations, probability),
+                                  replace=False).tolist():
+            packet_ids[flow_id] += 1
+            packet = Packet(env.now, 100, packet_ids[flow_id], flow_id=flow_id)
+            packet.begin_transmission = env.now
+            out.put(packet)
+
+
+def check_chained_collisions(depth, busy):
+    """ Sends two packets into the wire at time 1, one of them after `depth` more events
+        without any delay, into an idle wire or into a wire busy with an earlier packet, and
+        checks that they collide. """
+    env = simpy.Environment()
+    wire = Wire(env, lambda: 0)
+    wire.out = Counter()
+
+    def first():
+        if busy:
+            yield env.timeout(0.5)
+            wire.put(Packet(env.now, 100, 0))
+            yield env.timeout(0.5)
+        else:
+            yield env.timeout(1)
+        wire.put(Packet(env.now, 100, 1))
+
+    def second():
+        yield env.timeout(1)
+        for __ in range(depth):
+            yield env.timeout(0)
+        wire.put(Packet(env.now, 100, 2))
+
+    env.process(first())
+    env.process(second())
+    env.run(until=10)
+
+    assert wire.collisions == 1 and wire.slots == (2 if busy else 1), \
+        f"missed a collision after {depth} events without delay (busy: {busy})"
+
+
+def run(wire_type, n_stations, n_slots, load):
+    """ Returns the wire after the run, and the wall-clock time of the run. """
+    env = simpy.Environment()
+    wire = wire_type(env, lambda: 0, loss_dist=lambda: 0)
+    wire.out = Counter()
+    env.process(stations(env, wire, n_stations, load / n_stations, seed=1))
+
+    start = time.perf_counter()
+    env.run(until=(n_slots + 0.5) * SLOT)
+    return wire, time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    slots = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+
+    for chain_depth in range(4):
+        check_chained_collisions(chain_depth, busy=False)
+        check_chained_collisions(chain_depth, busy=True)
+
+    for load in [1, 10, 50]:
+        wire, elapsed = run(Wire, n, slots, load)
+        legacy, legacy_elapsed = run(LegacyWire, n, slots, load)
+        assert legacy.packets_rec == wire.packets_rec
+
+        print(f"{n} stations, {load} transmissions per slot on average: "
+              f"{wire.packets_rec:,} packets, {wire.packets_collided:,} collided")
+        print(f"    previous Wire: {legacy_elapsed / legacy.packets_rec * 1e6:.1f} us per packet, "
+              f"{legacy.packets_dropped:,} packets counted as dropped")
+        print(f"    Wire:          {elapsed / wire.packets_rec * 1e6:.1f} us per packet, "
+              f"{wire.packets_dropped:,} packets counted as dropped "
+              f"({legacy_elapsed / elapsed:.1f}x)")
+
+        # the number of transmissions in a slot follows Binomial(n, load / n)
+        p = load / n
+        busy = 1 - (1 - p)**n
+        collided = busy - n * p * (1 - p)**(n - 1)
+        print(f"    slots with a collision: {wire.collisions / slots:.4f} "
+              f"(expected {collided:.4f}), busy slots: {wire.slots / slots:.4f} "
+              f"(expected {busy:.4f})")
+        for k in sorted(wire.collision_sizes)[:3]:
+            expected = math.comb(n, k) * p**k * (1 - p)**(n - k)
+            print(f"    {k}-way collisions: {wire.collision_sizes[k] / slots:.4f} "
+                  f"(expected {expected:.4f})")
@@ -79,7 +79,7 @@ for flow_id, flow in all_flows.items():
 
 env.run(until=100)
 
-for flow_id in sample(all_flows.keys(), 5):
+for flow_id in sample(sorted(all_flows), 5):
     print(f"Flow {flow_id}")
     print(all_flows[flow_id].pkt_sink.waits)
     print(all_flows[flow_id].pkt_sink.arrivals)
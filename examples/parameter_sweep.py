@@ -0,0 +1,78 @@
+"""
+This example shows how to sweep the parameters of a scenario with `ns.experiment.runner.Sweep`,
+which runs independent replications of the scenario for every point of a parameter grid across
+all the processors of the machine, and reports the mean of each metric with a 95% confidence
+interval.
+
+The scenario is a `FairPacketSwitch` with a single outgoing port, shared by two flows with
+Poisson arrivals and exponentially distributed packet sizes, and weights of 1 and 2. We sweep
+the buffer size of the port (in packets), the offered load, and the scheduler, and measure the
+loss rate and the mean delay of each flow.
+
+As the runs take place in worker processes, the scenario must be a top-level function, and the
+sweep must be started under `if __name__ == '__main__'`.
+"""
+import simpy
+
+from ns.experiment.runner import Sweep
+from ns.packet.dist_generator import DistPacketGenerator
+from ns.packet.sink import PacketSink
+from ns.switch.switch import FairPacketSwitch
+
+PORT_RATE = 8000.0  # in bits/second
+MEAN_SIZE = 100.0  # in bytes
+
+
+def scenario(seed, buffer_size, load, server, duration=500):
+    """ Runs the switch once, and returns the loss rate and mean delay of each flow. """
+    env = simpy.Environment()
+
+    # each flow offers half of the load
+    arrival_rate = load * PORT_RATE / 8 / MEAN_SIZE / 2
+    generators = [
+        DistPacketGenerator(env,
+                            f"flow_{flow_id}",
+                            ('exponential', {'scale': 1 / arrival_rate}),
+                            ('exponential', {'scale': MEAN_SIZE}),
+                            flow_id=flow_id,
+                            seed=seed + flow_id) for flow_id in range(2)
+    ]
+
+    switch = FairPacketSwitch(env,
+                              nports=1,
+                              port_rate=PORT_RATE,
+                              buffer_size=buffer_size,
+                              weights=[1, 2],
+                              server=server)
+    switch.demux.fib = {0: 0, 1: 0}
+
+    sink = PacketSink(env, rec_arrivals=False)
+    switch.ports[0].out = sink
+
+    for generator in generators:
+        generator.out = switch
+        sink.register(generator)
+
+    env.run(until=duration)
+
+    summary = {}
+    for flow_id in range(2):
+        waits = sink.waits[flow_id]
+        summary[f"loss_rate_{flow_id}"] = sink.loss_rate(flow_id)
+        summary[f"mean_delay_{flow_id}"] = sum(waits) / len(waits) if waits else 0.0
+    return summary
+
+
+if __name__ == '__main__':
+    sweep = Sweep(scenario, {
+        'buffer_size': [5, 50],
+        'load': [0.5, 1.2],
+        'server': ['WFQ', 'DRR']
+    },
+                  replications=3,
+                  seed=42)
+
+    for params, metrics in sweep.run():
+        print(", ".join(f"{name} = {value}" for name, value in params.items()))
+        for metric, estimate in metrics.items():
+            print(f"    {metric}: {estimate}")
@@ -5,8 +5,14 @@ class FIBDemux:
 
     Parameters
     ----------
-    fib: dict
-        forwarding information base. Key: flow id, Value: output port
+    fib: dict, list, NumPy array, or a pair of arrays
+        forwarding information base. As a dict, key: flow id, value: output port.
+        As a list or an array, it is a dense table indexed by flow id, in which
+        a negative port means that the flow has no route, as do flow ids that are
+        not integers. As a pair of arrays,
+        such as the `fib_flows` and `fib_ports` attributes of a node generated by
+        `ns.topos.utils.generate_fib()`, it holds the flow ids and their output
+        ports.
     outs: list
         list of downstream elements corresponding to the output ports
     ends: list
@@ -22,12 +28,33 @@ class FIBDemux:
         self.outs = outs
         self.default = default
         self.packets_received = 0
+        self.packets_unrouted = 0
         self.fib = fib
         if ends:
             self.ends = ends
         else:
             self.ends = dict()
 
+    @property
+    def fib(self):
+        """ The forwarding information base, as a dict or as a dense list. """
+        return self.table
+
+    @fib.setter
+    def fib(self, fib):
+        if fib is None:
+            fib = dict()
+        elif isinstance(fib, tuple):
+            flow_ids, ports = fib
+            fib = dict(zip(flow_ids.tolist(), ports.tolist()))
+        elif not isinstance(fib, dict):
+            # unrouted flows are looked up as None, as in a dict
+            ports = fib.tolist() if hasattr(fib, 'tolist') else fib
+            fib = [port if port >= 0 else None for port in ports]
+
+        self.table = fib
+        self.dense = isinstance(fib, list)
+
     def put(self, packet):
         """ Sends a packet to this element. """
         self.packets_received += 1
@@ -35,10 +62,22 @@ class FIBDemux:
 
         if flow_id in self.ends:
             self.ends[flow_id].put(packet)
-        else:
+            return
+
+        table = self.table
+        if self.dense:
             try:
-                self.outs[self.fib[packet.flow_id]].put(packet)
-            except (KeyError, IndexError, ValueError) as exc:
-                print("FIB Demux Error: " + str(exc))
-                if self.default:
-                    self.default.put(packet)
+                port = table[flow_id] if 0 <= flow_id < len(table) else None
+            except TypeError:
+                # flow IDs that are not integers, such as strings, have no route in a
+                # dense table
+                port = None
+        else:
+            port = table.get(flow_id)
+
+        if port is not None:
+            self.outs[port].put(packet)
+        else:
+            self.packets_unrouted += 1
+            if self.default:
+                self.default.put(packet)
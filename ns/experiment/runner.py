@@ -0,0 +1,239 @@
+"""
+Implements a runner for parameter sweeps, which runs independent replications of a scenario for
+every point of a parameter grid across a pool of worker processes, and aggregates the summaries
+of the runs into means with confidence intervals.
+
+A scenario is a function, defined at the top level of a module so that it can be sent to the
+worker processes, that builds and runs a simulation with a given seed and parameters, and
+returns a summary of the run as a dict of numbers:
+
+    def scenario(seed, buffer_size, load):
+        env = simpy.Environment()
+        ...
+        env.run(until=1000)
+        return {'loss_rate': ..., 'mean_delay': ...}
+
+    sweep = Sweep(scenario, {'buffer_size': [10, 100], 'load': [0.5, 0.9]}, replications=10)
+    for params, metrics in sweep.run():
+        ...
+
+Each run is given its own seed, spawned from a single root seed with `numpy.random.SeedSequence`
+so that the random streams of all runs are independent and the whole sweep can be reproduced.
+The `random` module and NumPy's global random number generator are seeded with it as well
+before the scenario is called. The summaries stream back as the runs complete, and are
+aggregated on the fly.
+"""
+import itertools
+import math
+import random
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from ns.utils.stats import Welford
+
+try:
+    from scipy.stats import t as student_t
+except ImportError:
+    student_t = None
+
+
+def grid(axes: dict) -> list:
+    """ Returns the points of the Cartesian product of the values of each parameter, as a
+        list of dicts mapping parameter names to values. """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*axes.values())]
+
+
+# Two-sided critical values of Student's t distribution at the 90%, 95% and 99% confidence
+# levels, used when SciPy is not available: one entry for each number of degrees of freedom
+# from 1 to 30, then for 40, 60 and 120 degrees of freedom, and the normal limit
+T_DEGREES = list(range(1, 31)) + [40, 60, 120]
+T_TABLE = {
+    0.90: ([6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833, 1.812, 1.796, 1.782,
+            1.771, 1.761, 1.753, 1.746, 1.740, 1.734, 1.729, 1.725, 1.721, 1.717, 1.714, 1.711,
+            1.708, 1.706, 1.703, 1.701, 1.699, 1.697, 1.684, 1.671, 1.658], 1.645),
+    0.95: ([12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228, 2.201, 2.179,
+            2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086, 2.080, 2.074, 2.069, 2.064,
+            2.060, 2.056, 2.052, 2.048, 2.045, 2.042, 2.021, 2.000, 1.980], 1.960),
+    0.99: ([63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250, 3.169, 3.106, 3.055,
+            3.012, 2.977, 2.947, 2.921, 2.898, 2.878, 2.861, 2.845, 2.831, 2.819, 2.807, 2.797,
+            2.787, 2.779, 2.771, 2.763, 2.756, 2.750, 2.704, 2.660, 2.617], 2.576),
+}
+
+
+def t_critical(confidence: float, df: int) -> float:
+    """ Returns the two-sided critical value of Student's t distribution with `df` degrees of
+        freedom at a given confidence level. Without SciPy, only the 90%, 95% and 99% levels
+        are supported, and the values are interpolated linearly in 1 / df between the entries
+        of a table.
+    """
+    if student_t is not None:
+        return float(student_t.ppf((1 + confidence) / 2, df))
+
+    level = round(confidence, 6)
+    if level not in T_TABLE:
+        raise ValueError(f"Confidence levels other than {sorted(T_TABLE)} require SciPy.")
+
+    values, limit = T_TABLE[level]
+    if df <= T_DEGREES[-1]:
+        upper = bisect_left(T_DEGREES, df)
+        if T_DEGREES[upper] == df:
+            return values[upper]
+        low_df, high_df = T_DEGREES[upper - 1], T_DEGREES[upper]
+        low, high = values[upper - 1], values[upper]
+    else:
+        low_df, high_df = T_DEGREES[-1], math.inf
+        low, high = values[-1], limit
+
+    fraction = (1 / low_df - 1 / df) / (1 / low_df - 1 / high_df)
+    return low + fraction * (high - low)
+
+
+class Estimate:
+    """ The mean of a metric over the replications of a point in the grid, with a confidence
+        interval based on Student's t distribution.
+
+        Parameters
+        ----------
+        confidence: float
+            The confidence level of the interval, between 0 and 1. Without SciPy, it must be
+            0.90, 0.95 or 0.99.
+    """
+    def __init__(self, confidence: float = 0.95):
+        self.confidence = confidence
+        self.moments = Welford()
+
+    def add(self, value):
+        """ Adds the value of the metric in one replication. """
+        self.moments.add(value)
+
+    @property
+    def count(self) -> int:
+        """ The number of replications. """
+        return self.moments.count
+
+    @property
+    def mean(self) -> float:
+        """ The mean over the replications. """
+        return self.moments.mean
+
+    @property
+    def half_width(self) -> float:
+        """ The half width of the confidence interval, or infinity with fewer than two
+            replications. """
+        n = self.moments.count
+        if n < 2:
+            return math.inf
+
+        t = t_critical(self.confidence, n - 1)
+        return t * self.moments.std / math.sqrt(n)
+
+    @property
+    def interval(self) -> tuple:
+        """ The confidence interval, as a (low, high) tuple. """
+        return self.mean - self.half_width, self.mean + self.half_width
+
+    def __repr__(self):
+        return f"{self.mean:.6g} ± {self.half_width:.3g} (n = {self.count})"
+
+
+def run_replication(scenario, seed, params):
+    """ Seeds the global random number generators, and runs one replication of a scenario. """
+    random.seed(seed)
+    np.random.seed(seed % 2**32)
+    return scenario(seed, **params)
+
+
+class Sweep:
+    """ Runs independent replications of a scenario for every point of a parameter grid, in
+        parallel across a pool of worker processes.
+
+        Parameters
+        ----------
+        scenario: function
+            A top-level function that takes a seed and the parameters of a point in the grid as
+            keyword arguments, runs a simulation, and returns a dict of numbers summarizing it.
+        axes: dict or list
+            Either a dict that maps each parameter name to a list of values, whose Cartesian
+            product is swept, or a list of dicts, each mapping parameter names to values.
+        replications: int
+            The number of independent replications of each point in the grid.
+        seed: int
+            The root seed, from which the seeds of all the runs are spawned.
+        max_workers: int
+            The number of worker processes. Defaults to the number of processors. If 1, the
+            runs take place in the current process.
+    """
+    def __init__(self,
+                 scenario,
+                 axes,
+                 replications: int = 10,
+                 seed: int = 0,
+                 max_workers: int = None):
+        if replications < 1:
+            raise ValueError('The number of replications must be positive.')
+
+        self.scenario = scenario
+        self.points = grid(axes) if isinstance(axes, dict) else list(axes)
+        self.replications = replications
+        self.seed = seed
+        self.max_workers = max_workers
+
+    def runs(self) -> list:
+        """ Returns the (point index, replication, seed) of every run in the sweep. """
+        n_runs = len(self.points) * self.replications
+        seeds = np.random.SeedSequence(self.seed).spawn(n_runs)
+
+        return [(index, replication, int(seeds[index * self.replications + replication]
+                                         .generate_state(1, np.uint64)[0]))
+                for index in range(len(self.points))
+                for replication in range(self.replications)]
+
+    def results(self):
+        """ Yields the (point index, replication, seed, summary) of every run, as soon as the
+            run completes. """
+        runs = self.runs()
+
+        if self.max_workers == 1:
+            for index, replication, seed in runs:
+                yield index, replication, seed, run_replication(self.scenario, seed,
+                                                                self.points[index])
+            return
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(run_replication, self.scenario, seed, self.points[index]):
+                (index, replication, seed)
+                for index, replication, seed in runs
+            }
+            for future in as_completed(futures):
+                index, replication, seed = futures[future]
+                yield index, replication, seed, future.result()
+
+    def run(self, confidence: float = 0.95, callback=None) -> list:
+        """ Runs the sweep, and returns a list of (parameters, metrics) pairs, one for each
+            point in the grid in order, where the metrics are a dict of `Estimate`s.
+
+            Parameters
+            ----------
+            confidence: float
+                The confidence level of the intervals.
+            callback: function
+                If provided, called with the (parameters, replication, seed, summary) of every
+                run as soon as it completes, for example to report progress.
+        """
+        estimates = [{} for __ in self.points]
+
+        for index, replication, seed, summary in self.results():
+            if callback is not None:
+                callback(self.points[index], replication, seed, summary)
+
+            point = estimates[index]
+            for metric, value in summary.items():
+                if metric not in point:
+                    point[metric] = Estimate(confidence)
+                point[metric].add(value)
+
+        return list(zip(self.points, estimates))
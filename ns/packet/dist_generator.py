@@ -4,9 +4,22 @@ arrival time distribution and a packet size distribution. One can set an initial
 a finish time for packet generation. In addition, one can set the source id and flow ids for
 the packets generated. The DistPacketGenerator's `out` member variable is used to connect the
 generator to any network element with a `put()` member function.
+
+The distributions can either be no-parameter functions, called once per packet, or named
+distributions of `numpy.random.Generator`, which are drawn in blocks of `block_size` variates
+from a random number generator seeded with `seed`, so that runs can be reproduced.
+
+Optionally, the rows of a CSV file can be attached to the packets as their payloads, in which
+case generation also stops when the rows run out.
 """
+import csv
+
+import numpy as np
+
 from ns.packet.packet import Packet
-import csv # to read from a csv file and load data into packets
+from ns.utils.generators.block_sampler import BlockSampler
+from ns.utils.tracing import Tracer
+
 
 class DistPacketGenerator:
     """ Generates packets with a given inter-arrival time distribution.
@@ -17,17 +30,27 @@ class DistPacketGenerator:
             The simulation environment.
         element_id: str
             the ID of this element.
-        arrival_dist: function
+        arrival_dist: function or tuple
             A no-parameter function that returns the successive inter-arrival times of
-            the packets.
-        size_dist: function
-            A no-parameter function that returns the successive sizes of the packets.
+            the packets, or a (name, params) tuple naming a distribution of
+            `numpy.random.Generator` and its parameters, such as ('exponential', {'scale': 2.0}).
+        size_dist: function or tuple
+            A no-parameter function that returns the successive sizes of the packets, or a
+            (name, params) tuple naming a distribution of `numpy.random.Generator`.
         initial_delay: number
             Starts generation after an initial delay. Defaults to 0.
         finish: number
             Stops generation at the finish time. Defaults to infinite.
         rec_flow: bool
             Are we recording the statistics of packets generated?
+        payload_file: str
+            The path to a CSV file with a header line, whose rows (as lists of strings) are
+            used as the payloads of successive packets. Generation stops when the rows run
+            out. Defaults to None, for packets without payloads.
+        seed: int
+            The seed of the random number generator used by named distributions.
+        block_size: int
+            The number of variates drawn at a time from named distributions.
     """
     def __init__(self,
                  env,
@@ -38,13 +61,20 @@ class DistPacketGenerator:
                  finish=float("inf"),
                  flow_id=0,
                  rec_flow=False,
+                 payload_file=None,
+                 seed=None,
+                 block_size=4096,
                  debug=False):
         self.element_id = element_id
         self.env = env
-        self.arrival_dist = arrival_dist
-        self.size_dist = size_dist
+
+        self.rng = np.random.default_rng(seed)
+        self.arrival_dist = self.sampler(arrival_dist, block_size)
+        self.size_dist = self.sampler(size_dist, block_size)
+
         self.initial_delay = initial_delay
         self.finish = finish
+        self.payload_file = payload_file
         self.out = None
         self.packets_sent = 0
         self.action = env.process(self.run())
@@ -54,43 +84,74 @@ class DistPacketGenerator:
         self.time_rec = []
         self.size_rec = []
         self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
+
+    def sampler(self, dist, block_size):
+        """ Returns a `BlockSampler` for a (name, params) tuple, or the distribution itself if
+            it is a function. """
+        if isinstance(dist, tuple):
+            name, params = dist
+            return BlockSampler(name, params, block_size, rng=self.rng)
+        return dist
+
+    def block_draws(self):
+        """ Yields the (inter-arrival time, size) of successive packets, drawn in blocks from
+            named distributions. """
+        arrival_dist, size_dist = self.arrival_dist, self.size_dist
+        while True:
+            yield from zip(arrival_dist.block(), size_dist.block())
+
+    def payloads(self):
+        """ Yields the payloads of successive packets: the rows of the payload file, if any,
+            or None forever. """
+        if self.payload_file is None:
+            while True:
+                yield None
+
+        with open(self.payload_file, 'r', newline='') as file:
+            csv_reader = csv.reader(file)
+            next(csv_reader, None)  # skipping the header
+            yield from csv_reader
 
     def run(self):
         """The generator function used in simulations."""
-        print("initial delay in dis generator: ",self.initial_delay)
-        # the generator function pause for the specified initial_delay duration before continuing execution
-        yield self.env.timeout(self.initial_delay)
-        with open(r'C:\Users\reyha\Desktop\network-simulation\Network-Simulation-with-Python\data\data.csv', 'r') as file:
-            csv_reader = csv.reader(file)
-            next(csv_reader)  # Skip the first line (header)
-        # keeps the generator function running as long as the current simulation time
-        # while self.env.now < self.finish:
-            # wait for next transmission
-            for row in csv_reader:
-                yield self.env.timeout(self.arrival_dist())
-                print("before packet sent delay in dis generator: ",self.arrival_dist)
-                self.packets_sent += 1
-                payload = row  # Example payload
-                packet = Packet(self.env.now,
-                                self.size_dist(),
-                                self.packets_sent,
-                                src=self.element_id,
-                                flow_id=self.flow_id,
-                                payload = payload)
-                if self.rec_flow:
-                    self.time_rec.append(packet.time)
-                    self.size_rec.append(packet.size)
-
-                # Assign row (list) as payload
-                packet.payload = row  
-
-                print(
-                        f"*Sent packet {packet.packet_id} with flow_id {packet.flow_id} at "
-                        f"time {self.env.now}. Payload: {packet.payload} from pg")
-                
-                if self.debug:
-                    print(
-                        f"Sent packet {packet.packet_id} with flow_id {packet.flow_id} at "
-                        f"time {self.env.now}.")
-
-                self.out.put(packet)
+        env = self.env
+        timeout = env.timeout
+        finish = self.finish
+
+        yield timeout(self.initial_delay)
+
+        draws = None
+        if isinstance(self.arrival_dist, BlockSampler) and isinstance(
+                self.size_dist, BlockSampler):
+            draws = self.block_draws()
+
+        for payload in self.payloads():
+            if env.now >= finish:
+                return
+
+            # wait for the next transmission
+            if draws is None:
+                yield timeout(self.arrival_dist())
+                size = self.size_dist()
+            else:
+                interarrival, size = next(draws)
+                yield timeout(interarrival)
+
+            self.packets_sent += 1
+            packet = Packet(env.now,
+                            size,
+                            self.packets_sent,
+                            src=self.element_id,
+                            flow_id=self.flow_id,
+                            payload=payload)
+            if self.rec_flow:
+                self.time_rec.append(packet.time)
+                self.size_rec.append(packet.size)
+
+            if self.debug:
+                self.tracer.debug(
+                    f"Sent packet {packet.packet_id} with flow_id {packet.flow_id} at "
+                    f"time {env.now}. Payload: {packet.payload}")
+
+            self.out.put(packet)
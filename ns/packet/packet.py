@@ -15,6 +15,11 @@ class Packet:
         We use a float to represent the size of the packet in bytes so that we can compare
         to ideal M/M/1 queues.
 
+        Packets use `__slots__` to keep their memory footprint small, as millions of them
+        may be alive at the same time in large simulations. The `prio` and `perhop_time`
+        dictionaries are only allocated when they are first accessed, since most packets
+        never traverse a Static Priority scheduler or a Port with an element ID.
+
         Parameters
         ----------
         time: float
@@ -28,6 +33,10 @@ class Packet:
         flow_id: int or str
             an integer or string that can be used to identify a flow
     """
+    __slots__ = ('time', 'size', 'packet_id', 'realtime', 'src', 'dst',
+                 'flow_id', 'payload', 'color', 'ack', 'current_time',
+                 'begin_transmission', '_prio', '_perhop_time')
+
     def __init__(self,
                  time,
                  size,
@@ -46,11 +55,39 @@ class Packet:
         self.flow_id = flow_id
         self.payload = payload
         self.color = None  # Used by the two-rate tri-color token bucket shaper
-        self.prio = {}  # used by the Static Priority scheduler
         self.ack = 0  # used by TCPPacketGenerator and TCPSink
         self.current_time = 0  # time packet received by the Wire element
-        self.perhop_time = {}  # used by Port to record per-hop arrival times
         self.begin_transmission = 0 # indicates the start of packet transmission from slot
+        self._prio = None
+        self._perhop_time = None
+
+    @property
+    def prio(self) -> dict:
+        """ Priorities assigned to this packet, used by the Static Priority scheduler. """
+        if self._prio is None:
+            self._prio = {}
+        return self._prio
+
+    @prio.setter
+    def prio(self, value):
+        self._prio = value
+
+    @property
+    def perhop_time(self) -> dict:
+        """ Per-hop arrival times, recorded by each Port with an element ID. """
+        if self._perhop_time is None:
+            self._perhop_time = {}
+        return self._perhop_time
+
+    @perhop_time.setter
+    def perhop_time(self, value):
+        self._perhop_time = value
+
+    def has_perhop_time(self) -> bool:
+        """ Returns True if a per-hop arrival time has been recorded, without allocating
+            the `perhop_time` dictionary.
+        """
+        return bool(self._perhop_time)
 
     def __repr__(self):
         return f"id: {self.packet_id}, flow_id: {self.flow_id}, time: {self.time}, current_time: {self.current_time} , begin_transmission: {self.begin_transmission}, size: {self.size}, payload: {self.payload}"
@@ -8,6 +8,7 @@ import time
 from select import select
 
 from ns.packet.packet import Packet
+from ns.utils.tracing import Tracer
 
 
 class ProxyPacketGenerator:
@@ -44,6 +45,7 @@ class ProxyPacketGenerator:
         self.last_arrival_time = 0
         self.last_arrival_realtime = 0
         self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
 
         if self.protocol == 'tcp':
             self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -66,7 +68,7 @@ class ProxyPacketGenerator:
     def on_tcp_accept(self):
         """ When a client connects, establish its associated states. """
         client_sock, client_addr = self.sock.accept()
-        print(f"{self.element_id}: {client_addr} has connected.")
+        self.tracer.info(f"{self.element_id}: {client_addr} has connected.")
 
         # using the port number as the flow ID
         self.flow_id = client_addr[1]
@@ -75,7 +77,7 @@ class ProxyPacketGenerator:
 
     def on_tcp_close(self, sock):
         """ If a client disconnects, remove its associated states. """
-        print(f"{self.element_id}: {sock.getpeername()} has disconnected.")
+        self.tracer.info(f"{self.element_id}: {sock.getpeername()} has disconnected.")
 
         flow_id = self.flow_ids[sock]
         del self.flow_ids[sock]
@@ -89,7 +91,7 @@ class ProxyPacketGenerator:
                         payload=None)
 
         if self.debug:
-            print(
+            self.tracer.debug(
                 f"{self.element_id} sent a closing packet {packet.packet_id} with "
                 f"flow_id {packet.flow_id} at time {self.env.now}.")
 
@@ -135,11 +137,11 @@ class ProxyPacketGenerator:
                     else:
                         if self.debug:
                             if self.protocol == 'tcp':
-                                print(f"{self.element_id} received data from "
-                                      f"{selected_sock.getpeername()}: {data}")
+                                self.tracer.debug(f"{self.element_id} received data from "
+                                                  f"{selected_sock.getpeername()}: {data}")
                             else:
-                                print(f"{self.element_id} received data from "
-                                      f"{self.client_addr}: {data}")
+                                self.tracer.debug(f"{self.element_id} received data from "
+                                                  f"{self.client_addr}: {data}")
 
                         # wait for the appropriate time to transmit a new packet with payload
                         if self.last_arrival_time > 0:
@@ -175,7 +177,7 @@ class ProxyPacketGenerator:
                                             payload=data)
 
                         if self.debug:
-                            print(
+                            self.tracer.debug(
                                 f"{self.element_id} sent packet {packet.packet_id} with "
                                 f"flow_id {packet.flow_id} at time {self.env.now}."
                             )
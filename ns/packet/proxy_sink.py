@@ -11,6 +11,7 @@ from select import select
 import simpy
 
 from ns.packet.packet import Packet
+from ns.utils.tracing import Tracer
 
 
 class ProxySink:
@@ -77,6 +78,7 @@ class ProxySink:
         self.last_arrival = dd(lambda: 0)
 
         self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
         self.out = None
 
         self.flow_ids = {}
@@ -97,14 +99,14 @@ class ProxySink:
         try:
             server_sock.connect(self.destination)
         except socket.timeout:
-            print(f'Timed out connecting to server {self.destination}.')
+            self.tracer.warning(f'Timed out connecting to server {self.destination}.')
 
         self.flow_ids[server_sock] = packet.flow_id
         self.sockets[packet.flow_id] = server_sock
 
     def on_tcp_close(self, sock):
         """ Removes relevant states when a server disconnects. """
-        print(f"{self.element_id}: {sock.getpeername()} has disconnected.")
+        self.tracer.info(f"{self.element_id}: {sock.getpeername()} has disconnected.")
 
         flow_id = self.flow_ids[sock]
         del self.flow_ids[sock]
@@ -136,11 +138,11 @@ class ProxySink:
                 else:
                     if self.debug:
                         if self.protocol == 'tcp':
-                            print(f"{self.element_id} received response from "
-                                  f"{selected_sock.getpeername()}: {data}")
+                            self.tracer.debug(f"{self.element_id} received response from "
+                                              f"{selected_sock.getpeername()}: {data}")
                         else:
-                            print(f"{self.element_id} received data from "
-                                  f"{self.destination}: {data}")
+                            self.tracer.debug(f"{self.element_id} received data from "
+                                              f"{self.destination}: {data}")
 
                     # wait for the appropriate time to transmit a new packet with payload
                     if self.last_response_time > 0:
@@ -174,7 +176,7 @@ class ProxySink:
                                         payload=data)
 
                     if self.debug:
-                        print(
+                        self.tracer.debug(
                             f"{self.element_id} sent packet {packet.packet_id} "
                             f"with flow_id {packet.flow_id} at time {self.env.now}."
                         )
@@ -238,7 +240,7 @@ class ProxySink:
                 self.last_arrival[rec_index] = now
 
             if self.debug:
-                print("At time {:.2f}, packet {:d} arrived at {}.".format(
+                self.tracer.debug("At time {:.2f}, packet {:d} arrived at {}.".format(
                     now, packet.packet_id, self.element_id))
                 if self.rec_waits and len(self.packet_sizes[rec_index]) >= 10:
                     bytes_received = sum(self.packet_sizes[rec_index][-9:])
@@ -246,7 +248,7 @@ class ProxySink:
                         self.packet_times[rec_index][-10] +
                         self.waits[rec_index][-10])
                     if time_elapsed > 0:
-                        print(
+                        self.tracer.debug(
                             "Average throughput (last 10 packets): {:.2f} bytes/second."
                             .format(bytes_received / time_elapsed))
 
@@ -4,11 +4,27 @@ packets.
 
 By default, it records absolute arrival times, but it can also be initialized to record
 inter-arrival times.
+
+For long runs, the sink can also record its measurements in columnar mode, in which each
+measurement is stored in a typed NumPy array per flow rather than in a Python list (see
+`ns.utils.columnar`).
+
+Packet generators can be registered with the sink using `register()`, so that per-flow loss
+rates can be computed on demand from the number of packets they have sent. Loss rates, goodput
+and delay percentiles are only computed when asked for, never when packets arrive.
+
+To report the distribution of waiting times in long runs without keeping every sample, a
+streaming summary from `ns.utils.stats` can be fed with the waiting times of each flow.
 """
 from collections import defaultdict as dd
+from collections.abc import Mapping
 
+import numpy as np
 import simpy
 
+from ns.utils.columnar import FlowColumns
+from ns.utils.tracing import Tracer
+
 
 class PacketSink:
     """ A PacketSink is designed to record both arrival times and waiting times from the incoming
@@ -31,6 +47,15 @@ class PacketSink:
         otherwise, the 'src' field in the packets are used
     debug: bool
         If True, prints more verbose debug information.
+    columnar: bool
+        if True, the measurements are recorded in `columns`, a dict of `FlowColumns`
+        with one typed NumPy array per measurement, and the per-hop times are kept in a
+        hop x packet matrix, rather than in the `arrivals`, `waits`, `packet_sizes`,
+        `packet_times` and `perhop_times` lists. This uses much less memory in long runs.
+    wait_summary: function
+        a no-parameter function, such as `ns.utils.stats.StreamingSummary`, that creates a
+        streaming summary for each flow. If provided, the waiting time of each packet is added
+        to the summary of its flow in `wait_summaries`, regardless of `rec_waits`.
     """
 
     def __init__(self,
@@ -39,7 +64,9 @@ class PacketSink:
                  absolute_arrivals: bool = True,
                  rec_waits: bool = True,
                  rec_flow_ids: bool = True,
-                 debug: bool = False):
+                 debug: bool = False,
+                 columnar: bool = False,
+                 wait_summary=None):
         self.store = simpy.Store(env)
         self.env = env
         self.rec_waits = rec_waits
@@ -54,24 +81,27 @@ class PacketSink:
         self.packet_times = dd(list)
         self.perhop_times = dd(list)
 
+        self.columnar = columnar
+        self.columns = dd(FlowColumns)
+
+        self.wait_summaries = dd(wait_summary) if wait_summary is not None else None
+
         self.first_arrival = dd(lambda: 0)
         self.last_arrival = dd(lambda: 0)
 
         self.debug = debug
+        self.tracer = Tracer(__name__, env, debug=debug)
 
-        # Initialize packets_sent with the same length as arrivals
-        self.packets_sent = dd(lambda: 0)
-
-    def put(self, packet):
-        """ Sends a packet to this element. """
-        now = self.env.now
-        if self.rec_flow_ids:
-            rec_index = packet.flow_id
-        else:
-            rec_index = packet.src
+        # the packet generators registered for each flow, used to compute loss rates
+        self.generators = dd(list)
+        # the number of packets sent in each flow, read from the registered generators
+        self.packets_sent = PacketsSent(self)
 
+    def record_lists(self, rec_index, packet, now):
+        """ Records the measurements of a packet that arrived at time `now` in the per-flow
+            lists. """
         if self.rec_waits:
-            self.waits[rec_index].append(self.env.now - packet.time)
+            self.waits[rec_index].append(now - packet.time)
             self.packet_sizes[rec_index].append(packet.size)
             self.packet_times[rec_index].append(packet.time)
             self.perhop_times[rec_index].append(packet.perhop_time)
@@ -87,30 +117,179 @@ class PacketSink:
 
             self.last_arrival[rec_index] = now
 
+    def record_columns(self, rec_index, packet, now):
+        """ Records the measurements of a packet that arrived at time `now` in the per-flow
+            columns. """
+        columns = self.columns[rec_index]
+
+        if self.rec_waits:
+            columns.record_wait(now - packet.time, packet.size, packet.time,
+                                packet.perhop_time if packet.has_perhop_time() else None)
+
+        if self.rec_arrivals:
+            if len(columns.arrival_column) == 0:
+                self.first_arrival[rec_index] = now
+
+            if self.absolute_arrivals:
+                columns.record_arrival(now)
+            else:
+                columns.record_arrival(now - self.last_arrival[rec_index])
+
+            self.last_arrival[rec_index] = now
+
+    def put(self, packet):
+        """ Sends a packet to this element. """
+        self.put_at(packet, self.env.now)
+
+    def put_at(self, packet, now):
+        """ Sends a packet to this element that arrived at time `now`, which may be earlier
+            than the current simulation time. Upstream elements that compute the departure
+            times of their packets analytically, such as `HybridPort`, use this call to deliver
+            their packets in batches.
+        """
+        if self.rec_flow_ids:
+            rec_index = packet.flow_id
+        else:
+            rec_index = packet.src
+
+        if self.columnar:
+            self.record_columns(rec_index, packet, now)
+        else:
+            self.record_lists(rec_index, packet, now)
+
+        if self.wait_summaries is not None:
+            self.wait_summaries[rec_index].add(now - packet.time)
+
         if self.debug:
-            print("At time {:.2f}, packet {:d} flow {} arrived at sink.".format(
+            self.tracer.debug("At time {:.2f}, packet {:d} flow {} arrived at sink.".format(
                 now, packet.packet_id, packet.flow_id))
-            if self.rec_waits and len(self.packet_sizes[rec_index]) >= 10:
+            if self.rec_waits and not self.columnar and len(self.packet_sizes[rec_index]) >= 10:
                 bytes_received = sum(self.packet_sizes[rec_index][-9:])
-                time_elapsed = self.env.now - (
+                time_elapsed = now - (
                     self.packet_times[rec_index][-10] +
                     self.waits[rec_index][-10])
-                print(
+                self.tracer.debug(
                     "Average throughput (last 10 packets): {:.2f} bytes/second."
                     .format(float(bytes_received) / time_elapsed))
 
         self.packets_received[rec_index] += 1 # increments the packet count for this flow
         self.bytes_received[rec_index] += packet.size
 
-        # calculate loss rate
-        # rec-index shows the packet id
-        if self.packets_received[rec_index] > 0:
-            total_packets_sent = len(self.packets_sent)  # Total packets sent by the source
-            packets_arrived = len(self.arrivals[rec_index])  # Packets that arrived for the specific flow
-            packets_dropped = total_packets_sent - packets_arrived  # Packets dropped for the specific flow
+    def register(self, generator, flow_id=None):
+        """ Registers a packet generator whose packets are received by this sink, so that the
+            loss rate of its flow can be computed. The generator is expected to keep the number
+            of packets it has sent in its `packets_sent` attribute, which is only read when a
+            loss rate is asked for. A generator that sends many flows, such as a
+            `MultiTracePacketGenerator`, keeps the number of packets sent in each flow in its
+            `flow_packets_sent` dict, and is registered once for each flow.
 
-            if total_packets_sent > 0:
-                loss_rate = (packets_dropped / total_packets_sent) * 100  # Loss rate calculation
-                print(f"Loss rate {loss_rate:.2f}%")
-            else:
-                print(f"No packets sent for {rec_index}, cannot calculate loss rate.")
+            Parameters
+            ----------
+            generator: object
+                The packet generator, such as a `DistPacketGenerator`.
+            flow_id: int or str
+                The index under which the sink records the packets of the generator. Defaults
+                to the generator's `flow_id`, or to its `element_id` if the sink records its
+                statistics by the 'src' field of the packets. It must be given for a generator
+                that sends many flows, if the sink records its statistics by flow ID.
+        """
+        if not hasattr(generator, 'packets_sent'):
+            raise ValueError(
+                f"{generator!r} does not count the packets it sends in `packets_sent`.")
+
+        if flow_id is None:
+            if self.rec_flow_ids and hasattr(generator, 'flow_packets_sent'):
+                raise ValueError(
+                    f"A flow ID is required to register {generator!r}, which sends many flows.")
+
+            attribute = 'flow_id' if self.rec_flow_ids else 'element_id'
+            flow_id = getattr(generator, attribute, None)
+            if flow_id is None:
+                raise ValueError(f"{generator!r} has no `{attribute}`; "
+                                 "the flow ID must be given.")
+
+        self.generators[flow_id].append(generator)
+
+    def sent_in_flow(self, generator, flow_id) -> int:
+        """ Returns the number of packets that a registered generator has sent in a flow. """
+        if self.rec_flow_ids and hasattr(generator, 'flow_packets_sent'):
+            return generator.flow_packets_sent.get(flow_id, 0)
+        return generator.packets_sent
+
+    def loss_rate(self, flow_id) -> float:
+        """ Returns the fraction of the packets sent in a flow that have not been received, which
+            includes packets that are still in flight.
+        """
+        if flow_id not in self.generators:
+            raise ValueError(f"No packet generators have been registered for flow {flow_id}.")
+
+        sent = self.packets_sent[flow_id]
+        if sent == 0:
+            return 0.0
+
+        return (sent - self.packets_received[flow_id]) / sent
+
+    def goodput(self, flow_id, duration=None) -> float:
+        """ Returns the number of bytes received per second in a flow, over the given duration,
+            or by default, over the time between its first and last arrivals (which requires the
+            arrivals to be recorded).
+        """
+        if duration is None:
+            duration = self.last_arrival[flow_id] - self.first_arrival[flow_id]
+
+        if duration <= 0:
+            return 0.0
+
+        return self.bytes_received[flow_id] / duration
+
+    def delay_percentiles(self, flow_id, percentiles=(50, 95, 99)) -> dict:
+        """ Returns a dict of the given percentiles of the waiting times in a flow, which
+            requires the waiting times to be recorded. Otherwise, the percentiles are estimated
+            by the streaming summary of the flow, if it offers a `quantile()` call; summaries
+            without one, such as `Welford`, only keep the moments, and an empty dict is returned.
+        """
+        if self.columnar:
+            waits = self.columns[flow_id].waits if flow_id in self.columns else []
+        else:
+            waits = self.waits.get(flow_id, [])
+
+        if len(waits) == 0:
+            if self.wait_summaries is not None and flow_id in self.wait_summaries:
+                summary = self.wait_summaries[flow_id]
+                if hasattr(summary, 'quantile'):
+                    return {p: summary.quantile(p / 100) for p in percentiles}
+            return {}
+
+        return dict(zip(percentiles, np.percentile(waits, percentiles).tolist()))
+
+
+class PacketsSent(Mapping):
+    """ A read-only view of the number of packets sent in each flow, indexed like the other
+        per-flow statistics of a `PacketSink`. The counts are summed over the generators
+        registered for each flow when they are read. As with the per-flow counters of the
+        sink, indexing it with a flow that has no registered generators gives 0; such a flow
+        is not in the view, though, so that `in`, `get()`, iteration and `len()` only see the
+        registered flows.
+    """
+    def __init__(self, sink: PacketSink):
+        self.sink = sink
+
+    def __getitem__(self, flow_id) -> int:
+        generators = self.sink.generators.get(flow_id, ())
+        return sum(self.sink.sent_in_flow(generator, flow_id) for generator in generators)
+
+    def __contains__(self, flow_id) -> bool:
+        return flow_id in self.sink.generators
+
+    def get(self, flow_id, default=None):
+        """ Returns the number of packets sent in a flow, or `default` if no generators have
+            been registered for it. """
+        if flow_id not in self.sink.generators:
+            return default
+        return self[flow_id]
+
+    def __iter__(self):
+        return iter(self.sink.generators)
+
+    def __len__(self):
+        return len(self.sink.generators)
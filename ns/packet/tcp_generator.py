@@ -2,10 +2,13 @@
 Implements a packet generator that simulates the TCP protocol, including support for
 various congestion control mechanisms.
 """
+from itertools import takewhile
+
 import simpy
 
 from ns.packet.packet import Packet
-from ns.utils.timer import Timer
+from ns.utils.tracing import Tracer
+from ns.utils.timer import Timer, timer_wheel
 
 
 class TCPPacketGenerator:
@@ -21,6 +24,18 @@ class TCPPacketGenerator:
             The ID for this element.
         rec_flow: bool
             Are we recording the statistics of packets generated?
+        single_rto: bool
+            If True, the flow uses a single retransmission timer for its earliest
+            unacknowledged segment, restarted on each new acknowledgment, as in Linux
+            (RFC 6298); otherwise, each segment sent has its own timer.
+        wheel: TimerWheel
+            The timing wheel that holds the retransmission timers. By default, each timer is
+            a `Timer` that expires at its exact expiry time.
+        timer_resolution: float
+            If given, the retransmission timers are held by the timing wheel shared by all
+            the elements in the environment, with ticks of this duration, and a timer expires
+            at the first tick at or after its expiry time. It must match the resolution of
+            `wheel`, if both are given.
     """
     def __init__(self,
                  env,
@@ -28,11 +43,15 @@ class TCPPacketGenerator:
                  cc,
                  element_id=None,
                  rtt_estimate=1,
-                 debug=False):
+                 debug=False,
+                 single_rto=False,
+                 wheel=None,
+                 timer_resolution=None):
         self.element_id = element_id
         self.env = env
         self.out = None
         self.flow = flow
+        self.flow_id = flow.fid
         self.congestion_control = cc
 
         self.mss = 512  # maximum segment size, in bytes
@@ -59,9 +78,22 @@ class TCPPacketGenerator:
         self.timers = {}
         # the in-flight packets (segments)
         self.sent_packets = {}
+        # the number of packets (segments) transmitted, including retransmissions
+        self.packets_sent = 0
+
+        if timer_resolution is not None:
+            if wheel is None:
+                wheel = timer_wheel(env, resolution=timer_resolution)
+            elif wheel.resolution != timer_resolution:
+                raise ValueError('The timer resolution does not match that of the wheel.')
+        self.wheel = wheel
+        self.single_rto = single_rto
+        # the retransmission timer of the flow, in the single-RTO mode
+        self.rto_timer = None
 
-        self.action = env.process(self.run())
         self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
+        self.action = env.process(self.run())
 
     def run(self):
         """ The generator function used in simulations. """
@@ -106,32 +138,56 @@ class TCPPacketGenerator:
                 self.sent_packets[packet.packet_id] = packet
 
                 if self.debug:
-                    print("Sent packet {:d} with size {:d}, "
-                          "flow_id {:d} at time {:.4f}.".format(
-                              packet.packet_id, packet.size, packet.flow_id,
-                              self.env.now))
+                    self.tracer.debug("Sent packet {:d} with size {:d}, "
+                                      "flow_id {:d} at time {:.4f}.".format(
+                                          packet.packet_id, packet.size, packet.flow_id,
+                                          self.env.now))
 
                 self.out.put(packet)
+                self.packets_sent += 1
 
                 self.next_seq += packet.size
-                self.timers[packet.packet_id] = Timer(
-                    self.env,
-                    timer_id=packet.packet_id,
-                    timeout_callback=self.timeout_callback,
-                    timeout=self.rto)
-
-                if self.debug:
-                    print("Setting a timer for packet {:d} with an RTO"
-                          " of {:.4f}.".format(packet.packet_id, self.rto))
+                self.set_timer(packet.packet_id)
             else:
                 # No further space in the congestion window to transmit packets
                 # at this time, waiting for acknowledgements
                 yield self.cwnd_available.get()
 
+    def start_timer(self, timer_id):
+        """ Starts a retransmission timer that expires after the current RTO, held by the
+            timing wheel if there is one. """
+        if self.wheel is None:
+            return Timer(self.env, timer_id, self.timeout_callback, self.rto)
+        return self.wheel.timer(timer_id, self.timeout_callback, self.rto)
+
+    def restart_rto_timer(self):
+        """ Restarts the retransmission timer of the flow, in the single-RTO mode. A `Timer`
+            can only be restarted by its own callback, so the timer is replaced. """
+        if self.rto_timer is not None:
+            self.rto_timer.stop()
+        self.rto_timer = self.start_timer(self.flow.fid)
+
+    def set_timer(self, packet_id):
+        """ Starts the retransmission timer for a packet that has just been sent. """
+        if self.single_rto:
+            if self.rto_timer is not None and not self.rto_timer.stopped:
+                return
+            self.restart_rto_timer()
+        else:
+            self.timers[packet_id] = self.start_timer(packet_id)
+
+        if self.debug:
+            self.tracer.debug("Setting a timer for packet {:d} with an RTO"
+                              " of {:.4f}.".format(packet_id, self.rto))
+
     def timeout_callback(self, packet_id):
         """ To be called when a timer expired for a packet with 'packet_id'. """
+        if self.single_rto:
+            # the timer of the flow expired for its earliest unacknowledged segment
+            packet_id = next(iter(self.sent_packets))
+
         if self.debug:
-            print("Timer expired for packet {:d} at time {:.4f}.".format(
+            self.tracer.debug("Timer expired for packet {:d} at time {:.4f}.".format(
                 packet_id, self.env.now))
 
         self.congestion_control.timer_expired()
@@ -139,15 +195,19 @@ class TCPPacketGenerator:
         # retransmitting the segment
         resent_pkt = self.sent_packets[packet_id]
         self.out.put(resent_pkt)
+        self.packets_sent += 1
 
         if self.debug:
-            print("Resending packet {:d} with flow_id {:d} at time {:.4f}.".
-                  format(resent_pkt.packet_id, resent_pkt.flow_id,
-                         self.env.now))
+            self.tracer.debug("Resending packet {:d} with flow_id {:d} at time {:.4f}.".
+                              format(resent_pkt.packet_id, resent_pkt.flow_id,
+                                     self.env.now))
 
         # starting a new timer for this segment and doubling the retransmission timeout
         self.rto *= 2
-        self.timers[packet_id].restart(self.rto)
+        if self.single_rto:
+            self.restart_rto_timer()
+        else:
+            self.timers[packet_id].restart(self.rto)
 
     def put(self, ack):
         """ On receiving an acknowledgment packet. """
@@ -167,12 +227,13 @@ class TCPPacketGenerator:
             resent_pkt = self.sent_packets[ack.ack]
             resent_pkt.time = self.env.now
             if self.debug:
-                print(
+                self.tracer.debug(
                     "Resending packet {:d} with flow_id {:d} at time {:.4f}.".
                     format(resent_pkt.packet_id, resent_pkt.flow_id,
                            self.env.now))
 
             self.out.put(resent_pkt)
+            self.packets_sent += 1
 
             return
         elif self.dupack > 3:
@@ -183,12 +244,13 @@ class TCPPacketGenerator:
                 resent_pkt.time = self.env.now
 
                 if self.debug:
-                    print(
+                    self.tracer.debug(
                         "Resending packet {:d} with flow_id {:d} at time {:.4f}."
                         .format(resent_pkt.packet_id, resent_pkt.flow_id,
                                 self.env.now))
 
                 self.out.put(resent_pkt)
+                self.packets_sent += 1
 
             return
 
@@ -206,13 +268,24 @@ class TCPPacketGenerator:
             self.congestion_control.ack_received(sample_rtt, self.env.now)
 
             if self.debug:
-                print("Ack received till sequence number {:d} at time {:.4f}.".
-                      format(ack.ack, self.env.now))
-                print(
+                self.tracer.debug("Ack received till sequence number {:d} at time {:.4f}.".
+                                  format(ack.ack, self.env.now))
+                self.tracer.debug(
                     "Congestion window size = {:.1f}, last ack = {:d}.".format(
                         self.congestion_control.cwnd, self.last_ack))
 
-            if ack.packet_id in self.timers:
+            if self.single_rto:
+                # the segments are kept in the order of their sequence numbers
+                for packet_id in list(
+                        takewhile(lambda packet_id: packet_id < ack.ack, self.sent_packets)):
+                    del self.sent_packets[packet_id]
+
+                # restarting the timer for the remaining segments (RFC 6298)
+                if self.sent_packets:
+                    self.restart_rto_timer()
+                elif self.rto_timer is not None:
+                    self.rto_timer.stop()
+            elif ack.packet_id in self.timers:
                 self.timers[ack.packet_id].stop()
                 del self.timers[ack.packet_id]
                 del self.sent_packets[ack.packet_id]
@@ -16,8 +16,12 @@ class TCPSink(PacketSink):
                  rec_waits: bool = True,
                  rec_flow_ids: bool = True,
                  debug: bool = False):
-        super().__init__(env, rec_arrivals, absolute_arrivals, rec_waits,
-                         rec_flow_ids, debug)
+        super().__init__(env,
+                         rec_arrivals,
+                         absolute_arrivals,
+                         rec_waits,
+                         rec_flow_ids,
+                         debug=debug)
         self.recv_buffer = []
         # the next sequence number expected to be received
         self.next_seq_expected = 0
@@ -1,9 +1,44 @@
-import re
+"""
+Implements packet generators that replay a packet trace. The trace can be either a text trace,
+with one packet per line (possibly compressed with gzip or Zstandard), or a binary trace with
+fixed-width records, which is read in chunks through `numpy.memmap`. See `ns.utils.traces` for
+both formats, and for a converter from the text format to the binary format.
+
+`TracePacketGenerator` sends all the packets in the trace to a single element, while
+`MultiTracePacketGenerator` reads a trace with many flows in a single pass, and sends the
+packets of each flow to its own ingress element, such as the switch that a host is connected
+to. A whole network can then be driven by a single trace and a single SimPy process.
+"""
+from collections import defaultdict as dd
 
 from ns.packet.packet import Packet
+from ns.utils import traces
+from ns.utils.tracing import Tracer
 
 
 class TracePacketGenerator:
+    """ Generates packets according to a trace file.
+
+        Parameters
+        ----------
+        env: simpy.Environment
+            The simulation environment.
+        element_id: str
+            the ID of this element.
+        filename: str
+            The name of the trace file, either a binary trace or a text trace.
+        initial_delay: number
+            Starts generation after an initial delay. Defaults to 0.
+        finish: number
+            Stops generation at the finish time. Defaults to infinite.
+        flow_id: int
+            If not None, the flow ID of all the packets. The lines of a text trace then have
+            no flow ID column.
+        rec_flow: bool
+            Are we recording the statistics of packets generated?
+        chunk_size: int
+            The number of records read at a time from a binary trace.
+    """
     def __init__(self,
                  env,
                  element_id,
@@ -12,6 +47,7 @@ class TracePacketGenerator:
                  finish=float('inf'),
                  flow_id=None,
                  rec_flow=False,
+                 chunk_size=65536,
                  debug=False):
         self.element_id = element_id
         self.env = env
@@ -20,6 +56,7 @@ class TracePacketGenerator:
         self.finish = finish
         self.out = None
         self.flow_id = flow_id
+        self.chunk_size = chunk_size
         self.packets_sent = 0
         self.action = env.process(self.run())
 
@@ -28,33 +65,34 @@ class TracePacketGenerator:
         self.size_rec = []
 
         self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
+
+    def records(self):
+        """ Yields the (flow ID, packet ID, time, size) of each packet in the trace. """
+        chunks = traces.read_chunks(self.filename, self.flow_id, self.chunk_size)
+        try:
+            for chunk in chunks:
+                yield from chunk
+        finally:
+            chunks.close()
 
     def run(self):
         """The generator function used in simulations."""
-        yield self.env.timeout(self.initial_delay)
+        env = self.env
+        yield env.timeout(self.initial_delay)
 
-        row_generator = (row for row in open(self.filename))
         last_packet_time = 0
-
+        records = self.records()
         try:
-            while self.env.now < self.finish:
-                row = re.split(r"\s+", next(row_generator).rstrip('[\t ]+\n'))
-                if self.flow_id is None:
-                    flow_id = int(row[0])
-                    packet_id = int(row[1])
-                    time = float(row[2])
-                    size = int(row[3])
-                else:
-                    flow_id = self.flow_id
-                    packet_id = int(row[0])
-                    time = float(row[1])
-                    size = int(row[2])
-
-                yield self.env.timeout(max(0, time - last_packet_time))
+            for flow_id, packet_id, time, size in records:
+                if env.now >= self.finish:
+                    break
+
+                yield env.timeout(max(0, time - last_packet_time))
                 last_packet_time = time
 
                 self.packets_sent += 1
-                packet = Packet(self.env.now,
+                packet = Packet(env.now,
                                 size,
                                 packet_id,
                                 src=self.element_id,
@@ -64,11 +102,109 @@ class TracePacketGenerator:
                     self.size_rec.append(packet.size)
 
                 if self.debug:
-                    print(
+                    self.tracer.debug(
                         f"Sent packet {packet.packet_id} with flow_id {packet.flow_id} at "
-                        f"time {self.env.now}.")
+                        f"time {env.now}.")
 
                 self.out.put(packet)
+        finally:
+            # closing the trace file
+            records.close()
+
+
+class MultiTracePacketGenerator:
+    """ Generates packets according to a trace file with many flows, sending the packets of each
+        flow to the ingress element of the flow.
+
+        The trace is read ahead in chunks of `read_ahead` records, so that the memory used does
+        not grow with the size of the trace. Packets with the same timestamp are sent without
+        scheduling any additional event.
+
+        Parameters
+        ----------
+        env: simpy.Environment
+            The simulation environment.
+        element_id: str
+            the ID of this element.
+        filename: str
+            The name of the trace file, either a binary trace or a text trace with a flow ID
+            column.
+        outs: dict
+            A dict that maps the flow IDs in the trace to their ingress elements.
+        default: object
+            The ingress element of the flows that are not in `outs`. If None, the packets of
+            these flows are counted in `packets_unrouted` and discarded.
+        initial_delay: number
+            Starts generation after an initial delay. Defaults to 0.
+        finish: number
+            Stops generation at the finish time. Defaults to infinite.
+        read_ahead: int
+            The number of records read at a time from the trace.
+    """
+    def __init__(self,
+                 env,
+                 element_id,
+                 filename,
+                 outs: dict,
+                 default=None,
+                 initial_delay=0,
+                 finish=float('inf'),
+                 read_ahead=65536,
+                 debug=False):
+        self.element_id = element_id
+        self.env = env
+        self.filename = filename
+        self.outs = outs
+        self.default = default
+        self.initial_delay = initial_delay
+        self.finish = finish
+        self.read_ahead = read_ahead
+        self.packets_sent = 0
+        # the number of packets sent in each flow, as `packets_sent` counts all flows
+        self.flow_packets_sent = dd(lambda: 0)
+        self.packets_unrouted = 0
+        self.action = env.process(self.run())
+
+        self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
+
+    def run(self):
+        """The generator function used in simulations."""
+        env = self.env
+        yield env.timeout(self.initial_delay)
+
+        outs = self.outs
+        default = self.default
+        element_id = self.element_id
+        last_packet_time = 0
+        flow_packets_sent = self.flow_packets_sent
+
+        chunks = traces.read_chunks(self.filename, chunk_size=self.read_ahead)
+        try:
+            for chunk in chunks:
+                for flow_id, packet_id, time, size in chunk:
+                    if env.now >= self.finish:
+                        return
+
+                    if time > last_packet_time:
+                        yield env.timeout(time - last_packet_time)
+                        last_packet_time = time
+
+                    out = outs.get(flow_id, default)
+                    if out is None:
+                        self.packets_unrouted += 1
+                        continue
+
+                    self.packets_sent += 1
+                    flow_packets_sent[flow_id] += 1
+                    packet = Packet(env.now, size, packet_id, src=element_id, flow_id=flow_id)
+
+                    if self.debug:
+                        self.tracer.debug(
+                            f"Sent packet {packet.packet_id} with flow_id {packet.flow_id} at "
+                            f"time {env.now}.")
 
-        except StopIteration:
-            pass
+                    out.put(packet)
+        finally:
+            # closing the trace file
+            chunks.close()
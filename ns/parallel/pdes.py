@@ -0,0 +1,339 @@
+"""
+Implements conservative parallel discrete-event simulation (PDES), in which a network is split
+into partitions that are simulated in separate processes, each with its own
+`simpy.Environment`.
+
+Partitions are connected by links with a propagation delay of at least `lookahead`. A packet
+sent over such a link at time t cannot affect the destination partition before t + lookahead,
+so that all partitions can safely simulate a window of `lookahead` time units independently of
+each other. The partitions are synchronized with the YAWNS protocol: at the end of each
+window, the packets that have crossed partitions are exchanged, and the next window starts at
+the earliest time at which any partition has an event or an incoming packet to process, so that
+idle periods are skipped.
+
+A network is described by a builder function, defined at the top level of a module so that it
+can be sent to the worker processes, which is called once in each partition to build the part
+of the network in that partition:
+
+    def builder(partition, **params):
+        env = partition.env
+        ...
+        partition.register('switch_1', switch)  # an element that receives remote packets
+        port.out = partition.link(1, 'switch_2', delay=0.01)  # a link to partition 1
+        ...
+        return lambda: {'received': sink.packets_received[0]}
+
+    simulation = ParallelSimulation(builder, n_partitions=2, lookahead=0.01)
+    summaries = simulation.run(until=100)
+
+The builder returns a no-parameter function that summarizes the results of the partition at
+the end of the run.
+
+Reference:
+
+D. M. Nicol, "The Cost of Conservative Synchronization in Parallel Discrete Event
+Simulations," J. ACM, vol. 40, no. 2, pp. 304-333, 1993.
+"""
+import multiprocessing
+import traceback
+
+import simpy
+from simpy.core import Infinity
+
+
+class Link:
+    """ A link with a constant propagation delay from an element in a partition to an element
+        registered by name in the same partition, or in another one.
+
+        Parameters
+        ----------
+        partition: Partition
+            the partition of the element that sends packets over this link.
+        dst_partition: int
+            the partition of the destination element.
+        dst_name: str
+            the name under which the destination element is registered.
+        delay: float
+            the propagation delay, which must be at least the lookahead of the simulation if
+            the link crosses partitions.
+    """
+    def __init__(self, partition, dst_partition: int, dst_name, delay: float):
+        if dst_partition != partition.partition_id and delay < partition.lookahead:
+            raise ValueError(
+                f"The delay of a link across partitions ({delay}) must not be smaller than "
+                f"the lookahead ({partition.lookahead}).")
+
+        self.partition = partition
+        self.env = partition.env
+        self.dst_partition = dst_partition
+        self.dst_name = dst_name
+        self.delay = delay
+        self.remote = dst_partition != partition.partition_id
+        self.packets_sent = 0
+
+    def put(self, packet):
+        """ Sends a packet to this element. """
+        self.packets_sent += 1
+        if self.remote:
+            self.partition.outbox.append(
+                (self.env.now + self.delay, self.dst_partition, self.dst_name, packet))
+        else:
+            self.partition.deliver(self.env.now + self.delay, self.dst_name, packet)
+
+
+class Partition:
+    """ A part of a network simulated in its own environment, which exchanges packets with the
+        other partitions through `Link`s.
+
+        Parameters
+        ----------
+        partition_id: int
+            the ID of this partition, between 0 and `n_partitions` - 1.
+        n_partitions: int
+            the number of partitions in the simulation.
+        lookahead: float
+            the smallest propagation delay of the links across partitions.
+    """
+    def __init__(self, partition_id: int, n_partitions: int, lookahead: float):
+        self.partition_id = partition_id
+        self.n_partitions = n_partitions
+        self.lookahead = lookahead
+        self.env = simpy.Environment()
+
+        # the elements that receive packets from links, by name
+        self.elements = {}
+
+        # (arrival time, destination partition, destination name, packet) for each packet
+        # sent to another partition during the current window
+        self.outbox = []
+
+    def register(self, name, element):
+        """ Registers an element under a name, so that links can send packets to it. """
+        self.elements[name] = element
+
+    def link(self, dst_partition: int, dst_name, delay: float) -> Link:
+        """ Returns a link to the element registered under `dst_name` in `dst_partition`. """
+        return Link(self, dst_partition, dst_name, delay)
+
+    def deliver(self, time, name, packet):
+        """ Delivers a packet to the element registered under `name` at the given time. """
+        element = self.elements[name]
+        self.env.timeout(time - self.env.now).callbacks.append(
+            lambda event: element.put(packet))
+
+    def advance(self, until, messages):
+        """ Delivers the packets received from other partitions, and simulates the window up
+            to (but excluding) time `until`. Returns the packets sent to other partitions
+            and the time of the next event in this partition.
+        """
+        for time, name, packet in messages:
+            self.deliver(time, name, packet)
+
+        if until > self.env.now:
+            self.env.run(until=until)
+
+        outbox, self.outbox = self.outbox, []
+        return outbox, self.env.peek()
+
+
+class RemoteTraceback(Exception):
+    """ The traceback of an exception raised in a worker process, attached as the cause of the
+        exception when it is raised again in the coordinator. """
+    def __init__(self, text: str):
+        super().__init__(text)
+        self.text = text
+
+    def __str__(self):
+        return self.text
+
+
+def serve(connection, builder, partition_id, n_partitions, lookahead, params):
+    """ Builds and simulates a partition in a worker process, following the commands sent by
+        the coordinator. An exception raised by the builder or the simulation is sent back to
+        the coordinator, along with its traceback, in place of the expected reply. """
+    try:
+        partition = Partition(partition_id, n_partitions, lookahead)
+        summary = builder(partition, **params)
+        connection.send(partition.env.peek())
+
+        while True:
+            command, until, messages = connection.recv()
+            if command == 'advance':
+                connection.send(partition.advance(until, messages))
+            else:
+                connection.send(summary() if summary is not None else None)
+                return
+    except EOFError:
+        # the coordinator has stopped
+        return
+    except Exception as error:
+        text = traceback.format_exc()
+        try:
+            connection.send(('error', error, text))
+        except Exception:
+            # the exception cannot be pickled
+            connection.send(('error', RuntimeError(repr(error)), text))
+    finally:
+        connection.close()
+
+
+def receive(connection, partition_id):
+    """ Receives the reply of a worker process, and raises the exception that stopped the
+        worker, if any, in the coordinator. """
+    try:
+        reply = connection.recv()
+    except EOFError:
+        raise RuntimeError(
+            f"The worker process of partition {partition_id} exited unexpectedly.") from None
+
+    if isinstance(reply, tuple) and len(reply) == 3 and reply[0] == 'error':
+        __, error, text = reply
+        error.__cause__ = RemoteTraceback(
+            f"\n\nIn the worker process of partition {partition_id}:\n{text}")
+        raise error
+
+    return reply
+
+
+class ParallelSimulation:
+    """ Runs a network split into partitions, each in its own process, using the YAWNS
+        conservative synchronization protocol.
+
+        Parameters
+        ----------
+        builder: function
+            A top-level function that takes a `Partition` and the keyword arguments in `params`,
+            builds the part of the network in that partition, and returns a no-parameter
+            function that summarizes its results (or None).
+        n_partitions: int
+            The number of partitions.
+        lookahead: float
+            The smallest propagation delay of the links across partitions.
+        params: dict
+            The keyword arguments passed to the builder.
+        processes: bool
+            If True, each partition runs in its own process; otherwise, all partitions run in
+            the current process, which is useful for debugging.
+    """
+    def __init__(self,
+                 builder,
+                 n_partitions: int,
+                 lookahead: float,
+                 params: dict = None,
+                 processes: bool = True):
+        if lookahead <= 0:
+            raise ValueError('The lookahead must be positive.')
+
+        self.builder = builder
+        self.n_partitions = n_partitions
+        self.lookahead = lookahead
+        self.params = params if params is not None else {}
+        self.processes = processes
+
+        # the number of windows simulated, and the number of packets exchanged
+        self.windows = 0
+        self.messages = 0
+
+    def run(self, until: float) -> list:
+        """ Runs the simulation up to time `until`, and returns the summaries of the
+            partitions. """
+        if self.processes:
+            return self.run_processes(until)
+        return self.run_local(until)
+
+    def synchronize(self, advance, peeks, until):
+        """ Simulates successive windows until time `until`, calling `advance(partition_id,
+            window end, messages)` to simulate each window in each partition. """
+        inboxes = [[] for __ in range(self.n_partitions)]
+
+        while True:
+            # the lower bound on the time stamps of all future events (YAWNS)
+            lower_bound = min(peeks)
+            for inbox in inboxes:
+                for message in inbox:
+                    lower_bound = min(lower_bound, message[0])
+
+            if lower_bound >= until or lower_bound == Infinity:
+                break
+
+            window_end = min(lower_bound + self.lookahead, until)
+            results = advance(window_end, inboxes)
+            self.windows += 1
+
+            inboxes = [[] for __ in range(self.n_partitions)]
+            for partition_id, (outbox, peek) in enumerate(results):
+                peeks[partition_id] = peek
+                for time, dst_partition, dst_name, packet in outbox:
+                    inboxes[dst_partition].append((time, dst_name, packet))
+                    self.messages += 1
+
+        # simulating all partitions up to `until`, and delivering the messages in flight
+        advance(until, inboxes)
+
+    def run_local(self, until):
+        """ Runs all the partitions in the current process. """
+        partitions = [
+            Partition(partition_id, self.n_partitions, self.lookahead)
+            for partition_id in range(self.n_partitions)
+        ]
+        summaries = [self.builder(partition, **self.params) for partition in partitions]
+        peeks = [partition.env.peek() for partition in partitions]
+
+        def advance(window_end, inboxes):
+            return [
+                partition.advance(window_end, inbox)
+                for partition, inbox in zip(partitions, inboxes)
+            ]
+
+        self.synchronize(advance, peeks, until)
+        return [summary() if summary is not None else None for summary in summaries]
+
+    def run_processes(self, until):
+        """ Runs each partition in its own worker process. """
+        connections = []
+        workers = []
+        for partition_id in range(self.n_partitions):
+            parent, child = multiprocessing.Pipe()
+            worker = multiprocessing.Process(target=serve,
+                                             args=(child, self.builder, partition_id,
+                                                   self.n_partitions, self.lookahead,
+                                                   self.params),
+                                             daemon=True)
+            worker.start()
+            # the worker holds the only other end of the pipe, so that the coordinator sees
+            # an EOFError rather than blocking forever if the worker exits
+            child.close()
+            connections.append(parent)
+            workers.append(worker)
+
+        def receive_all():
+            return [
+                receive(connection, partition_id)
+                for partition_id, connection in enumerate(connections)
+            ]
+
+        try:
+            peeks = receive_all()
+
+            def advance(window_end, inboxes):
+                for connection, inbox in zip(connections, inboxes):
+                    connection.send(('advance', window_end, inbox))
+                return receive_all()
+
+            self.synchronize(advance, peeks, until)
+
+            for connection in connections:
+                connection.send(('summary', until, None))
+            return receive_all()
+        except BaseException:
+            # the other workers may be waiting for a command that will never come
+            for worker in workers:
+                worker.terminate()
+            raise
+        finally:
+            for connection in connections:
+                connection.close()
+            for worker in workers:
+                worker.join(timeout=1)
+                if worker.is_alive():
+                    worker.terminate()
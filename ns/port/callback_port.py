@@ -0,0 +1,172 @@
+"""
+Implements a port with an output buffer, given an output rate and a buffer size (in either bytes
+or the number of packets), using the simple tail-drop mechanism to drop packets. It behaves in
+the same way as `Port`, but is driven by callbacks rather than by a SimPy process.
+
+`Port` resumes its process, creates a `get()` event on its `simpy.Store` and a timeout event
+for every packet it transmits. `CallbackPort` keeps its buffer in a `PacketQueue` and schedules
+a single timeout per packet, whose callback hands the packet to the downstream element and
+starts the transmission of the next packet in the buffer, if there is one.
+"""
+from ns.utils.packetqueue import PacketQueue
+from ns.utils.tracing import Tracer
+
+
+class CallbackPort:
+    """ Models an output port on a switch with a given rate and buffer size (in either bytes
+        or the number of packets), using the simple tail-drop mechanism to drop packets. It
+        can be used in place of `Port`, including with a `PortMonitor`.
+
+        Parameters
+        ----------
+        env: simpy.Environment
+            the simulation environment.
+        rate: float
+            the bit rate of the port (0 for unlimited).
+        element_id: int
+            the element id of this port.
+        qlimit: integer (or None)
+            a queue limit in bytes or packets (including the packet in service), beyond
+            which all packets will be dropped.
+        limit_bytes: bool
+            if True, the queue limit will be based on bytes; if False, the queue limit
+            will be based on packets.
+        zero_downstream_buffer: bool
+            if True, assume that the downstream element does not have any buffers,
+            and backpressure is in effect so that all waiting packets queue up in this
+            element's buffer.
+        debug: bool
+            If True, prints more verbose debug information.
+    """
+
+    def __init__(self,
+                 env,
+                 rate: float,
+                 qlimit: int = None,
+                 limit_bytes: bool = False,
+                 zero_downstream_buffer: bool = False,
+                 element_id: int = None,
+                 debug: bool = False):
+        self.store = PacketQueue()
+        self.rate = rate
+        self.env = env
+        self.out = None
+        self.packets_received = 0
+        self.packets_dropped = 0
+        self.qlimit = qlimit
+        self.limit_bytes = limit_bytes
+        self.byte_size = 0
+        self.element_id = element_id
+
+        self.zero_downstream_buffer = zero_downstream_buffer
+        if self.zero_downstream_buffer:
+            # the packets waiting to be transmitted; they stay in `store` until they
+            # have been retrieved by the downstream element
+            self.downstream_store = PacketQueue()
+
+        self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
+        self.busy = 0  # used to track if a packet is currently being sent
+        self.busy_packet_size = 0
+        self.packet_in_service = None
+
+    def update(self, packet):
+        """
+        The packet has just been retrieved from this element's own buffer by a downstream
+        node that has no buffers.
+        """
+        self.byte_size -= packet.size
+        if not self.store:
+            # avoiding the drift of floating-point packet sizes
+            self.byte_size = 0
+
+        if self.debug:
+            self.tracer.debug(
+                f"Retrieved Packet {packet.packet_id} from flow {packet.flow_id}."
+            )
+
+    def transmit(self, packet):
+        """ Starts transmitting a packet, scheduling a callback for when it has been sent. """
+        self.busy = 1
+        self.busy_packet_size = packet.size
+        self.packet_in_service = packet
+
+        if self.rate > 0:
+            packet.begin_transmission = self.env.now
+            if self.debug:
+                self.tracer.debug(
+                    f"Begins port transmission at: {packet.begin_transmission}, "
+                    f"flow_id {packet.flow_id}, packet size in bytes: {packet.size}"
+                )
+            self.env.timeout(packet.size * 8.0 / self.rate).callbacks.append(
+                self.transmitted)
+        else:
+            self.transmitted(None)
+
+    def transmitted(self, event):
+        """ Called when the packet in service has been sent out. """
+        packet = self.packet_in_service
+        self.packet_in_service = None
+
+        if self.debug and self.rate > 0:
+            self.tracer.debug(f"Ends port transmission at: {self.env.now}")
+
+        if self.zero_downstream_buffer:
+            self.out.put(packet,
+                         upstream_update=self.update,
+                         upstream_store=self.store)
+            waiting = self.downstream_store
+        else:
+            self.byte_size -= packet.size
+            if not self.store:
+                self.byte_size = 0
+            self.out.put(packet)
+            waiting = self.store
+
+        self.busy = 0
+        self.busy_packet_size = 0
+
+        if waiting:
+            self.transmit(waiting.popleft())
+
+    def put(self, packet):
+        """ Sends a packet to this element. """
+        self.packets_received += 1
+
+        byte_count = self.byte_size + packet.size
+
+        if self.element_id is not None:
+            packet.perhop_time[self.element_id] = self.env.now
+
+        if self.qlimit is not None:
+            if self.limit_bytes and byte_count >= self.qlimit:
+                self.packets_dropped += 1
+                if self.debug:
+                    self.tracer.debug(
+                        f"Packet dropped: flow id = {packet.flow_id} and packet id = {packet.packet_id}"
+                    )
+                return
+            if not self.limit_bytes and len(self.store) >= self.qlimit - 1:
+                self.packets_dropped += 1
+                if self.debug:
+                    self.tracer.debug(
+                        f"Packet dropped: flow id = {packet.flow_id}, packet id = {packet.packet_id}"
+                    )
+                return
+
+            if self.debug:
+                self.tracer.debug(f"Queue length at port: {len(self.store)} packets.")
+
+        self.byte_size = byte_count
+
+        if self.zero_downstream_buffer:
+            self.store.append(packet)
+            if self.busy:
+                self.downstream_store.append(packet)
+            else:
+                self.transmit(packet)
+        elif self.busy:
+            self.store.append(packet)
+        else:
+            # as with `Port`, the packet in service is not in the buffer
+            self.transmit(packet)
@@ -0,0 +1,218 @@
+"""
+Implements a port with an output buffer, given an output rate and a buffer size (in either bytes
+or the number of packets), using the simple tail-drop mechanism to drop packets. Rather than
+simulating the transmission of every packet, the port tracks its backlog as a fluid queue.
+
+Since the port serves its packets in first-in-first-out order at a constant rate, the departure
+time of each packet is known as soon as it arrives, using Lindley's recursion:
+
+    departure = max(arrival, departure of the previous packet) + size * 8 / rate
+
+The port keeps the packets it has accepted, along with their departure times. With batched
+delivery (see below), it only materializes the state of its queue when it is needed: when a
+packet arrives and a drop decision has to be made, or when a `PortMonitor` looks at the port.
+Packets that have departed by then are removed from the queue. Without it, the queue is also
+brought up to date at the departure of each packet.
+
+By default, each packet is delivered downstream at its departure time. With `batch=True`, and a
+downstream element that accepts packets with their arrival times through a `put_at()` call, as
+`PacketSink` does, the departed packets are delivered to it in batches, and the port only
+schedules an event when its backlog is expected to drain, rather than one event per packet.
+This makes long busy periods at high utilization cheap to simulate, but the downstream element
+does not see a packet until the backlog drains, so batching is only suitable for sinks that
+record statistics, not for elements that react to each packet, such as a `TCPSink` sending
+acknowledgements. The packets that have departed before the end of a simulation but are still
+in the queue should be delivered with `flush()` before reading the statistics of the sink.
+"""
+from collections import deque
+from itertools import islice
+
+from ns.utils.tracing import Tracer
+
+
+class HybridPort:
+    """ Models an output port on a switch with a given rate and buffer size (in either bytes
+        or the number of packets), using the simple tail-drop mechanism to drop packets, and
+        tracking its backlog as a fluid queue. It can be used in place of `Port` (without a
+        zero downstream buffer), including with a `PortMonitor`.
+
+        Parameters
+        ----------
+        env: simpy.Environment
+            the simulation environment.
+        rate: float
+            the bit rate of the port (0 for unlimited).
+        element_id: int
+            the element id of this port.
+        qlimit: integer (or None)
+            a queue limit in bytes or packets (including the packet in service), beyond
+            which all packets will be dropped.
+        limit_bytes: bool
+            if True, the queue limit will be based on bytes; if False, the queue limit
+            will be based on packets.
+        debug: bool
+            If True, prints more verbose debug information.
+        batch: bool
+            If True, the departed packets are delivered in batches through the `put_at()` call
+            of the downstream element, when the backlog drains or when `flush()` is called,
+            rather than one at a time at their departure times. The downstream element does
+            not see any packet of a busy period until then.
+    """
+
+    def __init__(self,
+                 env,
+                 rate: float,
+                 qlimit: int = None,
+                 limit_bytes: bool = False,
+                 element_id: int = None,
+                 debug: bool = False,
+                 batch: bool = False):
+        self.rate = rate
+        self.env = env
+        self.out = None
+        self.packets_received = 0
+        self.packets_dropped = 0
+        self.qlimit = qlimit
+        self.limit_bytes = limit_bytes
+        self.element_id = element_id
+        self.batch = batch
+
+        # (departure time, packet) for each packet that has not departed yet, with the
+        # packet in service at the head
+        self.backlog = deque()
+        self.backlog_bytes = 0
+
+        # the time at which the port is expected to wake up, or None
+        self.wakeup = None
+
+        self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
+
+    def advance(self):
+        """ Removes the packets that have departed by the current time from the queue, and
+            delivers them downstream.
+        """
+        backlog = self.backlog
+        now = self.env.now
+        if not backlog or backlog[0][0] > now:
+            return
+
+        put_at = self.out.put_at if self.batch else None
+        while backlog and backlog[0][0] <= now:
+            departure, packet = backlog.popleft()
+            self.backlog_bytes -= packet.size
+
+            if self.debug:
+                self.tracer.debug(f"Packet {packet.packet_id} departed at: {departure}")
+
+            if put_at is None:
+                self.out.put(packet)
+            else:
+                put_at(packet, departure)
+
+        if not backlog:
+            # avoiding the drift of floating-point packet sizes
+            self.backlog_bytes = 0
+
+    def flush(self):
+        """ Delivers all the packets that have departed by the current time. """
+        self.advance()
+
+    def wake(self, event):
+        """ Called at a departure time scheduled by the port. """
+        self.wakeup = None
+        self.advance()
+        self.schedule()
+
+    def schedule(self):
+        """ Schedules the next wakeup: when the backlog is expected to drain if the packets are
+            delivered in batches, or when the next packet departs otherwise.
+        """
+        if self.wakeup is not None or not self.backlog:
+            return
+
+        if self.batch:
+            self.wakeup = self.backlog[-1][0]
+        else:
+            self.wakeup = self.backlog[0][0]
+
+        self.env.timeout(self.wakeup - self.env.now).callbacks.append(self.wake)
+
+    @property
+    def store(self):
+        """ The queue of this port, for compatibility with `Port`; its `items` are the packets
+            waiting for transmission. """
+        self.advance()
+        return self
+
+    @property
+    def items(self) -> list:
+        """ The packets waiting for transmission, excluding the packet in service. """
+        return [packet for __, packet in islice(self.backlog, 1, None)]
+
+    @property
+    def byte_size(self):
+        """ The current size of the queue in bytes, including the packet in service. """
+        self.advance()
+        return self.backlog_bytes
+
+    @property
+    def busy(self) -> int:
+        """ 1 if a packet is currently being sent, 0 otherwise. """
+        self.advance()
+        return 1 if self.backlog else 0
+
+    @property
+    def busy_packet_size(self):
+        """ The size of the packet currently being sent, or 0 if the port is idle. """
+        self.advance()
+        return self.backlog[0][1].size if self.backlog else 0
+
+    def put(self, packet):
+        """ Sends a packet to this element. """
+        self.packets_received += 1
+        now = self.env.now
+
+        if self.element_id is not None:
+            packet.perhop_time[self.element_id] = now
+
+        if self.rate <= 0:
+            self.out.put(packet)
+            return
+
+        self.advance()
+        backlog = self.backlog
+
+        if self.qlimit is not None:
+            if self.limit_bytes and self.backlog_bytes + packet.size >= self.qlimit:
+                self.packets_dropped += 1
+                if self.debug:
+                    self.tracer.debug(
+                        f"Packet dropped: flow id = {packet.flow_id} and packet id = {packet.packet_id}"
+                    )
+                return
+            if not self.limit_bytes and max(len(backlog) - 1, 0) >= self.qlimit - 1:
+                self.packets_dropped += 1
+                if self.debug:
+                    self.tracer.debug(
+                        f"Packet dropped: flow id = {packet.flow_id}, packet id = {packet.packet_id}"
+                    )
+                return
+
+        # Lindley's recursion
+        if backlog:
+            begin = backlog[-1][0]
+        else:
+            begin = now
+        packet.begin_transmission = begin
+        departure = begin + packet.size * 8.0 / self.rate
+
+        backlog.append((departure, packet))
+        self.backlog_bytes += packet.size
+
+        if self.debug:
+            self.tracer.debug(
+                f"Packet {packet.packet_id} from flow {packet.flow_id} will begin port "
+                f"transmission at: {begin} and depart at: {departure}")
+
+        self.schedule()
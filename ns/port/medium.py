@@ -1,101 +1,364 @@
+"""
+Implements a shared medium, such as a bus or a radio channel, on which stations contend for
+transmission with a medium access policy.
+
+A station starts a transmission when its policy allows it to; the transmission lasts for the
+transmission time of the packet at the rate of the medium, and is heard by the other stations
+after a propagation delay. Transmissions that overlap in time collide. At the end of each
+transmission, the medium calls back its sender: `transmitted()` if the packet went through, in
+which case it is sent to the `out` member of the medium, or `collided()`, in which case the
+policy of the medium decides when the sender tries again.
+
+The medium is driven by callbacks on timeouts, with one event per attempt and one per
+transmission (two if it is aborted), so that an idle medium does not cost any event. The following policies are
+available:
+
+* `SlottedAloha`: stations transmit at slot boundaries, without sensing the medium, and
+  retransmit in each of the following slots with a given probability after a collision.
+
+* `CSMA`: stations sense the medium and defer their transmissions while it is busy, and back
+  off for a random number of slots after a collision. With collision detection (CSMA/CD), a
+  station aborts its transmission as soon as it hears another one.
+
+* `BinaryExponentialBackoff`: CSMA/CD in which the backoff window doubles after each collision,
+  as in Ethernet, and packets are dropped after too many collisions.
+"""
+import math
 import random
-import simpy
+from collections import deque
+
+from ns.utils.tracing import Tracer
+
+
+class SlottedAloha:
+    """ Slotted ALOHA: a packet is transmitted at the next slot boundary, and after a collision,
+        it is retransmitted in each of the following slots with probability `probability`.
+
+        Parameters
+        ----------
+        slot_duration: float
+            the duration of a slot, which should be at least the transmission time of a packet.
+        probability: float
+            the probability of retransmitting in each slot after a collision.
+        max_attempts: int
+            the number of collisions after which a packet is dropped; by default, packets are
+            retransmitted until they go through.
+    """
+    sense = False
+    collision_detection = False
+
+    def __init__(self, slot_duration: float, probability: float, max_attempts: int = None):
+        if not 0 < probability <= 1:
+            raise ValueError('The probability of retransmission must be in (0, 1].')
+
+        self.slot_duration = slot_duration
+        self.probability = probability
+        self.max_attempts = max_attempts
+
+    def first_attempt(self, now, rng) -> float:
+        """ Returns the time of the first attempt to transmit a packet. """
+        return math.ceil(now / self.slot_duration - 1e-9) * self.slot_duration
+
+    def retry(self, now, attempts, rng):
+        """ Returns the time of the next attempt after `attempts` collisions, or None to drop
+            the packet. """
+        if self.max_attempts is not None and attempts >= self.max_attempts:
+            return None
+
+        # the number of slots before the first success of Bernoulli trials
+        slots = 0
+        if self.probability < 1:
+            slots = int(math.log(1.0 - rng.random()) / math.log(1 - self.probability))
+        return self.first_attempt(now, rng) + slots * self.slot_duration
+
+
+class CSMA:
+    """ Carrier-sense multiple access: a station transmits as soon as it has a packet and senses
+        the medium idle. If the medium is busy, it waits until the medium becomes idle, and then
+        transmits with probability `persistence`, or waits for another slot. After a collision,
+        it backs off for a number of slots drawn uniformly from [0, `backoff_window`).
+
+        Parameters
+        ----------
+        slot_duration: float
+            the duration of a backoff slot.
+        persistence: float
+            the probability of transmitting in each slot once the medium becomes idle.
+        backoff_window: int
+            the number of backoff slots to draw from after a collision.
+        max_attempts: int
+            the number of collisions after which a packet is dropped; by default, packets are
+            retransmitted until they go through.
+        collision_detection: bool
+            if True, a station aborts its transmission as soon as it hears another one.
+    """
+    sense = True
+
+    def __init__(self,
+                 slot_duration: float,
+                 persistence: float = 1.0,
+                 backoff_window: int = 16,
+                 max_attempts: int = None,
+                 collision_detection: bool = False):
+        if not 0 < persistence <= 1:
+            raise ValueError('The persistence must be in (0, 1].')
+
+        self.slot_duration = slot_duration
+        self.persistence = persistence
+        self.backoff_window = backoff_window
+        self.max_attempts = max_attempts
+        self.collision_detection = collision_detection
+
+    def first_attempt(self, now, rng) -> float:
+        """ Returns the time of the first attempt to transmit a packet. """
+        return now
+
+    def defer(self, now, rng) -> float:
+        """ Returns the time of the next attempt of a station that has waited for the medium to
+            become idle at time `now`. """
+        if self.persistence >= 1:
+            return now
+        slots = int(math.log(1.0 - rng.random()) / math.log(1 - self.persistence))
+        return now + slots * self.slot_duration
+
+    def backoff_slots(self, attempts, rng) -> int:
+        """ Returns the number of slots to back off for after `attempts` collisions. """
+        return rng.randrange(self.backoff_window)
+
+    def retry(self, now, attempts, rng):
+        """ Returns the time of the next attempt after `attempts` collisions, or None to drop
+            the packet. """
+        if self.max_attempts is not None and attempts >= self.max_attempts:
+            return None
+        return now + self.backoff_slots(attempts, rng) * self.slot_duration
+
+
+class BinaryExponentialBackoff(CSMA):
+    """ CSMA/CD with binary exponential backoff: after the k-th collision of a packet, the station
+        backs off for a number of slots drawn uniformly from [0, 2^min(k, `max_exponent`)), and
+        the packet is dropped after `max_attempts` collisions.
+
+        Parameters
+        ----------
+        slot_duration: float
+            the duration of a backoff slot.
+        persistence: float
+            the probability of transmitting in each slot once the medium becomes idle.
+        max_exponent: int
+            the largest exponent of the backoff window.
+        max_attempts: int
+            the number of collisions after which a packet is dropped.
+        collision_detection: bool
+            if True, a station aborts its transmission as soon as it hears another one.
+    """
+    def __init__(self,
+                 slot_duration: float,
+                 persistence: float = 1.0,
+                 max_exponent: int = 10,
+                 max_attempts: int = 16,
+                 collision_detection: bool = True):
+        super().__init__(slot_duration,
+                         persistence,
+                         max_attempts=max_attempts,
+                         collision_detection=collision_detection)
+        self.max_exponent = max_exponent
+
+    def backoff_slots(self, attempts, rng) -> int:
+        """ Returns the number of slots to back off for after `attempts` collisions. """
+        return rng.randrange(2**min(attempts, self.max_exponent))
+
+
+class MediumStation:
+    """ A station attached to a `Medium`, which queues the packets sent to it and transmits them
+        on the medium one at a time, following the policy of the medium.
+
+        Parameters
+        ----------
+        medium: Medium
+            the medium shared by the stations.
+        station_id: int
+            the index of this station in the medium.
+    """
+    def __init__(self, medium, station_id: int):
+        self.medium = medium
+        self.env = medium.env
+        self.station_id = station_id
+        self.queue = deque()
+        # the number of collisions of the packet at the head of the queue
+        self.attempts = 0
+
+    def put(self, packet):
+        """ Sends a packet to this element. """
+        self.medium.packets_received += 1
+        self.queue.append(packet)
+        if len(self.queue) == 1:
+            self.schedule(self.medium.policy.first_attempt(self.env.now, self.medium.rng))
+
+    def schedule(self, time):
+        """ Schedules an attempt to transmit the packet at the head of the queue. """
+        if time <= self.env.now:
+            self.medium.attempt(self)
+        else:
+            self.env.timeout(time - self.env.now).callbacks.append(
+                lambda event: self.medium.attempt(self))
+
+    def transmitted(self, packet):
+        """ Called by the medium when a packet has been transmitted without a collision. """
+        self.queue.popleft()
+        self.attempts = 0
+        if self.queue:
+            self.schedule(self.medium.policy.first_attempt(self.env.now, self.medium.rng))
+
+    def collided(self, packet):
+        """ Called by the medium when a packet has collided with another one. """
+        self.attempts += 1
+        retry = self.medium.policy.retry(self.env.now, self.attempts, self.medium.rng)
+        if retry is not None:
+            self.schedule(retry)
+            return
+
+        self.medium.packets_dropped += 1
+        if self.medium.debug:
+            self.medium.tracer.debug(f"Station {self.station_id} drops {packet} after "
+                                     f"{self.attempts} collisions.")
+        self.transmitted(packet)
+
 
 class Medium:
-    """ Implements a medium that simulates the slotted Aloha access scheme.
-        if a station misses out the allowed time, it must wait for the next time slot
+    """ A medium shared by `n_stations` stations, available as `stations[i]`, which transmit
+        packets following a medium access policy. Packets that go through are sent to the `out`
+        member of the medium.
 
         Parameters
         ----------
         env: simpy.Environment
             the simulation environment.
-        slots: int
-            the number of available time slots in each frame.
+        n_stations: int
+            the number of stations attached to the medium.
+        rate: float
+            the bit rate of the medium, which determines the transmission time of a packet.
+        policy:
+            the medium access policy: `SlottedAloha`, `CSMA`, or `BinaryExponentialBackoff`.
+        propagation_delay: float
+            the time it takes for a transmission to be heard by the other stations, and to
+            reach the downstream element.
+        element_id: str
+            the element ID of this medium.
+        seed: int
+            the seed for the random number generator of the policy.
+        debug: bool
+            If True, prints more verbose debug information.
     """
-
-    def __init__(self, env, slots):
+    def __init__(self,
+                 env,
+                 n_stations: int,
+                 rate: float,
+                 policy,
+                 propagation_delay: float = 0.0,
+                 element_id=None,
+                 seed=None,
+                 debug: bool = False):
         self.env = env
-        self.slots = slots # Divide the shared channel into discrete time intervals
-        self.packet_queue = [] # a queue to hold packets that are waiting to be transmitted
-        self.transmitting = False  # Flag indicating if the medium is currently transmitting a packet
-
-    def transmit(self):
-        """
-        Transmits packets in the packet queue according to the slotted Aloha access scheme.
-
-        The transmission process occurs as follows:
-        1. If the medium is not currently transmitting a packet and there are packets in the queue,
-           the first packet in the queue is selected for transmission.
-        2. The packet is transmitted and the transmission duration is determined by the propagation delay.
-        3. After the transmission duration, the packet is removed from the queue.
-        4. The medium checks if there are more packets in the queue and repeats the process.
-
-        This method is executed as a continuous process in the simulation environment.
-        """
-        while True:
-            if not self.transmitting and self.packet_queue:
-                packet = self.packet_queue[0]  # Select the first packet in the queue for transmission
-                self.transmitting = True  # Set the transmitting flag to indicate that the medium is busy
-                if self.debug:
-                    print("Transmitting packet:", packet)
-                yield self.env.timeout(self.propagation_delay())  # Simulate the transmission duration
-                self.packet_queue.pop(0)  # Remove the transmitted packet from the queue
-                self.transmitting = False  # Set the transmitting flag to indicate that the medium is idle
-            else:
-                # If there are no packets in the queue or the medium is already transmitting,
-                # yield to the simulation environment until a new packet arrives or the transmission completes
-                yield self.env.timeout(0)
-
-
-    def process_frame(self):
-        """ Processes a frame of transmission slots and performs collision detection. """
-        while len(self.packet_queue) > 0:
-            frame = self.packet_queue[:self.slots]
-            self.packet_queue = self.packet_queue[self.slots:]
-
-            if len(frame) == 1:
-                # Only one packet in the frame, no collision
-                self.receive_packet(frame[0])
-            else:
-                # Collision detected
-                self.handle_collision(frame)
-
-            # Wait for the next frame
-            yield self.env.timeout(1)
-
-    def handle_collision(self, frame):
-        """ Handles collision in a frame of packets.
-
-            Parameters
-            ----------
-            frame: list
-                the list of packets in the frame.
-        """
-        # Implement the collision resolution mechanism here (e.g., random backoff, exponential backoff, etc.)
-        # For example, drop all the packets in the frame and notify the sender about the collision.
-        for packet in frame:
-            packet.sender.handle_collision(packet)
-
-    def receive_packet(self, packet):
-        """ Receives a successfully transmitted packet.
-
-            Parameters
-            ----------
-            packet: Packet
-                the received packet.
-        """
-        packet.receiver.receive_packet(packet)
-
-
-    def enqueue_packet(self, packet):
-        """
-        Enqueues a packet in the packet queue.
+        self.rate = rate
+        self.policy = policy
+        self.propagation_delay = propagation_delay
+        self.element_id = element_id
+        self.out = None
+        self.rng = random.Random(seed)
 
-        Parameters
-        ----------
-        packet : object
-            The packet to be enqueued.
-        """
-        self.packet_queue.append(packet)  # Add the packet to the end of the packet queue
+        self.stations = [MediumStation(self, i) for i in range(n_stations)]
+
+        # [start, end, station, packet, collided] for each transmission that may still be
+        # heard by a station
+        self.active = []
+        # the stations waiting for the medium to become idle
+        self.deferred = []
+
+        self.packets_received = 0
+        self.packets_sent = 0
+        self.packets_collided = 0
+        self.packets_dropped = 0
+        self.attempts = 0
+        self.busy_time = 0.0
+
+        self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
+
+    def busy(self) -> bool:
+        """ Returns whether a station senses the medium busy now. """
+        now = self.env.now
+        delay = self.propagation_delay
+        return any(t[0] + delay <= now < t[1] + delay for t in self.active)
+
+    def attempt(self, station):
+        """ Starts transmitting the packet at the head of the queue of a station, unless the
+            policy senses the medium busy. """
+        if self.policy.sense and self.busy():
+            self.deferred.append(station)
+            return
+
+        now = self.env.now
+        delay = self.propagation_delay
+        detection = self.policy.collision_detection
+        packet = station.queue[0]
+        transmission = [now, now + packet.size * 8.0 / self.rate, station, packet, False]
+        self.attempts += 1
+
+        for other in self.active:
+            if other[1] > now:
+                # the transmissions overlap
+                other[4] = True
+                transmission[4] = True
+
+                if detection:
+                    # each station aborts when it hears the other transmission
+                    if now + delay < other[1]:
+                        other[1] = now + delay
+                        self.schedule_finish(other)
+                    transmission[1] = min(transmission[1], max(now, other[0] + delay))
+
+        self.active.append(transmission)
         if self.debug:
-            print("Enqueued packet:", packet)
\ No newline at end of file
+            self.tracer.debug(f"Station {station.station_id} starts transmitting {packet}"
+                              f"{', which collides' if transmission[4] else ''}.")
+
+        self.schedule_finish(transmission)
+
+    def schedule_finish(self, transmission):
+        """ Schedules the end of a transmission, once it has reached every station. A
+            transmission that is aborted is scheduled again, and its earlier end is ignored. """
+        end = transmission[1]
+        self.env.timeout(end + self.propagation_delay - self.env.now).callbacks.append(
+            lambda event: self.finish(transmission, end))
+
+    def finish(self, transmission, end):
+        """ Called when a transmission has reached every station. """
+        if transmission[1] != end:
+            return
+        self.active.remove(transmission)
+        start, end, station, packet, collided = transmission
+
+        if collided:
+            self.packets_collided += 1
+            if self.debug:
+                self.tracer.debug(f"COLLISION: {packet} from station {station.station_id}.")
+            station.collided(packet)
+        else:
+            self.packets_sent += 1
+            self.busy_time += end - start
+            if self.debug:
+                self.tracer.debug(f"Transmitted {packet} from station {station.station_id}.")
+            station.transmitted(packet)
+            self.out.put(packet)
+
+        if self.deferred and not self.busy():
+            deferred, self.deferred = self.deferred, []
+            for waiting in deferred:
+                waiting.schedule(self.policy.defer(self.env.now, self.rng))
+
+    def throughput(self) -> float:
+        """ Returns the fraction of time spent transmitting packets that went through. """
+        if self.env.now > 0:
+            return self.busy_time / self.env.now
+
+        return 0.0
@@ -17,13 +17,37 @@ class PortMonitor:
         dist: function
             a no parameter function that returns the successive inter-arrival
             times of the packets
+        pkt_in_service_included: bool
+            If True, monitor packets in service + in the queue;
+            If False, only monitor packets in queue.
+        rec_sizes: bool
+            If True, every sample is recorded in the `sizes` and `sizes_byte` lists.
+        size_summary: function
+            a no parameter function, such as `ns.utils.stats.StreamingSummary`, that
+            creates a streaming summary. If provided, the samples are also added to
+            `size_summary` (in packets) and `byte_size_summary` (in bytes), so that
+            their distribution can be reported without recording them.
     """
-    def __init__(self, env, port, dist, pkt_in_service_included=False):
+    def __init__(self,
+                 env,
+                 port,
+                 dist,
+                 pkt_in_service_included=False,
+                 rec_sizes=True,
+                 size_summary=None):
         self.port = port
         self.env = env
         self.dist = dist
         self.sizes = []
         self.sizes_byte = []
+        self.rec_sizes = rec_sizes
+
+        self.size_summary = None
+        self.byte_size_summary = None
+        if size_summary is not None:
+            self.size_summary = size_summary()
+            self.byte_size_summary = size_summary()
+
         self.action = env.process(self.run())
         self.pkt_in_service_included = pkt_in_service_included
 
@@ -39,5 +63,10 @@ class PortMonitor:
                 total_byte = self.port.byte_size
                 total = len(self.port.store.items)
 
-            self.sizes.append(total)
-            self.sizes_byte.append(total_byte)
+            if self.rec_sizes:
+                self.sizes.append(total)
+                self.sizes_byte.append(total_byte)
+
+            if self.size_summary is not None:
+                self.size_summary.add(total)
+                self.byte_size_summary.add(total_byte)
@@ -4,6 +4,8 @@ or the number of packets). This implementation uses the simple tail-drop mechani
 """
 import simpy
 
+from ns.utils.tracing import Tracer
+
 
 class Port:
     """ Models an output port on a switch with a given rate and buffer size (in either bytes
@@ -47,7 +49,9 @@ class Port:
         self.packets_dropped = 0
         self.qlimit = qlimit
         self.limit_bytes = limit_bytes
-        self.byte_size = 0  # the current size of the queue in bytes
+        # the current size of the queue in bytes, maintained incrementally as
+        # packets enter and leave the buffer
+        self.byte_size = 0
         self.element_id = element_id
 
         self.zero_downstream_buffer = zero_downstream_buffer
@@ -55,6 +59,7 @@ class Port:
             self.downstream_store = simpy.Store(env)
 
         self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
         self.busy = 0  # used to track if a packet is currently being sent
         self.busy_packet_size = 0
 
@@ -65,9 +70,13 @@ class Port:
         The packet has just been retrieved from this element's own buffer by a downstream
         node that has no buffers.
         """
-        # There is nothing that needs to be done, just print a debug message
+        self.byte_size -= packet.size
+        if not self.store.items:
+            # avoiding the drift of floating-point packet sizes
+            self.byte_size = 0
+
         if self.debug:
-            print(
+            self.tracer.debug(
                 f"Retrieved Packet {packet.packet_id} from flow {packet.flow_id}."
             )
 
@@ -83,18 +92,25 @@ class Port:
             self.busy_packet_size = packet.size
             if self.rate > 0:
                 packet.begin_transmission = self.env.now # Record the begin_transmission time
-                print("Begins port transmission at: ",packet.begin_transmission, packet.flow_id)
-                # current time
+                if self.debug:
+                    self.tracer.debug(
+                        f"Begins port transmission at: {packet.begin_transmission}, "
+                        f"flow_id {packet.flow_id}, packet size in bytes: {packet.size}"
+                    )
                 yield self.env.timeout(packet.size * 8.0 / self.rate) # Transmission time of the packet based on the rate
-                self.byte_size -= packet.size # The decrease in the size of the queue after sending out the packet
-                print("Packet size in Byte: ", packet.size)
-                print("Ends port transmission at: ",self.env.now)
+                if self.debug:
+                    self.tracer.debug(f"Ends port transmission at: {self.env.now}")
 
             if self.zero_downstream_buffer:
                 self.out.put(packet,
                              upstream_update=self.update,
                              upstream_store=self.store)
             else:
+                # The packet leaves the buffer once it has been sent out; with
+                # a zero downstream buffer, this happens in update() instead
+                self.byte_size -= packet.size
+                if not self.store.items:
+                    self.byte_size = 0
                 self.out.put(packet)
 
             self.busy = 0
@@ -104,12 +120,6 @@ class Port:
         """ Sends a packet to this element. """
         self.packets_received += 1
 
-        if self.zero_downstream_buffer:
-            # If the downstream node has no buffer, packets will be removed
-            # from this buffer by the downstream node, and the byte size of the
-            # buffer should be recomputed
-            self.byte_size = sum(packet.size for packet in self.store.items)
-
         byte_count = self.byte_size + packet.size
 
         if self.element_id is not None:
@@ -124,19 +134,19 @@ class Port:
         if self.limit_bytes and byte_count >= self.qlimit:
             self.packets_dropped += 1
             if self.debug:
-                print(
+                self.tracer.debug(
                     f"Packet dropped: flow id = {packet.flow_id} and packet id = {packet.packet_id}"
                 )
         elif not self.limit_bytes and len(self.store.items) >= self.qlimit - 1:
             self.packets_dropped += 1
             if self.debug:
-                print(
+                self.tracer.debug(
                     f"Packet dropped: flow id = {packet.flow_id}, packet id = {packet.packet_id}"
                 )
         else:
             # If the packet has not been dropped, record the queue length at this port
             if self.debug:
-                print(
+                self.tracer.debug(
                     f"Queue length at port: {len(self.store.items)} packets.")
 
             self.byte_size = byte_count
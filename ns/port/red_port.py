@@ -92,12 +92,6 @@ class REDPort(Port):
         """ Sends a packet to this element. """
         self.packets_received += 1
 
-        if self.zero_downstream_buffer:
-            # If the downstream node has no buffer, packets will be removed
-            # from this buffer by the downstream node, and the byte size of the
-            # buffer should be recomputed
-            self.byte_size = sum(packet.size for packet in self.store.items)
-
         if self.limit_bytes:
             current_queue_size = self.byte_size
         else:
@@ -110,16 +104,17 @@ class REDPort(Port):
         if self.average_queue_size >= self.qlimit:
             self.packets_dropped += 1
             if self.debug:
-                print(f"The average queue length {self.average_queue_size} "
-                      f"exceeds the upper limit {self.qlimit}.")
+                self.tracer.debug(
+                    f"The average queue length {self.average_queue_size} "
+                    f"exceeds the upper limit {self.qlimit}.")
         elif self.average_queue_size >= self.min_threshold:
             rand = random.uniform(0, 1)
             if rand <= self.max_probability:
                 self.packets_dropped += 1
                 if self.debug:
-                    print(
+                    self.tracer.debug(
                         f"The average queue length ({self.average_queue_size}) "
-                        f"exceeds the maximum threshold ({self.qlimit}), ",
+                        f"exceeds the maximum threshold ({self.qlimit}), "
                         f"packet dropped with probability {self.max_probability}"
                     )
             else:
@@ -134,7 +129,7 @@ class REDPort(Port):
             if rand <= prob:
                 self.packets_dropped += 1
                 if self.debug:
-                    print(
+                    self.tracer.debug(
                         f"The average queue length {self.average_queue_size} "
                         f"exceeds the minimum threshold {self.min_threshold}, "
                         f"packet dropped with probability {prob}.")
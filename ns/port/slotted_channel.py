@@ -0,0 +1,227 @@
+"""
+Implements a slotted channel shared by many stations, driven by a single slot clock.
+
+Instead of running one process per station that wakes up at every slot, the channel keeps the
+next slot in which each backlogged station attempts a transmission in a heap, and only wakes up
+at the slots in which at least one station transmits, resolving all the transmissions of a slot
+in one step. Idle stretches of slots are skipped entirely, so that the cost of a simulation
+grows with the number of transmissions rather than with the number of stations times the number
+of slots.
+
+Two access methods are supported:
+
+* slotted ALOHA ('aloha'): a backlogged station transmits in each slot with a probability
+  `probability`. The number of slots until its next attempt is drawn from the geometric
+  distribution, which is equivalent to drawing in every slot. With a probability of 1, every
+  backlogged station transmits in the next slot, as a `Slot` does.
+
+* TDMA ('tdma'): station i owns the slots whose index modulo the number of stations is i, so
+  that there are no collisions.
+"""
+import math
+import random
+from collections import defaultdict as dd
+from collections import deque
+from heapq import heappop, heappush
+
+from ns.utils.tracing import Tracer
+
+
+class SlottedStation:
+    """ A station attached to a `SlottedChannel`, which queues the packets sent to it until
+        it transmits them on the channel.
+
+        Parameters
+        ----------
+        channel: SlottedChannel
+            the channel shared by the stations.
+        station_id: int
+            the index of this station in the channel.
+    """
+    def __init__(self, channel, station_id: int):
+        self.channel = channel
+        self.station_id = station_id
+
+    @property
+    def queue(self):
+        """ The packets waiting for transmission at this station. """
+        return self.channel.queues[self.station_id]
+
+    def put(self, packet):
+        """ Sends a packet to this element. """
+        self.channel.enqueue(self.station_id, packet)
+
+
+class SlottedChannel:
+    """ A channel shared by stations that transmit in slots of a fixed duration. The first slot
+        ends at time `slot_duration`, and a packet is transmitted at the end of a slot. If a
+        single station transmits in a slot, its packet is sent to the `out` member of the
+        channel; if several stations transmit in the same slot, their packets collide.
+
+        Parameters
+        ----------
+        env: simpy.Environment
+            the simulation environment.
+        n_stations: int
+            the number of stations, which are available as `stations[i]`.
+        slot_duration: float
+            the duration of a slot.
+        mode: str
+            'aloha' for slotted ALOHA, or 'tdma' for TDMA.
+        probability: float
+            the probability that a backlogged station transmits in a slot, in slotted ALOHA.
+        retransmit: bool
+            if True, the packets that collide stay at the head of their stations' queues and
+            are transmitted again; otherwise, they are dropped.
+        element_id: str
+            the element ID of this channel.
+        seed: int
+            the seed for the random number generator of slotted ALOHA.
+        debug: bool
+            If True, prints more verbose debug information.
+    """
+    def __init__(self,
+                 env,
+                 n_stations: int,
+                 slot_duration: float = 1.5,
+                 mode: str = 'aloha',
+                 probability: float = 1.0,
+                 retransmit: bool = False,
+                 element_id=None,
+                 seed=None,
+                 debug: bool = False):
+        if mode not in ('aloha', 'tdma'):
+            raise ValueError(f"Unknown access method: {mode}.")
+        if not 0 < probability <= 1:
+            raise ValueError('The probability of transmission must be in (0, 1].')
+        if slot_duration <= 0:
+            raise ValueError('The slot duration must be positive.')
+
+        self.env = env
+        self.n_stations = n_stations
+        self.slot_duration = slot_duration
+        self.mode = mode
+        self.probability = probability
+        self.retransmit = retransmit
+        self.element_id = element_id
+        self.out = None
+
+        self.queues = [deque() for __ in range(n_stations)]
+        self.stations = [SlottedStation(self, i) for i in range(n_stations)]
+
+        # (slot index, station) of the next attempt of each backlogged station
+        self.attempts = []
+        # the index of the slot at which the channel is scheduled to wake up, if any
+        self.wakeup = None
+        # the index of the last slot in which stations transmitted
+        self.last_slot = 0
+
+        self.rng = random.Random(seed)
+        self.log_failure = math.log(1 - probability) if probability < 1 else None
+
+        self.packets_received = 0
+        self.packets_sent = 0
+        self.packets_collided = 0
+        self.packets_dropped = 0
+        self.slots = 0
+        self.collisions = 0
+        self.collision_sizes = dd(int)
+
+        self.debug = debug
+        self.tracer = Tracer(__name__, env, element_id, debug)
+
+    def first_slot(self) -> int:
+        """ Returns the index of the first slot in which a packet arriving now can be
+            transmitted. """
+        return max(self.last_slot + 1, math.ceil(self.env.now / self.slot_duration - 1e-9))
+
+    def next_attempt(self, station_id: int, slot: int) -> int:
+        """ Returns the index of the next slot, starting from `slot`, in which a backlogged
+            station transmits. """
+        if self.mode == 'tdma':
+            return slot + (station_id - slot) % self.n_stations
+
+        if self.log_failure is None:
+            return slot
+        # the number of slots before the first success of Bernoulli trials
+        return slot + int(math.log(1.0 - self.rng.random()) / self.log_failure)
+
+    def enqueue(self, station_id: int, packet):
+        """ Queues a packet at a station. """
+        self.packets_received += 1
+        queue = self.queues[station_id]
+        queue.append(packet)
+
+        if self.debug:
+            self.tracer.debug(f"Queued at station {station_id}: {packet}, "
+                              f"{len(queue)} packet(s) in its queue.")
+
+        if len(queue) == 1:
+            heappush(self.attempts, (self.next_attempt(station_id, self.first_slot()),
+                                     station_id))
+            self.schedule()
+
+    def schedule(self):
+        """ Schedules a wakeup at the earliest slot in which a station transmits. """
+        if not self.attempts:
+            return
+
+        slot = self.attempts[0][0]
+        if self.wakeup is not None and self.wakeup <= slot:
+            return
+
+        # a wakeup scheduled for a later slot is ignored when it occurs
+        self.wakeup = slot
+        # a packet arriving at the beginning of a slot may be transmitted in it, although the
+        # rounded start time of the slot can be slightly earlier than the current time
+        self.env.timeout(max(0, slot * self.slot_duration - self.env.now)).callbacks.append(
+            lambda event: self.resolve(slot))
+
+    def resolve(self, slot: int):
+        """ Resolves the transmissions in a slot. """
+        if slot != self.wakeup:
+            return
+        self.wakeup = None
+        self.last_slot = slot
+        self.slots += 1
+
+        transmitters = []
+        while self.attempts and self.attempts[0][0] <= slot:
+            transmitters.append(heappop(self.attempts)[1])
+
+        if len(transmitters) == 1:
+            station_id = transmitters[0]
+            packet = self.queues[station_id].popleft()
+            packet.begin_transmission = self.env.now
+            self.packets_sent += 1
+            if self.debug:
+                self.tracer.debug(f"Station {station_id} transmits in slot {slot}: {packet}")
+        else:
+            packet = None
+            self.collisions += 1
+            self.collision_sizes[len(transmitters)] += 1
+            self.packets_collided += len(transmitters)
+            if self.debug:
+                self.tracer.debug(f"COLLISION: stations {transmitters} transmit in slot {slot}.")
+
+            if not self.retransmit:
+                for station_id in transmitters:
+                    self.queues[station_id].popleft()
+                self.packets_dropped += len(transmitters)
+
+        # scheduling the next attempts before sending the packet, which may lead to new
+        # packets queued at the stations
+        for station_id in transmitters:
+            if self.queues[station_id]:
+                heappush(self.attempts, (self.next_attempt(station_id, slot + 1), station_id))
+        self.schedule()
+
+        if packet is not None:
+            self.out.put(packet)
+
+    def collision_rate(self) -> float:
+        """ Returns the fraction of slots with transmissions that ended in a collision. """
+        if self.slots > 0:
+            return self.collisions / self.slots
+
+        return 0.0
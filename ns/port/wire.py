@@ -1,13 +1,44 @@
 """
 Implements a network medium with collision detection and channel errors
 """
+import random
+from bisect import bisect_right
+from collections import defaultdict as dd
+from collections import deque
+
 import numpy # to create loss periods
-import simpy
+
+from ns.utils.tracing import Tracer
+
+# the priority of an event processed after all the other events at the same time, as it is
+# lower than both of SimPy's URGENT and NORMAL priorities
+LATE = 2
+
+
+def end_of_step(env):
+    """ Returns an event that is triggered at the current time, after all the events that are
+        scheduled at the current time with SimPy's URGENT or NORMAL priorities, including those
+        scheduled while they are processed. """
+    event = env.event()
+    event._ok = True
+    event._value = None
+    env.schedule(event, LATE)
+    return event
+
 
 class Wire:
     """ Implements a network medium that introduces a propagation delay.
         Set the "out" member variable to the entity to receive the packet.
 
+        Packets that enter the wire at the same time collide, and are all dropped. A slot is
+        only closed at the end of its time step, after all the other events at that time, so
+        that packets sent by chains of events without any delay still collide. Pending
+        packets are kept in buckets by the time at which they entered the wire, so that the
+        packets colliding with each other are found without scanning the other pending
+        packets. For each slot in which packets entered the wire, `slots` counts the slots,
+        `collisions` the slots with a collision, and `collision_sizes` the collisions by the
+        number of packets that collided.
+
         Parameters
         ----------
         env: simpy.Environment
@@ -17,7 +48,18 @@ class Wire:
             delays on this wire.
         loss_dist: function
             a function that takes one optional parameter, which is the packet ID, and
-            returns the loss rate.
+            returns the loss rate. If it is given without a `loss_model`, packets are lost
+            in the bad periods of a `LossPeriodGenerator` with its default parameters.
+        wire_id: int
+            the ID of this wire.
+        loss_model: MarkovLossModel
+            the loss channel of this wire, such as a `LossPeriodGenerator` or a
+            `MarkovLossModel` with more than two states. A packet is lost if it is lost in
+            any of the periods between the beginning of its transmission and the time it
+            entered the wire. If neither `loss_dist` nor `loss_model` is given, no packet
+            is lost, except in collisions.
+        debug: bool
+            If True, prints more verbose debug information.
     """
 
     def __init__(self,
@@ -25,65 +67,74 @@ class Wire:
                  delay_dist,
                  loss_dist=None,
                  wire_id=0,
+                 loss_model=None,
                  debug=False):
-        self.store = simpy.Store(env)
+        # (time entered the wire, packets) for each slot with pending packets
+        self.buckets = deque()
+        self.pending = None
         self.delay_dist = delay_dist
         self.loss_dist = loss_dist
         self.env = env
         self.wire_id = wire_id
         self.out = None
-        self.packets_rec = 0        
+        self.packets_rec = 0
         self.packets_dropped = 0
+        self.packets_collided = 0
+        self.slots = 0
+        self.collisions = 0
+        self.collision_sizes = dd(int)
         self.debug = debug
+        self.tracer = Tracer(__name__, env, wire_id, debug)
         self.action = env.process(self.run())
-        # Loss period generator configuration
-        seed_b, seed_g = 1234, 4321  # Seeds for random number generators
-        mean_b, mean_g = 10, 50     # Mean values for exponential distributions, duration of bad and good periods
-        self.loss_period_generator = LossPeriodGenerator(seed_b, seed_g, mean_b, mean_g)
+        if loss_model is None and loss_dist is not None:
+            loss_model = LossPeriodGenerator(debug=debug)
+        self.loss_model = loss_model
 
     def run(self):
-        print("initial delay in wire: ",0)
-        yield self.env.timeout(0) 
-        print("Enters wire at: ",self.env.now) # check propagation delay
+        """The generator function used in simulations."""
+        yield self.env.timeout(0)
 
         while True:
-            packet = yield self.store.get()
-            colliding_packets = [] # reset
-            print("poped packet from store:", packet)
-           
-            if len(self.store.items) >= 1:
-                print("now current_time checking store for collision: ",self.env.now)
-                # Check for collisions using time packet entered wire
-                colliding_packets = [p for p in self.store.items if p.current_time == packet.current_time]
-                for colliding_packet in colliding_packets:
-                    print("Colliding Packet ID found: {}, Flow ID: {}, entered wire time: {:.3f}".format(colliding_packet.packet_id,
-                                                                                colliding_packet.flow_id,
-                                                                                colliding_packet.current_time))
-                    print("with popped packet ID: {}, Flow ID: {}, entered wire time: {:.3f}".format(packet.packet_id,
-                                                                                packet.flow_id,
-                                                                                packet.current_time))
-                if len(colliding_packets) != 0:
-                    # Collision detected
-                    print("COLLISION: Multiple transmission detected in wire!")
-                    self.packets_dropped += 2 # Two packets dropped with the same timestamp
-                    collided =  self.store.get()
-                    print("second packet removed from store:", collided)
-                    print("Number of items in store after collision:", len(self.store.items))
-                    
-            if len(colliding_packets) == 0: # if no collision, check for good or bad period
+            if not self.buckets:
+                self.pending = self.env.event()
+                yield self.pending
+
+            if self.buckets[0][0] == self.env.now:
+                # waiting for the other packets that enter the wire in this slot, which may
+                # be sent by chains of events without any delay
+                yield end_of_step(self.env)
+
+            entered, packets = self.buckets.popleft()
+            self.slots += 1
+
+            if self.debug:
+                self.tracer.debug(f"Popped {len(packets)} packet(s) that entered the wire at "
+                                  f"{entered:.3f}: {packets}")
+
+            if len(packets) > 1:
+                # Collision detected: all the packets that entered the wire together are lost
+                self.collisions += 1
+                self.collision_sizes[len(packets)] += 1
+                self.packets_collided += len(packets)
+                self.packets_dropped += len(packets)
+                if self.debug:
+                    self.tracer.debug(
+                        f"COLLISION: {len(packets)} transmissions detected in wire at "
+                        f"{entered:.3f}: " + ", ".join(
+                            f"packet ID {p.packet_id}, flow ID {p.flow_id}" for p in packets))
+            else: # if no collision, check for good or bad period
+                packet = packets[0]
                 # Yield for slot duration now that we know there is no collision
                 transmission_time = 1.5
-                print("No collision for {} yield for transmission time of 1.5".format(packet))
                 yield self.env.timeout(transmission_time)
-                print("packet entered wire time is: ", packet.current_time)
-                # loss_dist can be removed
-                if self.loss_dist is None or not self.loss_period_generator.is_good_period(packet.current_time, packet.begin_transmission):
+                if self.loss_model is not None and self.loss_model.is_lost(
+                        packet.begin_transmission, packet.current_time):
                     # Packet is dropped during bad periods
                     self.packets_dropped += 1
-                    print("Dropped in bad perid! on wire #{} at {:.3f}: {}".format(
+                    if self.debug:
+                        self.tracer.debug("Dropped in bad period! on wire #{} at {:.3f}: {}".format(
                             self.wire_id, self.env.now, packet))
                 else: # good period
-                    print("Not dropped in good period!")
                     # Packet is not dropped during good periods
                     queued_time = self.env.now - packet.current_time
                     delay = self.delay_dist()
@@ -94,30 +145,212 @@ class Wire:
                     # to the next component immediately.
                     if queued_time < delay:
                         yield self.env.timeout(delay - queued_time)
-                    # in case of no collision and good period, pass the packet         
+                    # in case of no collision and good period, pass the packet
                     self.out.put(packet)
-                    print("Left wire at {}: {}".format(self.env.now, packet))
-
-            # Calculate the loss rate and print statistics
-            if self.packets_rec > 0:
-                loss_rate = (self.packets_dropped / self.packets_rec) * 100
-            else:
-                loss_rate = 0
-            
-            print("Packet Loss Rate for Wire #{}: {:.2f}%. {} packets in total and {} packets lost".format(
-                self.wire_id, loss_rate, self.packets_rec, self.packets_dropped))
-            
+                    if self.debug:
+                        self.tracer.debug("Left wire at {}: {}".format(self.env.now, packet))
+
+            if self.debug:
+                self.tracer.debug(
+                    "Packet Loss Rate for Wire #{}: {:.2f}%. {} packets in total and {} packets lost"
+                    .format(self.wire_id, self.loss_rate() * 100, self.packets_rec,
+                            self.packets_dropped))
+
+    def loss_rate(self) -> float:
+        """ Returns the fraction of packets received by this wire that have been dropped. """
+        if self.packets_rec > 0:
+            return self.packets_dropped / self.packets_rec
+
+        return 0.0
+
+    def collision_rate(self) -> float:
+        """ Returns the fraction of slots in which packets entered this wire that ended in a
+            collision. """
+        if self.slots > 0:
+            return self.collisions / self.slots
+
+        return 0.0
+
     def put(self, packet):
         """ Sends a packet to this element. """
         self.packets_rec += 1
         if self.debug:
-            print(f"Entered wire #{self.wire_id} at {self.env.now}: {packet} ")
+            self.tracer.debug(f"Entered wire #{self.wire_id} at {self.env.now}: {packet} ")
         packet.current_time = self.env.now
-        return self.store.put(packet)
-    
-class LossPeriodGenerator:
+
+        if self.buckets and self.buckets[-1][0] == self.env.now:
+            self.buckets[-1][1].append(packet)
+        else:
+            self.buckets.append((self.env.now, [packet]))
+            if self.pending is not None and not self.pending.triggered:
+                self.pending.succeed()
+
+class MarkovLossModel:
+    """
+        A loss channel whose state follows a Markov chain, such as the Gilbert-Elliott model of
+        bursty loss. The channel stays in each state for an exponentially distributed period,
+        and then moves to another state drawn from `transitions`. Each state has its own
+        probability of losing a packet.
+
+        The periods are generated ahead of time in NumPy blocks of `block_size` periods, and
+        the period containing a given time is found by a binary search over their end times.
+        As in a simulation, packets are expected to be sent in the order of time, and the
+        periods that ended before the last packet began its transmission are discarded.
+
+        Parameters
+        ----------
+        means : list of float
+            Mean duration of the periods in each state.
+        loss_probs : list of float
+            Probability that a packet is lost in each state.
+        transitions : 2-D array
+            transitions[i][j] is the probability of moving to state j at the end of a period in
+            state i. By default, the channel cycles through the states in order, which gives
+            the Gilbert-Elliott model with two states.
+        initial_state : int
+            State of the first period, which starts at time 0.
+        seed : int
+            Seed for the random number generators of the periods and of the losses.
+        block_size : int
+            Number of periods generated at a time.
+        debug : bool
+            If True, traces the periods spanned by each packet.
+    """
+    def __init__(self,
+                 means,
+                 loss_probs,
+                 transitions=None,
+                 initial_state: int = 0,
+                 seed=None,
+                 block_size: int = 4096,
+                 debug: bool = False):
+        n_states = len(means)
+        if n_states == 0 or len(loss_probs) != n_states:
+            raise ValueError('means and loss_probs must have one entry per state')
+
+        self.means = numpy.asarray(means, dtype=float)
+        self.loss_probs = list(loss_probs)
+
+        self.cyclic = transitions is None
+        if transitions is None:
+            transitions = numpy.roll(numpy.eye(n_states), 1, axis=1)
+        transitions = numpy.asarray(transitions, dtype=float)
+        if transitions.shape != (n_states, n_states) or not numpy.allclose(
+                transitions.sum(axis=1), 1.0):
+            raise ValueError('transitions must be a square matrix whose rows sum to 1')
+        self.cumulative = numpy.cumsum(transitions, axis=1)
+
+        self.rng = numpy.random.default_rng(seed)
+        self.loss_rng = random.Random(seed)
+        self.block_size = block_size
+        self.next_state = initial_state
+
+        # the state and the end time of each period generated so far
+        self.states = []
+        self.ends = []
+
+        # the period in which the last packet began its transmission; the periods before it
+        # are discarded when the next block is generated
+        self.cursor = 0
+
+        # the bounds and the loss probability of the last period in which a packet was sent
+        self.low = 0.0
+        self.high = 0.0
+        self.loss_prob = 0.0
+
+        self.debug = debug
+        self.tracer = Tracer(__name__, debug=debug)
+
+    def next_states(self, n: int):
+        """ Returns the states of the next n periods. """
+        n_states = len(self.means)
+        if self.cyclic:
+            states = (self.next_state + numpy.arange(n)) % n_states
+            self.next_state = int(states[-1] + 1) % n_states
+            return states
+
+        states = numpy.empty(n, dtype=numpy.int64)
+        state = self.next_state
+        for i, uniform in enumerate(self.rng.random(n)):
+            states[i] = state
+            state = min(int(numpy.searchsorted(self.cumulative[state], uniform, side='right')),
+                        n_states - 1)
+        self.next_state = state
+        return states
+
+    def durations(self, states):
+        """ Returns the durations of periods in the given states. """
+        return self.rng.exponential(self.means[states])
+
+    def extend(self):
+        """ Generates the next block of periods, and discards the periods before the one in
+            which the last packet began its transmission. """
+        if self.cursor > 0:
+            del self.states[:self.cursor]
+            del self.ends[:self.cursor]
+            self.cursor = 0
+
+        states = self.next_states(self.block_size)
+        start = self.ends[-1] if self.ends else 0.0
+        self.states.extend(states.tolist())
+        self.ends.extend(numpy.cumsum(numpy.append(start, self.durations(states)))[1:].tolist())
+
+    def period(self, time) -> int:
+        """ Returns the index of the period that contains `time`. """
+        while not self.ends or time >= self.ends[-1]:
+            self.extend()
+        return bisect_right(self.ends, time)
+
+    def state(self, time) -> int:
+        """ Returns the state of the channel at `time`. """
+        return self.states[self.period(time)]
+
+    def is_lost(self, begin, end=None) -> bool:
+        """
+        Determines if a packet transmitted from `begin` to `end` is lost, which happens if it is
+        lost in any of the periods spanned by its transmission.
+
+        Parameters
+        ----------
+        begin : float
+            The time at which the transmission begins.
+        end : float
+            The time at which the transmission ends; by default, the same as `begin`.
+        """
+        if end is None:
+            end = begin
+        elif end < begin:
+            begin, end = end, begin
+
+        if not self.low <= begin or not end < self.high or self.debug:
+            last = self.period(end)
+            first = self.period(begin)
+            self.cursor = first
+            if self.debug:
+                self.tracer.debug(
+                    f"Transmission from {begin} to {end} spans the periods in states "
+                    f"{self.states[first:last + 1]}.")
+
+            # caching the last period, which holds most of the following packets
+            self.low = self.ends[last - 1] if last > 0 else float('-inf')
+            self.high = self.ends[last]
+            self.loss_prob = self.loss_probs[self.states[last]]
+
+            for state in self.states[first:last]:
+                loss_prob = self.loss_probs[state]
+                if loss_prob >= 1.0 or (loss_prob > 0.0
+                                        and self.loss_rng.random() < loss_prob):
+                    return True
+
+        loss_prob = self.loss_prob
+        return loss_prob >= 1.0 or (loss_prob > 0.0 and self.loss_rng.random() < loss_prob)
+
+
+class LossPeriodGenerator(MarkovLossModel):
     """
-        Initializes the LossPeriodGenerator.
+        Generates the good and bad periods of a Gilbert-Elliott channel, which loses every
+        packet in a bad period, and none in a good period. The first good period starts at
+        time 0.
 
         Parameters
         ----------
@@ -128,15 +361,33 @@ class LossPeriodGenerator:
         mean_b : float
             Mean value for the exponential distribution of bad periods.
         mean_g : float
-            Mean value for the exponential distribution of good periods. 
+            Mean value for the exponential distribution of good periods.
+        block_size : int
+            Number of periods generated at a time.
+        debug : bool
+            If True, traces whether each packet falls in a good or a bad period.
     """
-    def __init__(self, seed_b, seed_g, mean_b, mean_g):
+    def __init__(self,
+                 seed_b=1234,
+                 seed_g=4321,
+                 mean_b=10,
+                 mean_g=50,
+                 block_size: int = 4096,
+                 debug=False):
+        super().__init__([mean_g, mean_b], [0.0, 1.0], block_size=block_size, debug=debug)
         self.rng_b = numpy.random.RandomState(seed_b)
         self.rng_g = numpy.random.RandomState(seed_g)
         self.mean_b = mean_b
         self.mean_g = mean_g
-        self.good_low = 0 # Starting from 0
-        self.good_high = self.good_low + self.rng_g.exponential(self.mean_g) # Upper bound of the current good period
+
+    def durations(self, states):
+        """ Returns the durations of periods in the given states, drawing the good and the
+            bad periods from their own random number generators. """
+        durations = numpy.empty(len(states))
+        good = states == 0
+        durations[good] = self.rng_g.exponential(self.mean_g, size=int(good.sum()))
+        durations[~good] = self.rng_b.exponential(self.mean_b, size=int((~good).sum()))
+        return durations
 
     def is_good_period(self, timestamp, begin_transmission):
         """
@@ -146,30 +397,20 @@ class LossPeriodGenerator:
         ----------
         timestamp : float
             The timestamp of the packet being processed.
+        begin_transmission : float
+            The time at which the transmission of the packet began.
 
         Returns
         -------
         bool
-            True if the timestamp is within a good period (no loss), False otherwise (bad period with bursty loss).
+            True if the timestamp and the beginning of the transmission are within the same
+            good period (no loss), False otherwise (bad period with bursty loss).
         """
-        # If the timestamp is greater than the current good_high, it means the current period is a bad period
-        # with bursty loss.
-        while timestamp >= self.good_high:
-            # print(f"timestamp of packet {timestamp} is greater than good high:  {self.good_high}")
-            self.good_low = self.good_high + self.rng_b.exponential(self.mean_b)
-            self.good_high = self.good_low + self.rng_g.exponential(self.mean_g)
-            # print(f"New low: {self.good_low} and new high: {self.good_high}")
-        if self.good_low <= timestamp < self.good_high:
-            if begin_transmission < self.good_low or begin_transmission >= self.good_high:
-                print(f"Timestamp {timestamp} is in a good period, but beginning of transmission {begin_transmission} is in a bad period.")
-        else:
-            print("Timestamp is in a bad period.")  
-        if self.good_low <= begin_transmission < self.good_high:
-            print("Beginning of transmission is in a good period.")
-        else:
-            print("Beginning of transmission is in a bad period.")      
-        return self.good_low <= timestamp < self.good_high and self.good_low <= begin_transmission < self.good_high
-    
+        if self.low <= begin_transmission and timestamp < self.high and not self.debug:
+            # within the period of the last packet, which is either good or bad
+            return self.loss_prob == 0.0
+        return not self.is_lost(begin_transmission, timestamp)
+
 """example:
 good low = 0
 good high = 0 + 3 =3
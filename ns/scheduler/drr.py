@@ -8,10 +8,12 @@ Tran. Networking, vol. 4, no. 3, June 1996.
 """
 
 from collections import defaultdict as dd
+from collections import deque
 from collections.abc import Callable
 
-import simpy
 from ns.packet.packet import Packet
+from ns.utils.packetqueue import PacketQueue
+from ns.utils.tracing import Tracer
 
 
 class DRRServer:
@@ -78,8 +80,15 @@ class DRRServer:
         else:
             raise ValueError('Weights must be either a list or a dictionary.')
 
-        self.head_of_line = {}
+        # the classes mapped to by each flow ID, resolved once per flow
+        self.class_ids = {}
+
+        # The active list: the queues with packets waiting to be served, in the order in
+        # which they will be visited in the round robin. The queue currently being served
+        # has been removed from the list, but remains in the active set.
+        self.active_list = deque()
         self.active_set = set()
+        self.packet_count = 0
 
         # One FIFO queue for each flow_id or class_id
         self.stores = {}
@@ -87,7 +96,8 @@ class DRRServer:
         self.current_packet = None
         self.byte_sizes = dd(lambda: 0)
 
-        self.packets_available = simpy.Store(env)
+        # triggered by put() to wake up the server when it is idle
+        self.packets_available = None
 
         self.packets_received = 0
         self.out = None
@@ -97,39 +107,56 @@ class DRRServer:
 
         self.zero_buffer = zero_buffer
         self.zero_downstream_buffer = zero_downstream_buffer
-        if self.zero_downstream_buffer:
-            self.downstream_stores = {}
+
+        # The queues that the packets are scheduled from. If the downstream element has a
+        # zero buffer, a packet stays in `stores` until the downstream element removes it,
+        # and these queues are separate; otherwise, they are the same as `stores`.
+        self.queues = {}
 
         self.debug = debug
+        self.tracer = Tracer(__name__, env, debug=debug)
         self.action = env.process(self.run())
 
+    def class_id(self, flow_id):
+        """
+        Returns the class ID that a flow ID is mapped to by `flow_classes`. The result
+        is cached, as `flow_classes` is assumed to be a fixed mapping.
+        """
+        try:
+            return self.class_ids[flow_id]
+        except KeyError:
+            class_id = self.class_ids[flow_id] = self.flow_classes(flow_id)
+            return class_id
+
     def update_stats(self, packet):
         """
         The packet has been sent (or authorized to be sent if the downstream node has a zero-buffer
         configuration), we need to update the internal statistics related to this event.
         """
-        self.flow_queue_count[self.flow_classes(packet.flow_id)] -= 1
+        class_id = self.class_id(packet.flow_id)
+        self.flow_queue_count[class_id] -= 1
+        self.packet_count -= 1
 
-        self.deficit[self.flow_classes(packet.flow_id)] -= packet.size
+        self.deficit[class_id] -= packet.size
 
-        if self.flow_queue_count[self.flow_classes(packet.flow_id)] == 0:
-            self.deficit[self.flow_classes(packet.flow_id)] = 0.0
+        if self.flow_queue_count[class_id] == 0:
+            self.deficit[class_id] = 0.0
 
         if self.debug:
-            print(
-                f"Deficit reduced to {self.deficit[packet.flow_id]} for flow {packet.flow_id}"
+            self.tracer.debug(
+                f"Deficit reduced to {self.deficit[class_id]} for class {class_id}"
             )
 
-        if self.flow_classes(packet.flow_id) in self.byte_sizes:
-            self.byte_sizes[self.flow_classes(packet.flow_id)] -= packet.size
+        if class_id in self.byte_sizes:
+            self.byte_sizes[class_id] -= packet.size
         else:
             raise ValueError(
                 "Error: the packet to be sent has never been received.")
 
         if self.debug:
-            print(
+            self.tracer.debug(
                 f"Sent out packet {packet.packet_id} from flow {packet.flow_id} "
-                f"belonging to class {self.flow_classes(packet.flow_id)}")
+                f"belonging to class {class_id}")
 
     def update(self, packet):
         """
@@ -182,94 +209,90 @@ class DRRServer:
         """
         Returns the total number of packets currently in the server.
         """
-        return sum(self.flow_queue_count.values())
+        return self.packet_count
 
     def run(self):
         """The generator function used in simulations."""
         while True:
-            while self.total_packets() > 0:
-                flow_queue_counts = self.flow_queue_count.items()
-
-                for queue_id, count in flow_queue_counts:
-                    if count > 0:
-                        self.deficit[queue_id] += self.quantum[queue_id]
-                        if self.debug:
-                            print(
-                                f"Flow queue length: {self.flow_queue_count}, ",
-                                f"deficit counters: {self.deficit}")
-
-                    while self.deficit[queue_id] > 0 and self.flow_queue_count[
-                            queue_id] > 0:
-                        if queue_id in self.head_of_line:
-                            packet = self.head_of_line[queue_id]
-                            del self.head_of_line[queue_id]
-                        else:
-                            if self.zero_downstream_buffer:
-                                ds_store = self.downstream_stores[queue_id]
-                                packet = yield ds_store.get()
-                            else:
-                                store = self.stores[queue_id]
-                                packet = yield store.get()
-
-                        assert queue_id == self.flow_classes(packet.flow_id)
-
-                        if packet.size <= self.deficit[queue_id]:
-                            self.current_packet = packet
-                            yield self.env.timeout(packet.size * 8.0 /
-                                                   self.rate)
-
-                            if self.zero_downstream_buffer:
-                                self.update_stats(packet)
-
-                                self.out.put(
-                                    packet,
-                                    upstream_update=self.update,
-                                    upstream_store=self.stores[queue_id])
-                            else:
-                                self.update_stats(packet)
-                                self.update(packet)
-                                self.out.put(packet)
-
-                            self.current_packet = None
-                        else:
-                            assert not queue_id in self.head_of_line
-                            self.head_of_line[queue_id] = packet
-                            break
-
-            # No more packets in the scheduler to process at this time
-            yield self.packets_available.get()
+            if not self.active_list:
+                # No more packets in the scheduler to process at this time
+                self.packets_available = self.env.event()
+                yield self.packets_available
+                self.packets_available = None
+                continue
+
+            # Visiting the queue at the head of the active list
+            queue_id = self.active_list.popleft()
+            queue = self.queues[queue_id]
+            self.deficit[queue_id] += self.quantum[queue_id]
+
+            if self.debug:
+                self.tracer.debug(f"Flow queue length: {self.flow_queue_count}, "
+                                  f"deficit counters: {self.deficit}")
+
+            while queue and queue[0].size <= self.deficit[queue_id]:
+                packet = queue[0]
+                self.current_packet = packet
+                yield self.env.timeout(packet.size * 8.0 / self.rate)
+                queue.popleft()
+
+                self.update_stats(packet)
+
+                if self.zero_downstream_buffer:
+                    self.out.put(packet,
+                                 upstream_update=self.update,
+                                 upstream_store=self.stores[queue_id])
+                else:
+                    self.update(packet)
+                    self.out.put(packet)
+
+                self.current_packet = None
+
+            # A queue that still has packets goes to the tail of the active list,
+            # while an empty queue leaves the active set with its deficit reset
+            if queue:
+                self.active_list.append(queue_id)
+            else:
+                self.active_set.remove(queue_id)
 
     def put(self, packet, upstream_update=None, upstream_store=None):
         """ Sends a packet to this element. """
         self.packets_received += 1
         flow_id = packet.flow_id
+        class_id = self.class_id(flow_id)
 
-        self.byte_sizes[self.flow_classes(flow_id)] += packet.size
+        self.byte_sizes[class_id] += packet.size
 
         if self.debug:
-            print(f"Packet arrived at {self.env.now}, flow_id {flow_id}, "
-                  f"belonging to class {self.flow_classes(flow_id)} "
-                  f"packet_id {packet.packet_id}, "
-                  f"deficit {self.deficit[self.flow_classes(flow_id)]}, "
-                  f"deficit counters: {self.deficit}")
+            self.tracer.debug(f"Packet arrived at {self.env.now}, flow_id {flow_id}, "
+                              f"belonging to class {class_id} "
+                              f"packet_id {packet.packet_id}, "
+                              f"deficit {self.deficit[class_id]}, "
+                              f"deficit counters: {self.deficit}")
 
-        if not self.flow_classes(flow_id) in self.stores:
-            self.stores[self.flow_classes(flow_id)] = simpy.Store(self.env)
+        if not class_id in self.stores:
+            self.stores[class_id] = PacketQueue()
 
             if self.zero_downstream_buffer:
-                self.downstream_stores[self.flow_classes(
-                    flow_id)] = simpy.Store(self.env)
+                self.queues[class_id] = PacketQueue()
+            else:
+                self.queues[class_id] = self.stores[class_id]
 
-        if self.total_packets() == 0:
-            self.packets_available.put(True)
-
-        self.flow_queue_count[self.flow_classes(flow_id)] += 1
+        self.flow_queue_count[class_id] += 1
+        self.packet_count += 1
 
         if self.zero_buffer and upstream_update is not None and upstream_store is not None:
             self.upstream_stores[packet] = upstream_store
             self.upstream_updates[packet] = upstream_update
 
         if self.zero_downstream_buffer:
-            self.downstream_stores[self.flow_classes(flow_id)].put(packet)
+            self.queues[class_id].append(packet)
+        self.stores[class_id].append(packet)
+
+        # A queue that becomes backlogged joins the tail of the active list
+        if not class_id in self.active_set:
+            self.active_set.add(class_id)
+            self.active_list.append(class_id)
 
-        return self.stores[self.flow_classes(flow_id)].put(packet)
+            if self.packets_available is not None and not self.packets_available.triggered:
+                self.packets_available.succeed()
@@ -24,6 +24,13 @@ class ServerMonitor:
         pkt_in_service_included: bool
             If True, monitor packets in service + in the queue;
             If False, only monitor packets in queue.
+        rec_sizes: bool
+            If True, every sample is recorded in the `sizes` and `byte_sizes` lists.
+        size_summary: function
+            A no-parameter function, such as `ns.utils.stats.StreamingSummary`, that creates
+            a streaming summary. If provided, the samples of each flow are also added to its
+            summaries in `size_summaries` (in packets) and `byte_size_summaries` (in bytes),
+            so that their distribution can be reported without recording them.
 
         To be compatible with this monitor, the scheduling server will need to implement three
         callback functions:
@@ -42,7 +49,9 @@ class ServerMonitor:
                  env,
                  server,
                  dist,
-                 pkt_in_service_included=False) -> None:
+                 pkt_in_service_included=False,
+                 rec_sizes=True,
+                 size_summary=None) -> None:
 
         self.server = server
         self.env = env
@@ -51,6 +60,13 @@ class ServerMonitor:
 
         self.sizes = dd(list)
         self.byte_sizes = dd(list)
+        self.rec_sizes = rec_sizes
+
+        self.size_summaries = None
+        self.byte_size_summaries = None
+        if size_summary is not None:
+            self.size_summaries = dd(size_summary)
+            self.byte_size_summaries = dd(size_summary)
 
         self.action = env.process(self.run())
 
@@ -69,5 +85,10 @@ class ServerMonitor:
                             total += 1
                             total_bytes += self.server.packet_in_service().size
 
-                self.sizes[flow_id].append(total)
-                self.byte_sizes[flow_id].append(total_bytes)
+                if self.rec_sizes:
+                    self.sizes[flow_id].append(total)
+                    self.byte_sizes[flow_id].append(total_bytes)
+
+                if self.size_summaries is not None:
+                    self.size_summaries[flow_id].add(total)
+                    self.byte_size_summaries[flow_id].add(total_bytes)
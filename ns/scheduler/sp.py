@@ -2,12 +2,13 @@
 Implements a Static Priority (SP) server.
 """
 
-import uuid
+import itertools
 from collections import defaultdict as dd
 from collections.abc import Callable
 
-import simpy
 from ns.packet.packet import Packet
+from ns.utils.packetqueue import PacketQueue
+from ns.utils.tracing import Tracer
 
 
 class SPServer:
@@ -39,6 +40,10 @@ class SPServer:
     debug: bool
         If True, prints more verbose debug information.
     """
+    # used to assign a unique element ID to each server, which keys the
+    # per-hop priority records in packets
+    instance_ids = itertools.count()
+
     def __init__(self,
                  env,
                  rate,
@@ -52,10 +57,13 @@ class SPServer:
         self.prio = priorities
         self.flow_classes = flow_classes
 
-        self.element_id = uuid.uuid1()
+        self.element_id = f"SPServer_{next(SPServer.instance_ids)}"
         self.stores = {}
         self.prio_queue_count = {}
 
+        # the classes mapped to by each flow ID, resolved once per flow
+        self.class_ids = {}
+
         if isinstance(priorities, list):
             priorities_list = priorities
         elif isinstance(priorities, dict):
@@ -70,7 +78,15 @@ class SPServer:
 
         self.priorities_list = sorted(self.prio_queue_count, reverse=True)
 
-        self.packets_available = simpy.Store(self.env)
+        # Each priority is assigned a level, with the lowest priority at level 0. Bit `level`
+        # of the occupancy bitmap is set when the queue at that level has packets waiting to
+        # be scheduled, so that the highest non-empty level is `occupancy.bit_length() - 1`.
+        self.level_priorities = self.priorities_list[::-1]
+        self.levels = {prio: level for level, prio in enumerate(self.level_priorities)}
+        self.occupancy = 0
+
+        # triggered by put() to wake up the server when it is idle
+        self.packets_available = None
 
         self.current_packet = None
 
@@ -82,28 +98,50 @@ class SPServer:
         self.upstream_stores = {}
         self.zero_buffer = zero_buffer
         self.zero_downstream_buffer = zero_downstream_buffer
-        if self.zero_downstream_buffer:
-            self.downstream_stores = {}
+
+        # One FIFO queue for each priority. The packets are scheduled from `queues`. If the
+        # downstream element has a zero buffer, a packet stays in `stores` until the downstream
+        # element removes it, and these queues are separate; otherwise, they are the same.
+        self.queues = {}
+        for prio in self.priorities_list:
+            self.stores[prio] = PacketQueue()
+            if self.zero_downstream_buffer:
+                self.queues[prio] = PacketQueue()
+            else:
+                self.queues[prio] = self.stores[prio]
 
         self.debug = debug
+        self.tracer = Tracer(__name__, env, debug=debug)
         self.action = env.process(self.run())
 
+    def class_id(self, flow_id):
+        """
+        Returns the class ID that a flow ID is mapped to by `flow_classes`. The result
+        is cached, as `flow_classes` is assumed to be a fixed mapping.
+        """
+        try:
+            return self.class_ids[flow_id]
+        except KeyError:
+            class_id = self.class_ids[flow_id] = self.flow_classes(flow_id)
+            return class_id
+
     def update_stats(self, packet):
         """
         The packet has been sent (or authorized to be sent if this scheduler has a zero-buffer
         configuration), we need to update the internal statistics related to this event.
         """
         self.prio_queue_count[packet.prio[self.element_id]] -= 1
+        class_id = self.class_id(packet.flow_id)
 
-        if self.flow_classes(packet.flow_id) in self.byte_sizes:
-            self.byte_sizes[self.flow_classes(packet.flow_id)] -= packet.size
+        if class_id in self.byte_sizes:
+            self.byte_sizes[class_id] -= packet.size
         else:
             raise ValueError("Error: the packet is from an unrecorded flow.")
 
         if self.debug:
-            print(
+            self.tracer.debug(
                 f"Sent out packet {packet.packet_id} from flow {packet.flow_id} "
-                f"belonging to class {self.flow_classes(packet.packet_id)} "
+                f"belonging to class {class_id} "
                 f"of priority {packet.prio[self.element_id]}")
 
     def update(self, packet):
@@ -144,7 +182,7 @@ class SPServer:
         number of packets. Used by a ServerMonitor.
         """
         if queue_id in self.stores:
-            return len(self.stores[queue_id].items)
+            return len(self.stores[queue_id])
 
         return 0
 
@@ -163,68 +201,62 @@ class SPServer:
     def run(self):
         """The generator function used in simulations."""
         while True:
-            for prio in self.priorities_list:
-                if self.prio_queue_count[prio] > 0:
-                    if self.zero_downstream_buffer:
-                        ds_store = self.downstream_stores[prio]
-                        packet = yield ds_store.get()
-                        packet.prio[self.element_id] = prio
-
-                        self.current_packet = packet
-                        yield self.env.timeout(packet.size * 8.0 / self.rate)
-
-                        self.update_stats(packet)
-                        self.out.put(packet,
-                                     upstream_update=self.update,
-                                     upstream_store=self.stores[prio])
-                        self.current_packet = None
-                    else:
-                        store = self.stores[prio]
-                        packet = yield store.get()
-                        packet.prio[self.element_id] = prio
-
-                        self.current_packet = packet
-                        yield self.env.timeout(packet.size * 8.0 / self.rate)
-
-                        self.update_stats(packet)
-                        self.update(packet)
-                        self.out.put(packet)
-                        self.current_packet = None
-
-                    break
-
-            if self.total_packets() == 0:
-                yield self.packets_available.get()
+            if not self.occupancy:
+                # No more packets in the scheduler to process at this time
+                self.packets_available = self.env.event()
+                yield self.packets_available
+                self.packets_available = None
+                continue
+
+            # Serving the highest non-empty priority level
+            level = self.occupancy.bit_length() - 1
+            prio = self.level_priorities[level]
+            queue = self.queues[prio]
+
+            packet = queue.popleft()
+            if not queue:
+                self.occupancy &= ~(1 << level)
+            packet.prio[self.element_id] = prio
+
+            self.current_packet = packet
+            yield self.env.timeout(packet.size * 8.0 / self.rate)
+
+            self.update_stats(packet)
+
+            if self.zero_downstream_buffer:
+                self.out.put(packet,
+                             upstream_update=self.update,
+                             upstream_store=self.stores[prio])
+            else:
+                self.update(packet)
+                self.out.put(packet)
+
+            self.current_packet = None
 
     def put(self, packet, upstream_update=None, upstream_store=None):
         """ Sends a packet to this element. """
         self.packets_received += 1
         flow_id = packet.flow_id
-        self.byte_sizes[self.flow_classes(flow_id)] += packet.size
+        class_id = self.class_id(flow_id)
+        self.byte_sizes[class_id] += packet.size
 
-        if self.total_packets() == 0:
-            self.packets_available.put(True)
-
-        prio = self.prio[self.flow_classes(flow_id)]
+        prio = self.prio[class_id]
         self.prio_queue_count[prio] += 1
 
         if self.debug:
-            print(
+            self.tracer.debug(
                 "At time {:.2f}: received packet {:d} from flow {} belonging to class {}"
-                .format(self.env.now, packet.packet_id, flow_id,
-                        self.flow_classes(flow_id)))
-
-        if not prio in self.stores:
-            self.stores[prio] = simpy.Store(self.env)
-
-            if self.zero_downstream_buffer:
-                self.downstream_stores[prio] = simpy.Store(self.env)
+                .format(self.env.now, packet.packet_id, flow_id, class_id))
 
         if self.zero_buffer and upstream_update is not None and upstream_store is not None:
             self.upstream_stores[packet] = upstream_store
             self.upstream_updates[packet] = upstream_update
 
         if self.zero_downstream_buffer:
-            self.downstream_stores[prio].put(packet)
+            self.queues[prio].append(packet)
+        self.stores[prio].append(packet)
+
+        self.occupancy |= 1 << self.levels[prio]
 
-        return self.stores[prio].put(packet)
+        if self.packets_available is not None and not self.packets_available.triggered:
+            self.packets_available.succeed()
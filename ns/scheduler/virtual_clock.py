@@ -11,6 +11,7 @@ from collections.abc import Callable
 
 from ns.packet.packet import Packet
 from ns.utils import taggedstore
+from ns.utils.tracing import Tracer
 
 
 class VirtualClockServer:
@@ -80,6 +81,7 @@ class VirtualClockServer:
         self.packets_received = 0
         self.packets_dropped = 0
         self.debug = debug
+        self.tracer = Tracer(__name__, env, debug=debug)
 
         self.current_packet = None
         self.byte_sizes = dd(lambda: 0)
@@ -108,8 +110,8 @@ class VirtualClockServer:
             raise ValueError("Error: the packet is from an unrecorded flow.")
 
         if self.debug:
-            print(f"Sent Packet {packet.packet_id} from flow {packet.flow_id} "
-                  f"belonging to class {self.flow_classes(packet.flow_id)}")
+            self.tracer.debug(f"Sent Packet {packet.packet_id} from flow {packet.flow_id} "
+                              f"belonging to class {self.flow_classes(packet.flow_id)}")
 
     def update(self, packet):
         """
@@ -161,7 +163,10 @@ class VirtualClockServer:
         """The generator function used in simulations."""
         while True:
             if self.zero_downstream_buffer:
-                packet = yield self.downstream_store.get()
+                if self.downstream_store.items:
+                    packet = self.downstream_store.get_nowait()
+                else:
+                    packet = yield self.downstream_store.get()
 
                 self.current_packet = packet
                 yield self.env.timeout(packet.size * 8.0 / self.rate)
@@ -171,7 +176,10 @@ class VirtualClockServer:
                              upstream_store=self.store)
                 self.current_packet = None
             else:
-                packet = yield self.store.get()
+                if self.store.items:
+                    packet = self.store.get_nowait()
+                else:
+                    packet = yield self.store.get()
                 self.update(packet)
 
                 self.current_packet = packet
@@ -207,7 +215,7 @@ class VirtualClockServer:
         # Lots of work to do here to implement the queueing discipline
 
         if self.debug:
-            print(
+            self.tracer.debug(
                 f"Packet arrived at {self.env.now}, with flow_id {flow_id}, "
                 f"belong to class {self.flow_classes(flow_id)}, "
                 f"packet_id {packet.packet_id}, virtual clocks {self.v_clocks[self.flow_classes(flow_id)]}, "
@@ -218,8 +226,8 @@ class VirtualClockServer:
             self.upstream_updates[packet] = upstream_update
 
         if self.zero_downstream_buffer:
-            self.downstream_store.put(
+            self.downstream_store.put_nowait(
                 (self.aux_vc[self.flow_classes(flow_id)], packet))
 
-        return self.store.put(
+        self.store.put_nowait(
             (self.aux_vc[self.flow_classes(flow_id)], packet))
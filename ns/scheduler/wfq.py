@@ -14,6 +14,7 @@ from collections.abc import Callable
 
 from ns.packet.packet import Packet
 from ns.utils import taggedstore
+from ns.utils.tracing import Tracer
 
 
 class WFQServer:
@@ -74,12 +75,18 @@ class WFQServer:
         else:
             raise ValueError('Weights must be either a list or a dictionary.')
 
+        # the classes mapped to by each flow ID, resolved once per flow
+        self.class_ids = {}
+
         self.active_set = set()
+        # the sum of the weights in the active set, maintained as classes join and leave it
+        self.active_weight_sum = 0.0
         self.vtime = 0.0
         self.out = None
         self.packets_received = 0
         self.packets_dropped = 0
         self.debug = debug
+        self.tracer = Tracer(__name__, env, debug=debug)
 
         self.current_packet = None
         self.byte_sizes = dd(lambda: 0)
@@ -95,43 +102,53 @@ class WFQServer:
         self.action = env.process(self.run())
         self.last_update = 0.0
 
+    def class_id(self, flow_id):
+        """
+        Returns the class ID that a flow ID is mapped to by `flow_classes`. The result
+        is cached, as `flow_classes` is assumed to be a fixed mapping.
+        """
+        try:
+            return self.class_ids[flow_id]
+        except KeyError:
+            class_id = self.class_ids[flow_id] = self.flow_classes(flow_id)
+            return class_id
+
     def update_stats(self, packet):
         """
         The packet has been sent (or authorized to be sent if the downstream node has a zero-buffer
         configuration), we need to update the internal statistics related to this event.
         """
-
-        weight_sum = 0.0
         now = self.env.now
 
         # Updating the virtual time based on the current set of active flow classes
-        for i in self.active_set:
-            weight_sum += self.weights[i]
-
-        self.vtime += (now - self.last_update) / weight_sum
+        self.vtime += (now - self.last_update) / self.active_weight_sum
 
         # Computing the new set of active flow classes
         flow_id = packet.flow_id
-        self.flow_queue_count[self.flow_classes(flow_id)] -= 1
+        class_id = self.class_id(flow_id)
+        self.flow_queue_count[class_id] -= 1
 
-        if self.flow_queue_count[self.flow_classes(flow_id)] == 0:
-            self.active_set.remove(self.flow_classes(flow_id))
+        if self.flow_queue_count[class_id] == 0:
+            self.active_set.remove(class_id)
+            self.active_weight_sum -= self.weights[class_id]
 
         if len(self.active_set) == 0:
+            # resetting the sum as well, so that rounding errors do not accumulate
+            self.active_weight_sum = 0.0
             self.vtime = 0.0
             for (queue_id, __) in self.finish_times.items():
                 self.finish_times[queue_id] = 0.0
 
         self.last_update = now
 
-        if self.flow_classes(flow_id) in self.byte_sizes:
-            self.byte_sizes[self.flow_classes(flow_id)] -= packet.size
+        if class_id in self.byte_sizes:
+            self.byte_sizes[class_id] -= packet.size
         else:
             raise ValueError("Error: the packet is from an unrecorded flow.")
 
         if self.debug:
-            print(f"Sent Packet {packet.packet_id} from flow {flow_id} "
-                  f"belonging to class {self.flow_classes(flow_id)}")
+            self.tracer.debug(f"Sent Packet {packet.packet_id} from flow {flow_id} "
+                              f"belonging to class {class_id}")
 
     def update(self, packet):
         """
@@ -182,7 +199,10 @@ class WFQServer:
         """The generator function used in simulations."""
         while True:
             if self.zero_downstream_buffer:
-                packet = yield self.downstream_store.get()
+                if self.downstream_store.items:
+                    packet = self.downstream_store.get_nowait()
+                else:
+                    packet = yield self.downstream_store.get()
                 self.current_packet = packet
                 yield self.env.timeout(packet.size * 8.0 / self.rate)
 
@@ -192,7 +212,10 @@ class WFQServer:
                              upstream_store=self.store)
                 self.current_packet = None
             else:
-                packet = yield self.store.get()
+                if self.store.items:
+                    packet = self.store.get_nowait()
+                else:
+                    packet = yield self.store.get()
 
                 self.current_packet = packet
                 yield self.env.timeout(packet.size * 8.0 / self.rate)
@@ -206,6 +229,7 @@ class WFQServer:
         """ Sends a packet to this element. """
         self.packets_received += 1
         flow_id = packet.flow_id
+        class_id = self.class_id(flow_id)
 
         # Updating the virtual time and the finish time for each flow class
         now = self.env.now
@@ -215,28 +239,25 @@ class WFQServer:
             for (queue_id, __) in self.finish_times.items():
                 self.finish_times[queue_id] = 0.0
         else:
-            weight_sum = 0.0
-
-            for i in self.active_set:
-                weight_sum += self.weights[i]
-
-            self.vtime += (now - self.last_update) / weight_sum
-            self.finish_times[self.flow_classes(flow_id)] = max(
-                self.finish_times[self.flow_classes(flow_id)],
+            self.vtime += (now - self.last_update) / self.active_weight_sum
+            self.finish_times[class_id] = max(
+                self.finish_times[class_id],
                 self.vtime) + packet.size * 8.0 / (
-                    self.rate * self.weights[self.flow_classes(flow_id)])
+                    self.rate * self.weights[class_id])
 
         # Updating the byte sizes, the flow queue count, and the set of active flows
-        self.byte_sizes[self.flow_classes(flow_id)] += packet.size
-        self.flow_queue_count[self.flow_classes(flow_id)] += 1
-        self.active_set.add(self.flow_classes(flow_id))
+        self.byte_sizes[class_id] += packet.size
+        self.flow_queue_count[class_id] += 1
+        if class_id not in self.active_set:
+            self.active_set.add(class_id)
+            self.active_weight_sum += self.weights[class_id]
 
         if self.debug:
-            print(
+            self.tracer.debug(
                 f"Packet arrived at {now}, with flow_id {flow_id}, "
-                f"belonging to class {self.flow_classes(flow_id)}, "
+                f"belonging to class {class_id}, "
                 f"packet_id {packet.packet_id}, "
-                f"finish_time {self.finish_times[self.flow_classes(flow_id)]}")
+                f"finish_time {self.finish_times[class_id]}")
 
         self.last_update = now
 
@@ -245,8 +266,6 @@ class WFQServer:
             self.upstream_updates[packet] = upstream_update
 
         if self.zero_downstream_buffer:
-            self.downstream_store.put(
-                (self.finish_times[self.flow_classes(flow_id)], packet))
+            self.downstream_store.put_nowait((self.finish_times[class_id], packet))
 
-        return self.store.put(
-            (self.finish_times[self.flow_classes(flow_id)], packet))
+        self.store.put_nowait((self.finish_times[class_id], packet))
@@ -3,6 +3,7 @@ Implements a packet switch with FIFO or WFQ/DRR/Virtual Clock bounded buffers fo
 """
 from collections.abc import Callable
 
+from ns.port.hybrid_port import HybridPort
 from ns.port.port import Port
 from ns.demux.fib_demux import FIBDemux
 from ns.scheduler.wfq import WFQServer
@@ -28,6 +29,16 @@ class SimplePacketSwitch:
             The (optional) element ID of this component.
         debug: bool
             If True, prints more verbose debug information.
+        hybrid: bool
+            If True, the outgoing ports are `HybridPort`s, which track their backlogs as
+            fluid queues. Unless `hybrid_batch` is also True, they still schedule one event
+            for the departure of each packet.
+        hybrid_batch: bool
+            If True, the `HybridPort`s deliver the departed packets in batches through the
+            `put_at()` call of their downstream elements, such as `PacketSink`s, scheduling
+            one event per busy period rather than one per packet. The downstream elements do
+            not see any packet of a busy period until the backlog drains, or until `flush()`
+            is called on the port. Requires `hybrid`.
     """
     def __init__(self,
                  env,
@@ -35,17 +46,32 @@ class SimplePacketSwitch:
                  port_rate: float,
                  buffer_size: int,
                  element_id: str = "",
-                 debug: bool = False) -> None:
+                 debug: bool = False,
+                 hybrid: bool = False,
+                 hybrid_batch: bool = False) -> None:
+        if hybrid_batch and not hybrid:
+            raise ValueError('Batched delivery requires hybrid ports.')
+
         self.env = env
         self.ports = []
         for port in range(nports):
-            self.ports.append(
-                Port(env,
-                     rate=port_rate,
-                     qlimit=buffer_size,
-                     limit_bytes=False,
-                     element_id=f"{element_id}_{port}",
-                     debug=debug))
+            if hybrid:
+                self.ports.append(
+                    HybridPort(env,
+                               rate=port_rate,
+                               qlimit=buffer_size,
+                               limit_bytes=False,
+                               element_id=f"{element_id}_{port}",
+                               debug=debug,
+                               batch=hybrid_batch))
+            else:
+                self.ports.append(
+                    Port(env,
+                         rate=port_rate,
+                         qlimit=buffer_size,
+                         limit_bytes=False,
+                         element_id=f"{element_id}_{port}",
+                         debug=debug))
         self.demux = FIBDemux(fib=None, outs=self.ports, default=None)
 
     def put(self, packet):
@@ -89,3 +89,34 @@ def build(k):
         topo.add_edges_from([(u, v) for v in leaf_nodes], type='edge_leaf')
 
     return topo
+
+
+def partition(topo, n_partitions):
+    """
+    Assign the nodes of a fat tree topology to partitions for parallel simulation, keeping
+    each pod within a single partition. Pods are assigned to partitions in a round-robin
+    fashion, and so are core switches, so that only the links between core and aggregation
+    switches cross partitions.
+
+    Parameters
+    ----------
+    topo: a networkx graph
+        A fat tree topology, as returned by `build()`.
+    n_partitions: int
+        The number of partitions.
+
+    Returns
+    -------
+    partitions: a dict that maps each node to its partition
+    """
+    if n_partitions < 1:
+        raise ValueError('n_partitions must be a positive integer')
+
+    partitions = {}
+    for node, attributes in topo.nodes(data=True):
+        if attributes['layer'] == 'core':
+            partitions[node] = node % n_partitions
+        else:
+            partitions[node] = attributes['pod'] % n_partitions
+
+    return partitions
@@ -0,0 +1,166 @@
+"""
+Implements path services that choose the paths of flows in a topology, without enumerating all
+the simple paths between their sources and destinations.
+
+* `ECMPTable`: equal-cost multi-path (ECMP) next-hop tables for any topology. The distances to
+  each destination are computed once with a breadth-first search and cached, so that a random
+  shortest path can be drawn in time proportional to its length.
+
+* `FatTreeRouting`: closed-form shortest-path routing in a fat tree built by
+  `ns.topos.fattree.build()`, which computes paths from the node IDs alone.
+
+* `KShortestPaths`: samples one of the k shortest simple paths between a source and a
+  destination, for topologies in which paths longer than the shortest ones should also be used.
+
+All path services offer a `path(src, dst, rng)` call, which returns a path as a list of nodes,
+choosing among the candidate paths with the random number generator `rng` (an instance of
+`random.Random`, or the `random` module itself).
+"""
+import random
+from itertools import islice
+
+import networkx as nx
+
+
+class ECMPTable:
+    """ Equal-cost multi-path next-hop tables for a topology, computed lazily for each
+        destination and cached.
+
+        Parameters
+        ----------
+        G: a networkx graph
+            The topology.
+    """
+    def __init__(self, G):
+        self.G = G
+        self.distances = {}
+
+    def distances_to(self, dst) -> dict:
+        """ Returns the number of hops from every node to `dst`. """
+        if dst not in self.distances:
+            self.distances[dst] = nx.single_source_shortest_path_length(self.G, dst)
+        return self.distances[dst]
+
+    def next_hops(self, node, dst) -> list:
+        """ Returns the neighbors of `node` on a shortest path to `dst`. """
+        distances = self.distances_to(dst)
+        distance = distances[node] - 1
+        return [v for v in self.G.neighbors(node) if distances.get(v) == distance]
+
+    def path(self, src, dst, rng=random) -> list:
+        """ Returns a shortest path from `src` to `dst`, choosing uniformly among the equal-cost
+            next hops at each node. """
+        distances = self.distances_to(dst)
+        if src not in distances:
+            raise nx.NetworkXNoPath(f"No path between {src} and {dst}.")
+
+        path = [src]
+        node = src
+        while node != dst:
+            distance = distances[node] - 1
+            node = rng.choice(
+                [v for v in self.G.neighbors(node) if distances.get(v) == distance])
+            path.append(node)
+        return path
+
+
+class FatTreeRouting:
+    """ Closed-form shortest-path routing in a fat tree built by `ns.topos.fattree.build(k)`,
+        whose node IDs are numbered as follows: the (k/2)^2 core switches first, then for each
+        pod its k/2 aggregation switches and its k/2 edge switches, and finally the k/2 hosts of
+        each edge switch, in the order of the edge switches.
+
+        Parameters
+        ----------
+        k: int
+            The number of ports of the switches.
+    """
+    def __init__(self, k: int):
+        if k < 2 or k % 2 == 1:
+            raise ValueError('k must be a positive even integer')
+
+        self.k = k
+        self.half = k // 2
+        self.n_core = self.half**2
+        self.first_host = self.n_core + k * k
+        self.n_hosts = k**3 // 4
+
+    def locate(self, host):
+        """ Returns the pod of a host and the index of its edge switch within the pod. """
+        index = host - self.first_host
+        if not 0 <= index < self.n_hosts:
+            raise ValueError(f"{host} is not a host in a fat tree with k = {self.k}.")
+
+        edge_index = index // self.half
+        return edge_index // self.half, edge_index % self.half
+
+    def aggregation(self, pod, index):
+        """ Returns the ID of an aggregation switch. """
+        return self.n_core + self.k * pod + index
+
+    def edge(self, pod, index):
+        """ Returns the ID of an edge switch. """
+        return self.n_core + self.k * pod + self.half + index
+
+    def path(self, src, dst, rng=random) -> list:
+        """ Returns a shortest path between two hosts, choosing the aggregation and core
+            switches uniformly at random. """
+        src_pod, src_edge = self.locate(src)
+        dst_pod, dst_edge = self.locate(dst)
+
+        if src_pod == dst_pod:
+            if src_edge == dst_edge:
+                return [src, self.edge(src_pod, src_edge), dst]
+
+            aggregation = rng.randrange(self.half)
+            return [
+                src,
+                self.edge(src_pod, src_edge),
+                self.aggregation(src_pod, aggregation),
+                self.edge(dst_pod, dst_edge), dst
+            ]
+
+        # core switch c is connected to aggregation switch c // (k/2) in every pod
+        aggregation = rng.randrange(self.half)
+        core = aggregation * self.half + rng.randrange(self.half)
+        return [
+            src,
+            self.edge(src_pod, src_edge),
+            self.aggregation(src_pod, aggregation), core,
+            self.aggregation(dst_pod, aggregation),
+            self.edge(dst_pod, dst_edge), dst
+        ]
+
+
+class KShortestPaths:
+    """ Samples one of the k shortest simple paths between a source and a destination. The
+        paths between each pair of nodes are computed once, with Yen's algorithm, and cached.
+
+        Parameters
+        ----------
+        G: a networkx graph
+            The topology.
+        k: int
+            The number of shortest paths to sample from.
+        weight: str
+            The edge attribute used as the length of the edges, or None to count hops.
+    """
+    def __init__(self, G, k: int = 4, weight=None):
+        if k < 1:
+            raise ValueError('k must be a positive integer')
+
+        self.G = G
+        self.k = k
+        self.weight = weight
+        self.paths = {}
+
+    def shortest_paths(self, src, dst) -> list:
+        """ Returns the k shortest simple paths from `src` to `dst`. """
+        if (src, dst) not in self.paths:
+            self.paths[(src, dst)] = list(
+                islice(nx.shortest_simple_paths(self.G, src, dst, weight=self.weight), self.k))
+        return self.paths[(src, dst)]
+
+    def path(self, src, dst, rng=random) -> list:
+        """ Returns one of the k shortest paths from `src` to `dst`, chosen uniformly. """
+        return rng.choice(self.shortest_paths(src, dst))
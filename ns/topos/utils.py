@@ -1,7 +1,11 @@
-from random import sample
+import random
+from itertools import chain
+
 import networkx as nx
+import numpy as np
 
 from ns.flow.flow import Flow
+from ns.topos.paths import ECMPTable
 
 
 def read_topo(fname):
@@ -12,19 +16,65 @@ def read_topo(fname):
         print(f"{fname} is not GraphML")
 
 
-def generate_flows(G, hosts, nflows):
+def generate_flows(G, hosts, nflows, paths=None, rng=random):
+    """ Generates flows between random pairs of hosts, each following a path chosen by a
+        path service.
+
+        Parameters
+        ----------
+        G: a networkx graph
+            The topology.
+        hosts: iterable
+            The hosts among which the sources and destinations of the flows are chosen.
+        nflows: int
+            The number of flows.
+        paths:
+            A path service from `ns.topos.paths`, whose `path(src, dst, rng)` returns the path
+            of a flow. The default, an `ECMPTable` of `G`, chooses a random shortest path.
+        rng:
+            The random number generator used to choose the hosts and the paths of the flows.
+    """
+    hosts = sorted(hosts)
+    if paths is None:
+        paths = ECMPTable(G)
+
     all_flows = dict()
     for flow_id in range(nflows):
-        src, dst = sample(hosts, 2)
+        src, dst = rng.sample(hosts, 2)
         all_flows[flow_id] = Flow(flow_id, src, dst)
-        all_flows[flow_id].path = sample(
-            list(nx.all_simple_paths(G, src, dst, cutoff=nx.diameter(G))),
-            1)[0]
+        all_flows[flow_id].path = paths.path(src, dst, rng)
     return all_flows
 
 
-def generate_fib(G, all_flows):
-    for n in G.nodes():
+def generate_fib(G, all_flows, dicts=True):
+    """ Generates the forwarding information base (FIB) of every node from the paths of the
+        flows.
+
+        The FIB of each node is stored in two compact arrays, sorted by flow ID, which are built
+        with vectorized operations over the paths of all the flows: `fib_flows`, the IDs of the
+        flows that traverse the node, and `fib_ports`, the output port of each of these flows.
+        `fib_table()` expands them into a dense array indexed by flow ID.
+
+        Each node also has the attributes `port_to_nexthop` and `nexthop_to_port`, which map its
+        ports to its neighbors and back.
+
+        Parameters
+        ----------
+        G: a networkx graph
+            The topology.
+        all_flows: dict
+            The flows, each with a `path` in `G`, keyed by flow ID.
+        dicts: bool
+            If True, the FIB of each node is also stored in the dictionaries `flow_to_port` and
+            `flow_to_nexthop`, keyed by flow ID.
+    """
+    node_ids = list(G.nodes())
+    index = {n: i for i, n in enumerate(node_ids)}
+    n_nodes = len(node_ids)
+
+    edge_keys = []
+    edge_ports = []
+    for n in node_ids:
         node = G.nodes[n]
 
         node['port_to_nexthop'] = dict()
@@ -33,17 +83,73 @@ def generate_fib(G, all_flows):
         for port, nh in enumerate(nx.neighbors(G, n)):
             node['nexthop_to_port'][nh] = port
             node['port_to_nexthop'][port] = nh
+            edge_keys.append(index[n] * n_nodes + index[nh])
+            edge_ports.append(port)
+
+    edge_keys = np.array(edge_keys, dtype=np.int64)
+    edge_ports = np.array(edge_ports, dtype=np.int32)
+    order = np.argsort(edge_keys)
+    edge_keys = edge_keys[order]
+    edge_ports = edge_ports[order]
+
+    # all the hops of all the flows, as (node, next hop, flow ID)
+    flows = list(all_flows.values())
+    lengths = np.fromiter((len(flow.path) for flow in flows), dtype=np.int64, count=len(flows))
+    hops = np.fromiter(map(index.__getitem__,
+                           chain.from_iterable(flow.path for flow in flows)),
+                       dtype=np.int64,
+                       count=int(lengths.sum()))
+    flow_ids = np.fromiter((flow.fid for flow in flows), dtype=np.int64, count=len(flows))
 
-        node['flow_to_port'] = dict()
-        node['flow_to_nexthop'] = dict()
+    is_last = np.zeros(len(hops), dtype=bool)
+    is_last[np.cumsum(lengths) - 1] = True
+    positions = np.flatnonzero(~is_last)
+    a = hops[positions]
+    z = hops[positions + 1]
+    hop_flows = np.repeat(flow_ids, lengths - 1)
 
-    for f in all_flows:
-        flow = all_flows[f]
-        path = list(zip(flow.path, flow.path[1:]))
-        for seg in path:
-            a, z = seg
-            G.nodes[a]['flow_to_port'][
-                flow.fid] = G.nodes[a]['nexthop_to_port'][z]
-            G.nodes[a]['flow_to_nexthop'][flow.fid] = z
+    keys = a * n_nodes + z
+    found = np.minimum(np.searchsorted(edge_keys, keys), max(len(edge_keys) - 1, 0))
+    if len(keys) and not np.array_equal(edge_keys[found], keys):
+        raise ValueError("The path of a flow traverses a link that is not in the topology.")
+    hop_ports = edge_ports[found]
+
+    order = np.lexsort((hop_flows, a))
+    a = a[order]
+    z = z[order]
+    hop_flows = hop_flows[order]
+    hop_ports = hop_ports[order]
+    bounds = np.searchsorted(a, np.arange(n_nodes + 1))
+
+    for i, n in enumerate(node_ids):
+        node = G.nodes[n]
+        lo, hi = bounds[i], bounds[i + 1]
+        node['fib_flows'] = hop_flows[lo:hi]
+        node['fib_ports'] = hop_ports[lo:hi]
+
+        if dicts:
+            fids = node['fib_flows'].tolist()
+            node['flow_to_port'] = dict(zip(fids, node['fib_ports'].tolist()))
+            node['flow_to_nexthop'] = dict(zip(fids, [node_ids[v] for v in z[lo:hi]]))
 
     return G
+
+
+def fib_table(node, n_flows=None):
+    """ Returns the FIB of a node, generated by `generate_fib()`, as a dense array indexed by
+        flow ID, in which flows that do not traverse the node have the port -1.
+
+        Parameters
+        ----------
+        node: dict
+            The attributes of the node, such as `G.nodes[n]`.
+        n_flows: int
+            The length of the array; by default, one more than the largest flow ID in the FIB.
+    """
+    flow_ids = node['fib_flows']
+    if n_flows is None:
+        n_flows = int(flow_ids[-1]) + 1 if len(flow_ids) else 0
+
+    table = np.full(n_flows, -1, dtype=np.int32)
+    table[flow_ids] = node['fib_ports']
+    return table
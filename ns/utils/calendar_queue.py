@@ -0,0 +1,236 @@
+"""
+Implements a calendar queue, a bucketed priority queue for discrete-event simulation with
+O(1) amortized insertions and removals, and `CalendarEnvironment`, a drop-in replacement for
+`simpy.Environment` that keeps its scheduled events in a calendar queue rather than in a single
+binary heap.
+
+Events that are scheduled without a delay, such as the events triggered by `succeed()` and
+the initialization of processes, are the most common in `ns.py` simulations. They are kept in
+two first-in-first-out queues, one for each of SimPy's URGENT and NORMAL priorities, as they
+are always processed before any later event. Only the events scheduled with a delay, such as
+timeouts, go into the calendar queue.
+
+The order in which events are processed is exactly the same as in `simpy.Environment`: by
+time, then by priority, then by the order in which they were scheduled.
+
+Reference:
+
+R. Brown, "Calendar Queues: A Fast O(1) Priority Queue Implementation for the Simulation
+Event Set Problem," Commun. ACM, vol. 31, no. 10, pp. 1220-1227, 1988.
+"""
+import sys
+from collections import deque
+from heapq import heappop, heappush, nsmallest
+
+import simpy
+from simpy.core import EmptySchedule, Infinity, StopSimulation
+from simpy.events import NORMAL, URGENT
+
+
+class CalendarQueue:
+    """ A priority queue of (time, priority, event ID, event) entries, sorted in the same order
+        as the tuples. The time axis is divided into buckets of a fixed width, which wrap around
+        a circular array like the days of a year in a calendar; each bucket keeps its entries in
+        a small binary heap. The number of buckets is doubled or halved as the queue grows or
+        shrinks, and the bucket width is recomputed from the spacing of the earliest entries.
+
+        Entries at an infinite time, such as a timeout with an infinite delay, are kept in the
+        last bucket on the time axis, after all the entries at a finite time.
+
+        Parameters
+        ----------
+        n_buckets: int
+            The initial number of buckets.
+        width: float
+            The initial width of a bucket, in simulation time.
+    """
+    def __init__(self, n_buckets: int = 16, width: float = 1.0):
+        self.buckets = [[] for __ in range(n_buckets)]
+        self.n_buckets = n_buckets
+        self.width = width
+        self.size = 0
+
+        # the number of the current bucket on the time axis (not wrapped around)
+        self.current = 0
+
+        # the index of the bucket whose heap contains the earliest entry, if known
+        self.head_bucket = None
+
+    def __len__(self):
+        return self.size
+
+    def number(self, time) -> int:
+        """ Returns the number of the bucket on the time axis (not wrapped around) that an
+            entry at the given time falls into.
+        """
+        if time == Infinity:
+            return sys.maxsize
+        return int(time / self.width)
+
+    def push(self, entry):
+        """ Adds an entry, which must not be earlier than the last entry that was removed. """
+        time = entry[0]
+        number = int(time / self.width) if time != Infinity else sys.maxsize
+        if number < self.current:
+            # the entry is earlier than where the next scan would start
+            self.current = number
+
+        index = number % self.n_buckets
+        bucket = self.buckets[index]
+        heappush(bucket, entry)
+        self.size += 1
+
+        if self.head_bucket is not None and bucket[0] is entry and \
+                entry < self.buckets[self.head_bucket][0]:
+            self.head_bucket = index
+
+        if self.size > 2 * self.n_buckets:
+            self.resize(2 * self.n_buckets)
+
+    def head(self):
+        """ Returns the earliest entry without removing it, or None if the queue is empty. """
+        if self.head_bucket is None:
+            if self.size == 0:
+                return None
+            self.head_bucket = self.find_head()
+
+        return self.buckets[self.head_bucket][0]
+
+    def pop(self):
+        """ Removes and returns the earliest entry. Raises an IndexError if the queue is empty. """
+        if self.head_bucket is None:
+            if self.size == 0:
+                raise IndexError('pop from an empty CalendarQueue')
+            self.head_bucket = self.find_head()
+
+        entry = heappop(self.buckets[self.head_bucket])
+        self.head_bucket = None
+        self.size -= 1
+
+        if self.size < self.n_buckets // 2 and self.n_buckets > 16:
+            self.resize(self.n_buckets // 2)
+
+        return entry
+
+    def find_head(self) -> int:
+        """ Returns the index of the bucket containing the earliest entry, scanning the buckets
+            from the current one for at most one year, and searching all the buckets directly
+            if no entry falls within the year.
+        """
+        n_buckets = self.n_buckets
+        buckets = self.buckets
+
+        current = self.current
+        for __ in range(n_buckets):
+            bucket = buckets[current % n_buckets]
+            if bucket and self.number(bucket[0][0]) <= current:
+                self.current = current
+                return current % n_buckets
+            current += 1
+
+        earliest = min((bucket[0] for bucket in buckets if bucket))
+        self.current = self.number(earliest[0])
+        return self.current % n_buckets
+
+    def resize(self, n_buckets: int):
+        """ Redistributes the entries into a new number of buckets, with a new bucket width. """
+        entries = [entry for bucket in self.buckets for entry in bucket]
+
+        # Brown's heuristic: three times the average separation of the earliest entries,
+        # ignoring entries that are scheduled at the same time or at an infinite time
+        earliest = nsmallest(min(len(entries), 25), entries)
+        gaps = [b[0] - a[0] for a, b in zip(earliest, earliest[1:]) if a[0] < b[0] < Infinity]
+        if gaps:
+            self.width = 3.0 * sum(gaps) / len(gaps)
+
+        self.n_buckets = n_buckets
+        self.buckets = [[] for __ in range(n_buckets)]
+        for entry in entries:
+            heappush(self.buckets[self.number(entry[0]) % n_buckets], entry)
+
+        self.current = self.number(earliest[0][0]) if earliest else 0
+        self.head_bucket = None
+
+
+class CalendarEnvironment(simpy.Environment):
+    """ A `simpy.Environment` that keeps its scheduled events in a `CalendarQueue`, with the
+        events scheduled without a delay in separate first-in-first-out queues. It can be used
+        in place of `simpy.Environment` to run any simulation.
+
+        Parameters
+        ----------
+        initial_time: float
+            The initial simulation time.
+        n_buckets: int
+            The initial number of buckets in the calendar queue.
+        width: float
+            The initial width of a bucket in the calendar queue, in simulation time.
+    """
+    def __init__(self, initial_time=0, n_buckets: int = 16, width: float = 1.0):
+        super().__init__(initial_time)
+        self.calendar = CalendarQueue(n_buckets, width)
+        self.urgent = deque()
+        self.normal = deque()
+
+    def schedule(self, event, priority=NORMAL, delay=0):
+        """ Schedules an event with a given priority and a delay. """
+        if delay == 0:
+            # these events are processed before any event scheduled later, and in the
+            # order in which they have been scheduled within each priority
+            if priority == NORMAL:
+                self.normal.append((self._now, priority, next(self._eid), event))
+                return
+            if priority == URGENT:
+                self.urgent.append((self._now, priority, next(self._eid), event))
+                return
+
+        self.calendar.push((self._now + delay, priority, next(self._eid), event))
+
+    def peek(self):
+        """ Returns the time of the next scheduled event, or infinity if there are none. """
+        if self.urgent or self.normal:
+            return self._now
+
+        head = self.calendar.head()
+        return Infinity if head is None else head[0]
+
+    def next_entry(self):
+        """ Removes and returns the earliest scheduled entry. """
+        head = self.calendar.head()
+
+        if self.urgent:
+            if head is not None and head < self.urgent[0]:
+                return self.calendar.pop()
+            return self.urgent.popleft()
+
+        if self.normal:
+            if head is not None and head < self.normal[0]:
+                return self.calendar.pop()
+            return self.normal.popleft()
+
+        if head is None:
+            raise EmptySchedule()
+
+        return self.calendar.pop()
+
+    def step(self):
+        """ Processes the next event. Raises an `EmptySchedule` if there are no more events. """
+        self._now, __, __, event = self.next_entry()
+
+        # Process the callbacks of the event, in the same way as simpy.Environment
+        callbacks, event.callbacks = event.callbacks, None
+        try:
+            for callback in callbacks:
+                callback(event)
+        except StopSimulation:
+            # As in simpy.Environment.step() (SimPy 4.1.2), the remaining callbacks are kept,
+            # and the event is rescheduled ahead of all the others, to be processed first
+            # when the simulation resumes
+            event.callbacks = callbacks[callbacks.index(callback) + 1:]
+            self.schedule(event, -1)
+            raise
+
+        if not event._ok and not hasattr(event, '_defused'):
+            exc = type(event._value)(*event._value.args)
+            exc.__cause__ = event._value
+            raise exc
@@ -0,0 +1,213 @@
+"""
+Implements a columnar recorder for per-packet measurements, backed by NumPy arrays.
+
+Recording each measurement in a Python list costs a pointer plus a boxed float per value, and
+keeping a reference to the `perhop_time` dict of each packet keeps the dict alive for the entire
+run. In a `FlowColumns` recorder, each measurement is stored in a typed, growable NumPy array,
+and the per-hop timestamps of all packets are flattened into a hop x packet matrix, so that the
+memory used per packet is a few machine words. Statistics over the recorded packets are computed
+with vectorized NumPy operations after the run.
+"""
+import numpy as np
+
+
+class GrowableArray:
+    """ A one-dimensional typed NumPy array that supports amortized O(1) appends.
+
+        Parameters
+        ----------
+        dtype: numpy.dtype
+            The type of the elements in the array.
+        capacity: int
+            The initial number of elements that can be stored before the array grows.
+    """
+    def __init__(self, dtype=np.float64, capacity: int = 16):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __array__(self, dtype=None, copy=None):
+        if dtype is None:
+            return self.values
+        return self.values.astype(dtype)
+
+    @property
+    def values(self):
+        """ A view of the elements that have been appended so far. """
+        return self.data[:self.size]
+
+    def append(self, value):
+        """ Appends a value to the end of the array, doubling its capacity if it is full. """
+        if self.size == len(self.data):
+            data = np.empty(2 * len(self.data), dtype=self.data.dtype)
+            data[:self.size] = self.data
+            self.data = data
+
+        self.data[self.size] = value
+        self.size += 1
+
+
+class HopMatrix:
+    """ Records the times at which packets were seen at each hop, as a hop x packet matrix of
+        timestamps. Row `i` corresponds to the element ID `hops[i]`, in the order in which the
+        element IDs were first seen; a NaN entry means that the packet did not visit the hop.
+
+        Parameters
+        ----------
+        capacity: int
+            The initial number of packets that can be stored before the matrix grows.
+        hop_capacity: int
+            The initial number of hops that can be stored before the matrix grows.
+    """
+    def __init__(self, capacity: int = 16, hop_capacity: int = 4):
+        self.hops = []
+        self.rows = {}
+        self.data = np.full((hop_capacity, capacity), np.nan)
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def values(self):
+        """ A view of the timestamps of the packets that have been appended so far. """
+        return self.data[:len(self.hops), :self.size]
+
+    def append(self, perhop_time):
+        """ Appends the per-hop timestamps of a packet, given as an (element ID -> time) dict,
+            or None if the packet has not been seen at any hop.
+        """
+        if self.size == self.data.shape[1]:
+            self.grow(self.data.shape[0], 2 * self.data.shape[1])
+
+        if perhop_time:
+            for element_id, time in perhop_time.items():
+                row = self.rows.get(element_id)
+                if row is None:
+                    row = self.add_hop(element_id)
+                self.data[row, self.size] = time
+
+        self.size += 1
+
+    def add_hop(self, element_id) -> int:
+        """ Adds a row for a hop that has not been seen before, and returns its index. """
+        row = len(self.hops)
+        if row == self.data.shape[0]:
+            self.grow(max(1, 2 * self.data.shape[0]), self.data.shape[1])
+
+        self.hops.append(element_id)
+        self.rows[element_id] = row
+        return row
+
+    def grow(self, n_rows: int, n_columns: int):
+        """ Reallocates the matrix with at least as many rows and columns as before, keeping
+            the timestamps that have been recorded so far.
+        """
+        data = np.full((n_rows, n_columns), np.nan)
+        data[:self.data.shape[0], :self.data.shape[1]] = self.data
+        self.data = data
+
+
+class FlowColumns:
+    """ Records the arrival times, waiting times, sizes, generation times and per-hop timestamps
+        of the packets in a flow, with one growable NumPy array per measurement.
+
+        Parameters
+        ----------
+        capacity: int
+            The initial number of packets that can be recorded before the arrays grow.
+    """
+    def __init__(self, capacity: int = 16):
+        self.arrival_column = GrowableArray(np.float64, capacity)
+        self.wait_column = GrowableArray(np.float64, capacity)
+        self.size_column = GrowableArray(np.float64, capacity)
+        self.time_column = GrowableArray(np.float64, capacity)
+        self.hop_matrix = HopMatrix(capacity)
+
+    @property
+    def arrivals(self):
+        """ The arrival times (or inter-arrival times) of the packets at the sink. """
+        return self.arrival_column.values
+
+    @property
+    def waits(self):
+        """ The times between the creation of the packets and their arrival at the sink. """
+        return self.wait_column.values
+
+    @property
+    def sizes(self):
+        """ The sizes of the packets in bytes. """
+        return self.size_column.values
+
+    @property
+    def times(self):
+        """ The creation times of the packets. """
+        return self.time_column.values
+
+    @property
+    def hops(self) -> list:
+        """ The element IDs of the hops, in the order of the rows of `hop_times`. """
+        return self.hop_matrix.hops
+
+    @property
+    def hop_times(self):
+        """ The hop x packet matrix of the times at which the packets were seen at each hop. """
+        return self.hop_matrix.values
+
+    def record_arrival(self, arrival):
+        """ Records the arrival time (or inter-arrival time) of a packet. """
+        self.arrival_column.append(arrival)
+
+    def record_wait(self, wait, size, time, perhop_time):
+        """ Records the waiting time, size, creation time and per-hop timestamps of a packet;
+            `perhop_time` is None for a packet that has not been seen at any hop. """
+        self.wait_column.append(wait)
+        self.size_column.append(size)
+        self.time_column.append(time)
+        self.hop_matrix.append(perhop_time)
+
+    def hop_latencies(self):
+        """ Returns a hop x packet matrix of the time that each packet spent at each hop, from
+            the time it was seen at the hop to the time it was seen at the next hop on its path,
+            or at the sink for the last hop. Entries for hops that a packet did not visit are NaN.
+        """
+        times = self.hop_times
+        if times.shape[0] == 0:
+            return times.copy()
+
+        # Sorting the hops of each packet by time, with the unvisited (NaN) hops at the end
+        order = np.argsort(times, axis=0)
+        ordered = np.take_along_axis(times, order, axis=0)
+
+        # The next timestamp after each hop is that of the next hop on the path, or the
+        # arrival at the sink after the last visited hop
+        arrivals = self.times + self.waits
+        following = np.vstack((ordered[1:], np.full((1, ordered.shape[1]), np.nan)))
+        following = np.where(np.isnan(following), arrivals, following)
+
+        latencies = np.empty_like(times)
+        np.put_along_axis(latencies, order, following - ordered, axis=0)
+        return latencies
+
+    def stats(self, percentiles=(50, 95, 99)) -> dict:
+        """ Returns a dict of summary statistics over the recorded packets: the number of
+            packets and bytes, the mean, standard deviation, maximum and the given percentiles
+            of the waiting times, and the mean per-hop latency for each hop.
+        """
+        waits = self.waits
+        stats = {'packets': len(self.wait_column), 'bytes': float(self.sizes.sum())}
+
+        if len(waits) > 0:
+            stats['mean_wait'] = float(waits.mean())
+            stats['std_wait'] = float(waits.std())
+            stats['max_wait'] = float(waits.max())
+            for percentile, value in zip(percentiles, np.percentile(waits, percentiles)):
+                stats[f'p{percentile}_wait'] = float(value)
+
+            if len(self.hops) > 0:
+                mean_latencies = np.nanmean(self.hop_latencies(), axis=1)
+                stats['mean_hop_latency'] = dict(zip(self.hops, mean_latencies.tolist()))
+
+        return stats
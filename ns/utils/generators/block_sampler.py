@@ -0,0 +1,69 @@
+"""
+Implements a sampler that draws random variates from a named distribution of
+`numpy.random.Generator` in blocks, rather than one at a time.
+
+Drawing a block of 4096 variates with NumPy costs about as much as drawing a handful of them
+with the `random` module, so that the cost of each variate is dominated by reading it from the
+block. A `BlockSampler` can be called without parameters to return the next variate, which
+makes it a drop-in replacement for the distributions used by packet generators, and it also
+offers whole blocks to callers that can consume them directly.
+"""
+import numpy as np
+
+
+class BlockSampler:
+    """ Draws random variates from a named distribution in blocks.
+
+        Parameters
+        ----------
+        distribution: str
+            The name of a distribution offered by `numpy.random.Generator`, such as
+            'exponential', 'pareto', 'lognormal' or 'uniform'.
+        params: dict
+            The parameters of the distribution, passed as keyword arguments to the
+            `numpy.random.Generator` method, such as {'scale': 2.0} for 'exponential'.
+        block_size: int
+            The number of variates drawn at a time.
+        rng: numpy.random.Generator
+            The random number generator to draw from. If None, a new generator is created
+            from `seed`.
+        seed: int
+            The seed of the new random number generator, for reproducible runs.
+    """
+    def __init__(self,
+                 distribution: str,
+                 params: dict = None,
+                 block_size: int = 4096,
+                 rng=None,
+                 seed=None):
+        if block_size < 1:
+            raise ValueError('The block size must be positive.')
+
+        if rng is None:
+            rng = np.random.default_rng(seed)
+
+        self.draw = getattr(rng, distribution, None)
+        if self.draw is None or distribution.startswith('_'):
+            raise ValueError(f"Unknown distribution: {distribution}.")
+
+        self.distribution = distribution
+        self.params = params if params is not None else {}
+        self.block_size = block_size
+        self.rng = rng
+
+        self.values = []
+        self.index = 0
+
+    def block(self) -> list:
+        """ Returns a new block of variates, as a list of Python numbers. """
+        return self.draw(size=self.block_size, **self.params).tolist()
+
+    def __call__(self):
+        """ Returns the next variate. """
+        if self.index == len(self.values):
+            self.values = self.block()
+            self.index = 0
+
+        value = self.values[self.index]
+        self.index += 1
+        return value
@@ -0,0 +1,29 @@
+"""
+Implements a plain first-in-first-out packet queue, a lightweight alternative to `simpy.Store`
+for buffers that never need to block a process.
+
+A `simpy.Store` creates and schedules an event for every `put()` and `get()`, even when the
+operation can complete immediately. Per-flow queues in a scheduler are only read by the
+scheduler itself once it knows that they are not empty, so these events are pure overhead.
+`PacketQueue` is a `collections.deque` that also offers the `put()` and `get()` calls used by
+downstream elements with zero buffers to remove packets from the buffer of their upstream
+element, as well as the `items` attribute of a `simpy.Store`.
+"""
+from collections import deque
+
+
+class PacketQueue(deque):
+    """ A first-in-first-out queue of packets that completes all operations immediately. """
+
+    @property
+    def items(self):
+        """ The packets in the queue, in the order of their arrival. """
+        return self
+
+    def put(self, packet):
+        """ Appends a packet to the tail of the queue. """
+        self.append(packet)
+
+    def get(self):
+        """ Removes and returns the packet at the head of the queue. """
+        return self.popleft()
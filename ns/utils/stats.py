@@ -0,0 +1,269 @@
+"""
+Implements streaming summaries that estimate statistics of a sequence of samples, such as
+waiting times or queue lengths, in a bounded amount of memory.
+
+Each summary offers an `add(value)` call to feed it one sample at a time. `PacketSink`,
+`PortMonitor` and `ServerMonitor` accept a no-parameter function (usually a class or a
+`functools.partial`) that creates a summary for each flow or each measurement, and feed the
+summaries as samples arrive, so that the statistics of long runs can be reported without
+keeping every sample.
+
+* `Welford`: the exact count, mean, variance, minimum and maximum, using Welford's algorithm.
+
+* `LogHistogram`: an HDR-style histogram with logarithmically sized buckets, which estimates
+  any quantile within a bounded relative error. The number of buckets grows with the logarithm
+  of the range of the samples, not with the number of samples.
+
+* `P2Quantile`: the P-square algorithm, which estimates a single quantile with five markers.
+
+* `StreamingSummary`: a `Welford` summary and a `LogHistogram` fed with the same samples.
+
+References:
+
+B. P. Welford, "Note on a Method for Calculating Corrected Sums of Squares and Products,"
+Technometrics, vol. 4, no. 3, pp. 419-420, 1962.
+
+C. Masson, J. E. Rim, H. K. Lee, "DDSketch: A Fast and Fully-Mergeable Quantile Sketch with
+Relative-Error Guarantees," Proc. VLDB Endowment, vol. 12, no. 12, 2019.
+
+R. Jain, I. Chlamtac, "The P2 Algorithm for Dynamic Calculation of Quantiles and Histograms
+Without Storing Observations," Commun. ACM, vol. 28, no. 10, pp. 1076-1085, 1985.
+"""
+import math
+from bisect import insort
+from collections import defaultdict as dd
+
+
+class Welford:
+    """ Keeps the count, mean, variance, minimum and maximum of a stream of samples. """
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        """ Adds a sample. """
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def variance(self) -> float:
+        """ The sample variance, or 0 if fewer than two samples have been added. """
+        if self.count < 2:
+            return 0.0
+        return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        """ The sample standard deviation. """
+        return math.sqrt(self.variance)
+
+
+class LogHistogram:
+    """ Counts non-negative samples in buckets whose boundaries grow geometrically, so that
+        every quantile can be estimated within a relative error of `relative_error`.
+
+        Parameters
+        ----------
+        relative_error: float
+            The largest relative error of the estimated quantiles, between 0 and 1.
+        min_value: float
+            Samples smaller than this value are counted in a single bucket for zero.
+    """
+    def __init__(self, relative_error: float = 0.01, min_value: float = 1e-9):
+        if not 0 < relative_error < 1:
+            raise ValueError('The relative error must be between 0 and 1.')
+
+        self.gamma = (1 + relative_error) / (1 - relative_error)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+
+        self.buckets = dd(int)
+        self.zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value):
+        """ Adds a sample. """
+        if value < 0:
+            raise ValueError('LogHistogram only accepts non-negative samples.')
+
+        self.count += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+        if value < self.min_value:
+            self.zero_count += 1
+        else:
+            # bucket i holds the samples in (gamma^(i - 1), gamma^i]
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += 1
+
+    def quantile(self, q: float) -> float:
+        """ Returns an estimate of the q-quantile of the samples, for q between 0 and 1. """
+        if self.count == 0:
+            raise ValueError('No samples have been added.')
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # the value with the smallest relative error in the bucket
+                estimate = 2 * self.gamma**index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+
+        return self.max
+
+    def percentiles(self, percentiles=(50, 95, 99)) -> dict:
+        """ Returns a dict of the estimated percentiles of the samples. """
+        return {p: self.quantile(p / 100) for p in percentiles}
+
+
+class P2Quantile:
+    """ Estimates the q-quantile of a stream of samples with the P-square algorithm, using
+        five markers whose heights are adjusted with piecewise-parabolic interpolation.
+
+        Parameters
+        ----------
+        q: float
+            The quantile to be estimated, between 0 and 1.
+    """
+    def __init__(self, q: float = 0.99):
+        if not 0 < q < 1:
+            raise ValueError('The quantile must be between 0 and 1.')
+
+        self.q = q
+        self.count = 0
+        self.heights = []
+        self.positions = [1, 2, 3, 4, 5]
+        self.desired = [1, 1 + 2 * q, 1 + 4 * q, 3 + 2 * q, 5]
+        self.increments = [0, q / 2, q, (1 + q) / 2, 1]
+
+    def add(self, value):
+        """ Adds a sample. """
+        self.count += 1
+
+        heights = self.heights
+        if self.count <= 5:
+            insort(heights, value)
+            return
+
+        positions = self.positions
+
+        # Finding the cell that the sample falls into, and updating the extreme markers
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = 0
+            while value >= heights[cell + 1]:
+                cell += 1
+
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Adjusting the heights of the three middle markers if they are off their desired
+        # positions by one or more
+        for i in range(1, 4):
+            offset = self.desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self.parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (
+                        positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def parabolic(self, i, step) -> float:
+        """ Returns the height of marker i moved by one position with the P-square formula. """
+        heights, positions = self.heights, self.positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) /
+            (positions[i + 1] - positions[i]) +
+            (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) /
+            (positions[i] - positions[i - 1]))
+
+    @property
+    def value(self) -> float:
+        """ The current estimate of the quantile. """
+        if self.count == 0:
+            raise ValueError('No samples have been added.')
+
+        if self.count <= 5:
+            return self.heights[round(self.q * (self.count - 1))]
+
+        return self.heights[2]
+
+
+class StreamingSummary:
+    """ Feeds the same samples to a `Welford` summary and a `LogHistogram`, providing the mean,
+        variance and extremes of the samples as well as estimates of their quantiles.
+
+        Parameters
+        ----------
+        relative_error: float
+            The largest relative error of the estimated quantiles.
+    """
+    def __init__(self, relative_error: float = 0.01):
+        self.moments = Welford()
+        self.histogram = LogHistogram(relative_error)
+
+    def add(self, value):
+        """ Adds a sample. """
+        self.moments.add(value)
+        self.histogram.add(value)
+
+    @property
+    def count(self) -> int:
+        """ The number of samples. """
+        return self.moments.count
+
+    @property
+    def mean(self) -> float:
+        """ The mean of the samples. """
+        return self.moments.mean
+
+    @property
+    def std(self) -> float:
+        """ The sample standard deviation. """
+        return self.moments.std
+
+    @property
+    def min(self) -> float:
+        """ The smallest sample. """
+        return self.moments.min
+
+    @property
+    def max(self) -> float:
+        """ The largest sample. """
+        return self.moments.max
+
+    def quantile(self, q: float) -> float:
+        """ Returns an estimate of the q-quantile of the samples. """
+        return self.histogram.quantile(q)
+
+    def percentiles(self, percentiles=(50, 95, 99)) -> dict:
+        """ Returns a dict of the estimated percentiles of the samples. """
+        return self.histogram.percentiles(percentiles)
@@ -3,9 +3,13 @@ Implemented a tagged and ordered variant of the simpy.Store class.
 The `tag` is used to sort the elements for removal ordering. This is
 useful in the implementation of more sophisticated queueing disciplines,
 such as Weighted Fair Queueing and Virtual Clock.
+
+Besides the `put()` and `get()` events of a `simpy.Store`, a TaggedStore offers `put_nowait()`
+and `get_nowait()`, which complete immediately without creating any events when they do not
+need to wait, as well as the bulk operations `put_many()` and `drain()`, and `peek()`.
 """
 
-from heapq import heappop, heappush
+from heapq import heapify, heappop, heappush
 
 from simpy.core import BoundClass
 from simpy.resources import base
@@ -45,8 +49,13 @@ class TaggedStore(base.BaseResource):
             raise ValueError('"capacity" must be > 0.')
 
         self._capacity = capacity
-        self.items = []  # we are keeping items sorted by their tags
-        self.event_count = 0  # Used to break ties with python heap implementation
+        # A heap of (tag, sequence number, item) tuples, sorted by their tags. The sequence
+        # number breaks ties between equal tags in the order of arrival.
+        self.items = []
+        self.event_count = 0
+
+    def __len__(self):
+        return len(self.items)
 
     @property
     def capacity(self):
@@ -59,13 +68,89 @@ class TaggedStore(base.BaseResource):
     get = BoundClass(TaggedStoreGet)
     """Create a new `StoreGet` event."""
 
+    def put_nowait(self, item):
+        """ Puts `item`, a (tag, contents) tuple, into the store without creating an event,
+            and wakes up a process waiting on `get()`, if any. If the store is full, this
+            falls back to creating a `put()` event, which is returned.
+        """
+        if len(self.items) >= self._capacity:
+            return self.put(item)
+
+        self.event_count += 1
+        heappush(self.items, (item[0], self.event_count, item[1]))
+
+        if self.get_queue:
+            self._trigger_get(None)
+
+        return None
+
+    def get_nowait(self):
+        """ Removes and returns the contents of the item with the smallest tag without
+            creating an event. Raises an IndexError if the store is empty.
+        """
+        if not self.items:
+            raise IndexError('get from an empty TaggedStore')
+
+        item = heappop(self.items)[2]
+
+        if self.put_queue:
+            self._trigger_put(None)
+
+        return item
+
+    def peek(self):
+        """ Returns the item with the smallest tag, as a (tag, contents) tuple, without
+            removing it from the store. Returns None if the store is empty.
+        """
+        if not self.items:
+            return None
+
+        tag, __, item = self.items[0]
+        return (tag, item)
+
+    def put_many(self, items):
+        """ Puts a sequence of (tag, contents) tuples into the store without creating events,
+            except for the items that do not fit into the store, which are put with `put()`
+            events. Returns the list of these events.
+        """
+        room = self._capacity - len(self.items)
+        fits = items if len(items) <= room else items[:int(room)]
+
+        entries = []
+        for tag, item in fits:
+            self.event_count += 1
+            entries.append((tag, self.event_count, item))
+
+        if len(entries) > len(self.items):
+            self.items.extend(entries)
+            heapify(self.items)
+        else:
+            for entry in entries:
+                heappush(self.items, entry)
+
+        if self.get_queue:
+            self._trigger_get(None)
+
+        return [self.put(item) for item in items[len(entries):]]
+
+    def drain(self):
+        """ Removes all the items from the store and returns their contents, in the order
+            of their tags.
+        """
+        items = [heappop(self.items)[2] for __ in range(len(self.items))]
+
+        if self.put_queue:
+            self._trigger_put(None)
+
+        return items
+
     # We assume the item is a tuple: (tag, packet). The tag is used to
     # sort the packet in the heap.
     def _do_put(self, event):
-        self.event_count += 1  # Needed this to break heap ties
         if len(self.items) < self._capacity:
+            self.event_count += 1  # Needed this to break heap ties
             heappush(self.items,
-                     [event.item[0], self.event_count, event.item[1]])
+                     (event.item[0], self.event_count, event.item[1]))
             event.succeed()
 
     # When we return an item from the tagged store we do not need to
@@ -1,7 +1,21 @@
 """
-Implements a simple timer that expires after a timeout value. When it expires, it runs
-a provided callback function.
+Implements timers that expire after a timeout value. When a timer expires, it runs a provided
+callback function.
+
+* `Timer`: a simple timer that runs its own SimPy process.
+
+* `TimerWheel`: a hierarchical timing wheel that holds any number of timers, with a single
+  pending SimPy event at the tick of its earliest timer. Stopping a timer removes it from the
+  wheel, so that it does not cost any event unless it was the earliest one. `timer_wheel(env)`
+  returns a timing wheel shared by all the elements in an environment.
+
+Reference:
+
+G. Varghese and T. Lauck, "Hashed and Hierarchical Timing Wheels: Data Structures for the
+Efficient Implementation of a Timer Facility," in Proc. ACM SOSP, 1987.
 """
+import math
+from weakref import WeakKeyDictionary
 
 
 class Timer:
@@ -47,3 +61,275 @@ class Timer:
         """ Restarting the timer with a new timeout value. """
         self.timer_started = self.env.now
         self.timer_expiry = self.timer_started + timeout
+
+
+class WheelTimer:
+    """ A timer held by a `TimerWheel`, with the same interface as `Timer`. Timers are created
+        with `TimerWheel.timer()`.
+
+        Parameters
+        ----------
+        wheel: TimerWheel
+            The timing wheel that holds this timer.
+        timer_id: int
+            The id of this timer, used as a parameter when the timeout
+            callback function is called.
+        timeout_callback:
+            The callback function that runs when the timer expires.
+    """
+    __slots__ = ('wheel', 'timer_id', 'timeout_callback', 'timer_started', 'timer_expiry',
+                 'tick', 'slot')
+
+    def __init__(self, wheel, timer_id, timeout_callback):
+        self.wheel = wheel
+        self.timer_id = timer_id
+        self.timeout_callback = timeout_callback
+        self.timer_started = wheel.env.now
+        self.timer_expiry = self.timer_started
+        # the tick at which the timer expires
+        self.tick = None
+        # the slot of the wheel that holds the timer, or None if it is not running
+        self.slot = None
+
+    @property
+    def stopped(self) -> bool:
+        """ Whether the timer has been stopped or has expired. """
+        return self.slot is None
+
+    def stop(self):
+        """ Stopping the timer. """
+        self.wheel.cancel(self)
+
+    def restart(self, timeout):
+        """ Restarting the timer with a new timeout value. """
+        self.wheel.cancel(self)
+        self.timer_started = self.wheel.env.now
+        self.timer_expiry = self.timer_started + timeout
+        self.wheel.insert(self)
+
+
+class TimerWheel:
+    """ A hierarchical timing wheel. Time is divided into ticks of `resolution`, and a timer
+        expires at the first tick at or after its expiry time. Level 0 of the wheel has a slot
+        for each of the next `n_slots` ticks; each slot of level l spans n_slots^l ticks, and
+        its timers are moved to finer levels when the wheel reaches the beginning of the slot.
+        Timers too far in the future for the top level are kept in an overflow slot.
+
+        The wheel does not tick when it has nothing to do: it keeps a single pending SimPy
+        timeout, at the tick of its earliest timer, and moves the timers of the slots it has
+        skipped to finer levels when it wakes up.
+
+        Parameters
+        ----------
+        env: simpy.Environment
+            The simulation environment.
+        resolution: float
+            The duration of a tick.
+        n_slots: int
+            The number of slots at each level.
+        levels: int
+            The number of levels.
+    """
+    def __init__(self,
+                 env,
+                 resolution: float = 0.001,
+                 n_slots: int = 256,
+                 levels: int = 4):
+        if resolution <= 0:
+            raise ValueError('The resolution must be positive.')
+        if n_slots < 2 or levels < 1:
+            raise ValueError('The wheel needs at least two slots and one level.')
+
+        self.env = env
+        self.resolution = resolution
+        # ticks are converted to times by dividing by the number of ticks per unit of time,
+        # which is exact for decimal resolutions such as 0.001
+        self.ticks_per_unit = 1 / resolution
+        self.n_slots = n_slots
+        self.levels = levels
+        # the number of ticks spanned by a slot at each level, and by the whole wheel
+        self.spans = [n_slots**level for level in range(levels + 1)]
+
+        self.wheels = [[{} for __ in range(n_slots)] for __ in range(levels)]
+        self.overflow = {}
+
+        # the tick that the wheel has reached
+        self.current = int(env.now * self.ticks_per_unit)
+        # the tick at which the wheel is scheduled to wake up, if any
+        self.wakeup = None
+
+        self.timers_running = 0
+        self.timers_expired = 0
+        self.wakeups = 0
+
+    def timer(self, timer_id, timeout_callback, timeout) -> WheelTimer:
+        """ Starts a timer that calls `timeout_callback(timer_id)` after `timeout`. """
+        timer = WheelTimer(self, timer_id, timeout_callback)
+        timer.timer_expiry = timer.timer_started + timeout
+        self.insert(timer)
+        return timer
+
+    def insert(self, timer):
+        """ Adds a timer to the wheel, according to its expiry time. """
+        if self.wakeup is None:
+            # the wheel is empty, and can be moved forward without doing anything
+            self.current = max(self.current, int(self.env.now * self.ticks_per_unit))
+
+        timer.tick = max(math.ceil(timer.timer_expiry * self.ticks_per_unit - 1e-9),
+                         self.current)
+        self.place(timer)
+        self.timers_running += 1
+        self.schedule(timer.tick)
+
+    def place(self, timer):
+        """ Puts a timer in the slot for its tick, relative to the current tick. """
+        tick = timer.tick
+        current = self.current
+        spans = self.spans
+
+        for level in range(self.levels):
+            if tick // spans[level + 1] == current // spans[level + 1]:
+                slot = self.wheels[level][(tick // spans[level]) % self.n_slots]
+                break
+        else:
+            slot = self.overflow
+
+        slot[timer] = None
+        timer.slot = slot
+
+    def cancel(self, timer):
+        """ Removes a timer from the wheel. A scheduled wakeup is kept, and finds nothing to
+            do if it was for this timer only. """
+        if timer.slot is not None:
+            del timer.slot[timer]
+            timer.slot = None
+            self.timers_running -= 1
+
+    def schedule(self, tick):
+        """ Schedules a wakeup at a tick, unless the wheel wakes up earlier. """
+        if self.wakeup is not None and self.wakeup <= tick:
+            return
+
+        # a wakeup scheduled for a later tick is ignored when it occurs
+        self.wakeup = tick
+        self.env.timeout(max(0, tick / self.ticks_per_unit - self.env.now)).callbacks.append(
+            lambda event: self.expire(tick))
+
+    def next_slot(self, level):
+        """ Returns the index of the first non-empty slot of a level after the current one in
+            its revolution, or None. """
+        wheel = self.wheels[level]
+        for index in range((self.current // self.spans[level]) % self.n_slots + 1,
+                           self.n_slots):
+            if wheel[index]:
+                return index
+        return None
+
+    def advance(self, tick):
+        """ Moves the wheel to a tick, moving the timers of the slots that begin on the way to
+            finer levels. """
+        n_slots = self.n_slots
+        spans = self.spans
+
+        while True:
+            # the earliest tick after the current one at which a non-empty slot begins
+            boundary = None
+            for level in range(1, self.levels):
+                index = self.next_slot(level)
+                if index is not None:
+                    span = spans[level]
+                    boundary = (self.current // (span * n_slots) * n_slots + index) * span
+                    break
+            if self.overflow:
+                # the beginning of the revolution of the wheel of the earliest overflow timer
+                overflow = min(timer.tick for timer in self.overflow) // spans[-1] * spans[-1]
+                if boundary is None or overflow < boundary:
+                    boundary = overflow
+
+            if boundary is None or boundary > tick:
+                break
+
+            self.current = boundary
+            if boundary % spans[-1] == 0 and self.overflow:
+                timers, self.overflow = self.overflow, {}
+                for timer in timers:
+                    self.place(timer)
+            for level in range(self.levels - 1, 0, -1):
+                if boundary % spans[level] == 0:
+                    index = (boundary // spans[level]) % n_slots
+                    timers = self.wheels[level][index]
+                    if timers:
+                        self.wheels[level][index] = {}
+                        for timer in timers:
+                            self.place(timer)
+
+        self.current = tick
+
+    def next_tick(self):
+        """ Returns the tick of the earliest timer, at or after the current tick, or None if
+            the wheel holds no timers. """
+        if self.timers_running == 0:
+            return None
+
+        if self.wheels[0][self.current % self.n_slots]:
+            # timers started by the callbacks of the current tick
+            return self.current
+
+        index = self.next_slot(0)
+        if index is not None:
+            return self.current // self.n_slots * self.n_slots + index
+
+        # the earliest timers are in the first non-empty slot of the finest level
+        for level in range(1, self.levels):
+            index = self.next_slot(level)
+            if index is not None:
+                return min(timer.tick for timer in self.wheels[level][index])
+
+        return min(timer.tick for timer in self.overflow)
+
+    def expire(self, tick):
+        """ Moves the wheel to a tick, and runs the callbacks of the timers that expire. """
+        if tick != self.wakeup:
+            return
+        self.wakeup = None
+        self.wakeups += 1
+        self.advance(tick)
+
+        index = tick % self.n_slots
+        expired = self.wheels[0][index]
+        if expired:
+            # timers started by the callbacks go into a new slot
+            self.wheels[0][index] = {}
+            for timer in list(expired):
+                if timer.slot is not expired:
+                    # stopped or restarted by an earlier callback
+                    continue
+                timer.slot = None
+                self.timers_running -= 1
+                self.timers_expired += 1
+                timer.timeout_callback(timer.timer_id)
+
+        next_tick = self.next_tick()
+        if next_tick is not None:
+            self.schedule(next_tick)
+
+
+wheels = WeakKeyDictionary()
+
+
+def timer_wheel(env, **kwargs) -> TimerWheel:
+    """ Returns the timing wheel shared by all the elements in an environment, which is created
+        with the keyword arguments of `TimerWheel` when it is first used. Raises a ValueError
+        if the keyword arguments conflict with the settings of the existing wheel. """
+    if env not in wheels:
+        wheels[env] = TimerWheel(env, **kwargs)
+        return wheels[env]
+
+    wheel = wheels[env]
+    for name, value in kwargs.items():
+        if not hasattr(wheel, name):
+            raise TypeError(f"timer_wheel() got an unexpected keyword argument '{name}'")
+        if getattr(wheel, name) != value:
+            raise ValueError(f"The timing wheel of this environment has {name} = "
+                             f"{getattr(wheel, name)}, not {value}.")
+    return wheel
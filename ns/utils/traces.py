@@ -0,0 +1,140 @@
+"""
+Implements readers and a converter for the packet traces replayed by `TracePacketGenerator`.
+
+The text format has one packet per line, with whitespace-separated columns for the flow ID
+(optional), the packet ID, the time and the size of the packet. Text traces can be compressed
+with gzip (with a '.gz' extension) or Zstandard (with a '.zst' extension, which requires the
+`zstandard` package), and are read in a streaming fashion.
+
+The binary format is a short header followed by fixed-width records of the flow ID, the packet
+ID, the time and the size of each packet (see `RECORD_DTYPE`). Binary traces are read through
+`numpy.memmap` in chunks, so that replaying a long capture costs little more than reading it
+from disk. A text trace can be converted into a binary trace with `convert()`, or from the
+command line:
+
+    python -m ns.utils.traces trace.txt trace.bin [flow_id]
+"""
+import gzip
+import io
+import sys
+from itertools import islice
+
+import numpy as np
+
+MAGIC = b'NSPYTRC1'
+
+# 24 bytes per packet
+RECORD_DTYPE = np.dtype([('flow_id', '<i4'), ('packet_id', '<i8'), ('time', '<f8'),
+                         ('size', '<i4')])
+
+
+def open_text(filename):
+    """ Opens a text trace for reading, decompressing it on the fly if its name ends with
+        '.gz' or '.zst'. """
+    if filename.endswith('.gz'):
+        return gzip.open(filename, 'rt')
+
+    if filename.endswith('.zst'):
+        try:
+            import zstandard
+        except ImportError as error:
+            raise ImportError(
+                'Reading Zstandard-compressed traces requires the zstandard package.') from error
+
+        raw = open(filename, 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        return io.TextIOWrapper(reader)
+
+    return open(filename, 'r')
+
+
+def is_binary(filename) -> bool:
+    """ Returns True if the file is a binary trace. """
+    with open(filename, 'rb') as file:
+        return file.read(len(MAGIC)) == MAGIC
+
+
+def read_text(filename, flow_id=None):
+    """ Yields the (flow ID, packet ID, time, size) of each packet in a text trace. If
+        `flow_id` is not None, the lines have no flow ID column, and `flow_id` is used
+        instead. """
+    with open_text(filename) as file:
+        for line in file:
+            row = line.split()
+            if not row:
+                continue
+
+            if flow_id is None:
+                yield int(row[0]), int(row[1]), float(row[2]), int(row[3])
+            else:
+                yield flow_id, int(row[0]), float(row[1]), int(row[2])
+
+
+def read_binary(filename, chunk_size: int = 65536):
+    """ Yields the records of a binary trace in chunks of `chunk_size` records, each a
+        structured NumPy array with the fields of `RECORD_DTYPE`. """
+    if not is_binary(filename):
+        raise ValueError(f"{filename} is not a binary trace.")
+
+    records = np.memmap(filename, dtype=RECORD_DTYPE, mode='r', offset=len(MAGIC))
+    try:
+        for start in range(0, len(records), chunk_size):
+            yield np.array(records[start:start + chunk_size])
+    finally:
+        del records
+
+
+def read_chunks(filename, flow_id=None, chunk_size: int = 65536):
+    """ Yields the (flow ID, packet ID, time, size) of the packets in a text or binary trace,
+        in lists of at most `chunk_size` records, so that no more than one chunk of the trace
+        is held in memory at a time. If `flow_id` is not None, it is used as the flow ID of
+        all the packets. """
+    if is_binary(filename):
+        for chunk in read_binary(filename, chunk_size):
+            if flow_id is None:
+                flow_ids = chunk['flow_id'].tolist()
+            else:
+                flow_ids = [flow_id] * len(chunk)
+
+            yield list(zip(flow_ids, chunk['packet_id'].tolist(), chunk['time'].tolist(),
+                           chunk['size'].tolist()))
+    else:
+        records = read_text(filename, flow_id)
+        try:
+            while True:
+                chunk = list(islice(records, chunk_size))
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            records.close()
+
+
+def convert(text_filename, binary_filename, flow_id=None, chunk_size: int = 65536) -> int:
+    """ Converts a (possibly compressed) text trace into a binary trace, and returns the
+        number of packets converted. """
+    count = 0
+    with open(binary_filename, 'wb') as file:
+        file.write(MAGIC)
+
+        chunk = []
+        for record in read_text(text_filename, flow_id):
+            chunk.append(record)
+            if len(chunk) == chunk_size:
+                np.array(chunk, dtype=RECORD_DTYPE).tofile(file)
+                count += len(chunk)
+                chunk = []
+
+        if chunk:
+            np.array(chunk, dtype=RECORD_DTYPE).tofile(file)
+            count += len(chunk)
+
+    return count
+
+
+if __name__ == '__main__':
+    if len(sys.argv) not in (3, 4):
+        sys.exit('Usage: python -m ns.utils.traces <text trace> <binary trace> [flow_id]')
+
+    n = convert(sys.argv[1], sys.argv[2], int(sys.argv[3]) if len(sys.argv) == 4 else None)
+    print(f"Converted {n} packets.")
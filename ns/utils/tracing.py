@@ -0,0 +1,80 @@
+"""
+Implements a lightweight tracing facility for network elements, built on top of the standard
+`logging` module.
+
+Every network element holds a `Tracer`, a `logging.LoggerAdapter` that attaches the ID of the
+element and the current simulation time to each record as the `element_id` and `sim_time`
+attributes. Per-packet trace messages are emitted at the DEBUG level, and elements only format
+them when their `debug` flag is set, so that tracing costs a single attribute lookup on the hot
+path when it is turned off. Less frequent events, such as connections in the emulation mode,
+are emitted at the INFO level.
+
+Loggers are named after the modules of their elements (e.g., `ns.port.port`), so that the
+standard `logging` configuration can be used to filter or redirect traces by level or by
+module. If an element is created with `debug=True` and no handlers have been configured for
+the `ns` logger, a handler that prints plain messages to stdout is installed by `enable()`.
+"""
+import logging
+import sys
+
+ROOT_LOGGER = "ns"
+
+
+def enable(level=logging.DEBUG, stream=None, fmt: str = "%(message)s"):
+    """ Turns on the output of traces for all the elements in the `ns` logger hierarchy.
+
+        A handler is installed only if none has been configured by the application, and the
+        level of the `ns` logger is only lowered if it has not been explicitly set.
+
+        Parameters
+        ----------
+        level: int
+            The lowest level of the traces to be emitted.
+        stream: file
+            The stream that the traces are written to. Defaults to stdout.
+        fmt: str
+            The format of each trace, which may refer to `sim_time` and `element_id`.
+    """
+    logger = logging.getLogger(ROOT_LOGGER)
+
+    if not logger.hasHandlers():
+        handler = logging.StreamHandler(stream if stream else sys.stdout)
+        handler.setFormatter(logging.Formatter(fmt))
+        logger.addHandler(handler)
+
+    if logger.level == logging.NOTSET:
+        logger.setLevel(level)
+
+
+class Tracer(logging.LoggerAdapter):
+    """ Emits the traces of a network element.
+
+        Parameters
+        ----------
+        name: str
+            The name of the logger, which is usually the `__name__` of the element's module.
+        env: simpy.Environment
+            The simulation environment, used to timestamp the traces.
+        element_id: str
+            The ID of the element that emits the traces.
+        debug: bool
+            If True, turns on the output of traces by calling `enable()`.
+    """
+    def __init__(self, name, env=None, element_id=None, debug: bool = False):
+        super().__init__(logging.getLogger(name), {"element_id": element_id})
+        self.env = env
+
+        if debug:
+            enable()
+
+    def process(self, msg, kwargs):
+        """ Attaches the element ID and the current simulation time to a trace. """
+        extra = {
+            "element_id": self.extra["element_id"],
+            "sim_time": self.env.now if self.env is not None else None
+        }
+        if "extra" in kwargs:
+            extra.update(kwargs["extra"])
+        kwargs["extra"] = extra
+
+        return msg, kwargs